@@ -1,5 +1,12 @@
 from utils.gemini_client import generate_with_gemini, extract_json_from_response
+from utils.model_backends import ModelBackend, get_backend
+from utils.json_stream import aiter_json_objects
+from utils.rate_limiter import model_scheduler
 from agents.prompt_engineer import build_tabular_prompt, build_qa_prompt
+from agents.validator import validate_tabular_batch, check_qa_pair
+from config import config
+from typing import AsyncIterator, Callable, Dict, List, Tuple
+import asyncio
 import random
 import time
 import logging
@@ -52,4 +59,204 @@ def generate_qa_pairs(request) -> list:
     extract_time = time.time() - extract_start
     logger.info(f"JSON extraction completed in {extract_time:.2f} seconds, got {len(result)} items")
     
-    return result
\ No newline at end of file
+    return result
+
+def request_deadline() -> float:
+    """time.monotonic() cutoff for the model calls of a request starting now, or None without a budget"""
+    if config.GENERATION_TIMEOUT_SECONDS <= 0:
+        return None
+    return time.monotonic() + config.GENERATION_TIMEOUT_SECONDS
+
+def split_batches(total: int, batch_size: int) -> List[int]:
+    """Split a total item count into consecutive batch sizes"""
+    batch_size = max(1, batch_size)
+    return [min(batch_size, total - start) for start in range(0, total, batch_size)]
+
+async def _stream_batch(backend: ModelBackend, prompt: str, batch_request, size: int,
+                        deadline: float = None) -> list:
+    """Collect up to `size` objects from a streamed response as each one completes.
+
+    Stops reading once enough objects have arrived, and keeps the complete
+    objects received so far if the stream fails part-way through. The call
+    goes through the shared model scheduler, which retries failures that
+    happen before any object has arrived until the request's `deadline`.
+    """
+    async def attempt() -> list:
+        rows = []
+        chunks = backend.stream(prompt, batch_request)
+        objects = aiter_json_objects(chunks)
+        try:
+            async for obj in objects:
+                rows.append(obj)
+                if len(rows) >= size:
+                    break
+        except Exception as e:
+            if not rows:
+                raise
+            logger.warning(f"Model stream failed after {len(rows)} objects, keeping them: {e}")
+        finally:
+            await objects.aclose()
+            await chunks.aclose()
+        return rows
+
+    return await model_scheduler.run(attempt, deadline)
+
+async def _iter_fan_out(sizes: List[int], run_batch: Callable, max_concurrency: int) -> AsyncIterator[list]:
+    """Run batches concurrently with a concurrency limit and yield their results in order.
+
+    Each batch is yielded as soon as it and every batch before it have
+    finished. Closing the iterator early cancels the batches still pending.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def bounded(index: int, size: int) -> list:
+        async with semaphore:
+            return await run_batch(index, size)
+
+    tasks = [asyncio.create_task(bounded(index, size)) for index, size in enumerate(sizes)]
+    try:
+        for task in tasks:
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+async def _generate_valid_batch(backend: ModelBackend, index: int, total: int, size: int,
+                               make_request: Callable, build_prompt: Callable, split_valid: Callable,
+                               unit: str, deadline: float = None) -> Tuple[list, int]:
+    """Generate one batch of `size` valid items, topping up only the deficit.
+
+    `split_valid(items)` returns (valid_items, rejection_reasons). Rejected
+    items are dropped and the next prompt asks for just the
+    missing count, listing the rejection reasons, for up to
+    Config.MAX_REGENERATION_ATTEMPTS follow-up calls, as long as the
+    request's `deadline` hasn't passed. Returns the valid items and the number
+    of items rejected along the way.
+    """
+    valid = []
+    rejected = 0
+    feedback = []
+
+    for attempt in range(config.MAX_REGENERATION_ATTEMPTS + 1):
+        deficit = size - len(valid)
+        if deficit <= 0:
+            break
+        if attempt and deadline is not None and time.monotonic() >= deadline:
+            logger.warning(f"Batch {index + 1}/{total}: generation time budget used up, skipping top-ups")
+            break
+        if attempt:
+            logger.info(f"Batch {index + 1}/{total}: requesting {deficit} replacement {unit} "
+                        f"(attempt {attempt}/{config.MAX_REGENERATION_ATTEMPTS})")
+
+        batch_request = make_request(deficit)
+        prompt = build_prompt(batch_request, batch=(index, total), feedback=feedback)
+
+        api_start = time.time()
+        items = await _stream_batch(backend, prompt, batch_request, deficit, deadline)
+        logger.info(f"Batch {index + 1}/{total} completed in {time.time() - api_start:.2f} seconds, "
+                    f"got {len(items)}/{deficit} {unit}")
+
+        accepted, feedback = split_valid(items)
+        valid.extend(accepted)
+        rejected += len(items) - len(accepted)
+        if len(items) < deficit:
+            feedback.append(f"Only {len(items)} of {deficit} {unit} were returned as complete JSON objects")
+
+    if len(valid) < size:
+        logger.warning(f"Batch {index + 1}/{total} is short {size - len(valid)} valid {unit} "
+                       f"after {config.MAX_REGENERATION_ATTEMPTS} regeneration attempts")
+    return valid, rejected
+
+def _split_valid_rows(rows: list, columns: List[Dict]) -> Tuple[list, List[str]]:
+    """Validate rows column-wise; reasons summarize failures per column"""
+    if not rows:
+        return [], []
+    result = validate_tabular_batch(rows, columns)
+    valid = [row for row, ok in zip(rows, result["valid_mask"]) if ok]
+
+    reasons = []
+    if any(not isinstance(row, dict) for row in rows):
+        reasons.append("Some rows were not JSON objects")
+    for col in columns:
+        failures = result["column_failures"][col['name']]
+        if failures:
+            rule = f" or failed the rule '{col['validation']}'" if col.get('validation') else ""
+            reasons.append(f"Column '{col['name']}' was missing, not a valid {col['dtype']}{rule} "
+                           f"in {failures} rows")
+    return valid, reasons
+
+def _split_valid_pairs(pairs: list) -> Tuple[list, List[str]]:
+    valid = []
+    reasons = []
+    for pair in pairs:
+        reason = check_qa_pair(pair)
+        if reason is None:
+            valid.append(pair)
+        else:
+            reasons.append(reason)
+    return valid, reasons
+
+def _tabular_batch_runner(request, sizes: List[int], backend: ModelBackend) -> Callable:
+    columns = [col.model_dump() for col in request.columns]
+    deadline = request_deadline()
+
+    async def run_batch(index: int, size: int) -> Tuple[list, int]:
+        return await _generate_valid_batch(
+            backend, index, len(sizes), size,
+            make_request=lambda count: request.model_copy(update={"num_rows": count}),
+            build_prompt=build_tabular_prompt,
+            split_valid=lambda rows: _split_valid_rows(rows, columns),
+            unit="rows",
+            deadline=deadline
+        )
+
+    return run_batch
+
+def _qa_batch_runner(request, sizes: List[int], backend: ModelBackend) -> Callable:
+    deadline = request_deadline()
+
+    async def run_batch(index: int, size: int) -> Tuple[list, int]:
+        # A batch left short (even empty) after its top-ups is returned as is; callers report the shortfall
+        return await _generate_valid_batch(
+            backend, index, len(sizes), size,
+            make_request=lambda count: request.model_copy(update={"num_pairs": count}),
+            build_prompt=build_qa_prompt,
+            split_valid=_split_valid_pairs,
+            unit="pairs",
+            deadline=deadline
+        )
+
+    return run_batch
+
+async def iter_tabular_batches(request, batch_size: int = None, max_concurrency: int = None,
+                               backend: ModelBackend = None) -> AsyncIterator[Tuple[list, int]]:
+    """Yield (valid_rows, rejected_count) per batch in request order as batches become available"""
+    sizes = split_batches(request.num_rows, batch_size or config.TABULAR_BATCH_SIZE)
+    max_concurrency = max_concurrency or config.GENERATION_MAX_CONCURRENCY
+    logger.info(f"Generating {request.num_rows} rows in {len(sizes)} batches "
+                f"(max concurrency: {max_concurrency})")
+
+    batches = _iter_fan_out(sizes, _tabular_batch_runner(request, sizes, backend or get_backend()),
+                            max_concurrency)
+    try:
+        async for batch in batches:
+            yield batch
+    finally:
+        await batches.aclose()
+
+async def iter_qa_batches(request, batch_size: int = None, max_concurrency: int = None,
+                          backend: ModelBackend = None) -> AsyncIterator[Tuple[list, int]]:
+    """Yield (valid_pairs, rejected_count) per batch in request order as batches become available"""
+    sizes = split_batches(request.num_pairs, batch_size or config.QA_BATCH_SIZE)
+    max_concurrency = max_concurrency or config.GENERATION_MAX_CONCURRENCY
+    logger.info(f"Generating {request.num_pairs} QA pairs in {len(sizes)} batches "
+                f"(max concurrency: {max_concurrency})")
+
+    batches = _iter_fan_out(sizes, _qa_batch_runner(request, sizes, backend or get_backend()),
+                            max_concurrency)
+    try:
+        async for batch in batches:
+            yield batch
+    finally:
+        await batches.aclose()
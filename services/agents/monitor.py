@@ -1,16 +1,18 @@
 import time
-from typing import Dict
+from typing import Callable, Dict, List
 import logging
 
 logger = logging.getLogger(__name__)
 
 class GenerationMonitor:
-    def __init__(self, total_items: int):
+    def __init__(self, total_items: int, on_update: Callable[[], None] = None):
         self.total = total_items
         self.completed = 0
         self.valid = 0
         self.invalid = 0
         self.start_time = time.time()
+        self.finished_at = None
+        self.on_update = on_update
         logger.info(f"GenerationMonitor initialized for {total_items} items")
         
     def log_generation(self, valid: bool = True):
@@ -26,9 +28,28 @@ class GenerationMonitor:
             logger.info(f"Progress: {progress['completed']}/{progress['total']} ({progress['progress']}%) - "
                        f"Valid: {progress['valid']}, Invalid: {progress['invalid']}, "
                        f"Elapsed: {progress['elapsed_seconds']}s")
+        if self.on_update:
+            self.on_update()
+
+    def log_batch(self, valid: int, invalid: int = 0):
+        """Record a whole generated batch at once"""
+        self.completed += valid + invalid
+        self.valid += valid
+        self.invalid += invalid
+
+        progress = self.get_progress()
+        logger.info(f"Progress: {progress['completed']}/{progress['total']} ({progress['progress']}%) - "
+                   f"Valid: {progress['valid']}, Invalid: {progress['invalid']}, "
+                   f"Elapsed: {progress['elapsed_seconds']}s")
+        if self.on_update:
+            self.on_update()
             
+    def finish(self, finished_at: float = None):
+        """Stop the clock; elapsed time is reported up to this point from now on"""
+        self.finished_at = finished_at if finished_at is not None else time.time()
+
     def get_progress(self) -> Dict[str, any]:
-        elapsed = time.time() - self.start_time
+        elapsed = (self.finished_at or time.time()) - self.start_time
         return {
             "total": self.total,
             "completed": self.completed,
@@ -37,4 +58,29 @@ class GenerationMonitor:
             "progress": min(100, int((self.completed / self.total) * 100)),
             "elapsed_seconds": round(elapsed, 1),
             "estimated_remaining": round((elapsed / self.completed) * (self.total - self.completed), 1) if self.completed else 0
-        }
\ No newline at end of file
+        }
+
+class MonitorFanOut:
+    """Progress sink for a generation shared by several callers.
+
+    Forwards every batch to each joined caller's monitor; a monitor added
+    part-way through first catches up with the progress made so far.
+    """
+
+    def __init__(self):
+        self.monitors: List[GenerationMonitor] = []
+        self.valid = 0
+        self.invalid = 0
+
+    def add(self, monitor: GenerationMonitor = None):
+        if monitor is None:
+            return
+        if self.valid or self.invalid:
+            monitor.log_batch(self.valid, self.invalid)
+        self.monitors.append(monitor)
+
+    def log_batch(self, valid: int, invalid: int = 0):
+        self.valid += valid
+        self.invalid += invalid
+        for monitor in self.monitors:
+            monitor.log_batch(valid, invalid)
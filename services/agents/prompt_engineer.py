@@ -1,4 +1,20 @@
-def build_tabular_prompt(request) -> str:
+def _batch_note(batch: tuple, unit: str) -> str:
+    """Prompt line telling the model which (index, total) batch it is producing"""
+    if not batch or batch[1] <= 1:
+        return ""
+    index, total = batch
+    return (f"Batch: {index + 1} of {total}. Other batches are generated separately, "
+            f"so make these {unit} distinct rather than repeating common examples.")
+
+def _feedback_note(feedback: list, unit: str) -> str:
+    """Prompt section listing why previously generated items were rejected"""
+    if not feedback:
+        return ""
+    reasons = "\n".join(f"    - {reason}" for reason in list(dict.fromkeys(feedback))[:5])
+    return (f"Previously generated {unit} were rejected for these reasons; "
+            f"make sure none of the new {unit} repeat them:\n{reasons}")
+
+def build_tabular_prompt(request, batch: tuple = None, feedback: list = None) -> str:
     columns_desc = "\n".join(
         [f"- {col.name} ({col.dtype}): {col.description}. Validation: {col.validation}"
         for col in request.columns]
@@ -25,7 +41,8 @@ def build_tabular_prompt(request) -> str:
     Use Case: {request.use_case}
     Description: {request.description}
     Number of Rows: {request.num_rows}
-    
+    {_batch_note(batch, "rows")}
+    {_feedback_note(feedback, "rows")}
     Columns:
     {columns_desc}
     
@@ -49,13 +66,15 @@ def build_tabular_prompt(request) -> str:
     [{{"{example_structure}"}}, {{"{example_structure}"}}]
     """
 
-def build_qa_prompt(request) -> str:
+def build_qa_prompt(request, batch: tuple = None, feedback: list = None) -> str:
     return f"""
     Generate {request.num_pairs} question-answer pairs with these specifications:
     Domain: {request.domain}
     Complexity: {request.complexity}
     Context: {request.context}
     Constraints: {request.constraints}
+    {_batch_note(batch, "pairs")}
+    {_feedback_note(feedback, "pairs")}
     
     CRITICAL OUTPUT REQUIREMENTS:
     1. Output STRICTLY as a JSON array: [{{"question": "...", "answer": "..."}}]
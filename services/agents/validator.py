@@ -1,26 +1,36 @@
-from utils.validation_rules import evaluate_rule
-from typing import List, Dict, Any
+from utils.validation_rules import evaluate_rule, compile_rule
+from typing import List, Dict, Any, Optional, Union
 import logging
+import math
+import numpy as np
+import pandas as pd
 
 logger = logging.getLogger(__name__)
 
-def validate_tabular_row(row: Dict[str, Any], columns: List[Dict]) -> bool:
-    logger.debug(f"Validating row: {row}")
+def _reject(reason: str) -> str:
+    logger.warning(reason)
+    return reason
+
+def check_tabular_row(row: Dict[str, Any], columns: List[Dict]) -> Optional[str]:
+    """Return the reason a row fails validation, or None if it is valid"""
+    logger.debug("Validating row: %s", row)
+    
+    if not isinstance(row, dict):
+        return _reject("Row is not a JSON object")
     
     for col in columns:
         col_name = col['name']
         value = row.get(col_name)
         
-        logger.debug(f"Checking column '{col_name}' with value '{value}' (type: {type(value)})")
+        logger.debug("Checking column '%s' with value '%s' (type: %s)", col_name, value, type(value))
         
-        # Check existence
-        if value is None:
-            logger.warning(f"Column '{col_name}' is missing or None")
-            return False
+        # Check existence; NaN counts as missing, as it does column-wise
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return _reject(f"Column '{col_name}' is missing or None")
             
         # Convert string values to appropriate types for validation
         expected_type = col['dtype']
-        logger.debug(f"Expected type: {expected_type}, Actual type: {type(value)}")
+        logger.debug("Expected type: %s, Actual type: %s", expected_type, type(value))
         
         try:
             if expected_type == 'int':
@@ -30,8 +40,7 @@ def validate_tabular_row(row: Dict[str, Any], columns: List[Dict]) -> bool:
                 elif isinstance(value, (int, float)):
                     converted_value = int(value)
                 else:
-                    logger.warning(f"Column '{col_name}' cannot be converted to int: {value}")
-                    return False
+                    return _reject(f"Column '{col_name}' cannot be converted to int: {value}")
                     
             elif expected_type == 'float':
                 # Convert string to float for validation
@@ -40,8 +49,7 @@ def validate_tabular_row(row: Dict[str, Any], columns: List[Dict]) -> bool:
                 elif isinstance(value, (int, float)):
                     converted_value = float(value)
                 else:
-                    logger.warning(f"Column '{col_name}' cannot be converted to float: {value}")
-                    return False
+                    return _reject(f"Column '{col_name}' cannot be converted to float: {value}")
                     
             elif expected_type == 'str':
                 # Ensure it's a string
@@ -58,60 +66,161 @@ def validate_tabular_row(row: Dict[str, Any], columns: List[Dict]) -> bool:
                     elif value.lower() in ['false', '0', 'no']:
                         converted_value = False
                     else:
-                        logger.warning(f"Column '{col_name}' cannot be converted to bool: {value}")
-                        return False
+                        return _reject(f"Column '{col_name}' cannot be converted to bool: {value}")
                 elif isinstance(value, bool):
                     converted_value = value
                 else:
-                    logger.warning(f"Column '{col_name}' cannot be converted to bool: {value}")
-                    return False
+                    return _reject(f"Column '{col_name}' cannot be converted to bool: {value}")
             else:
                 converted_value = value
                 
         except (ValueError, TypeError) as e:
-            logger.warning(f"Column '{col_name}' type conversion failed: {e}")
-            return False
+            return _reject(f"Column '{col_name}' type conversion failed: {e}")
             
         # Check validation rule with converted value
         if col['validation']:
-            logger.debug(f"Evaluating validation rule: {col['validation']} for value: {converted_value}")
+            logger.debug("Evaluating validation rule: %s for value: %s", col['validation'], converted_value)
             if not evaluate_rule(converted_value, col['validation']):
-                logger.warning(f"Column '{col_name}' failed validation rule: {col['validation']}")
-                return False
+                return _reject(f"Column '{col_name}' failed validation rule: {col['validation']}")
             
     logger.debug("Row validation passed")
-    return True
+    return None
 
-def validate_qa_pair(qa_pair: Dict) -> bool:
-    logger.debug(f"Validating QA pair: {qa_pair}")
+def check_qa_pair(qa_pair: Dict) -> Optional[str]:
+    """Return the reason a QA pair fails validation, or None if it is valid"""
+    logger.debug("Validating QA pair: %s", qa_pair)
     
     if not isinstance(qa_pair, dict):
-        logger.warning("QA pair is not a dictionary")
-        return False
+        return _reject("QA pair is not a dictionary")
         
     if 'question' not in qa_pair:
-        logger.warning("QA pair missing 'question' field")
-        return False
+        return _reject("QA pair missing 'question' field")
         
     if 'answer' not in qa_pair:
-        logger.warning("QA pair missing 'answer' field")
-        return False
+        return _reject("QA pair missing 'answer' field")
         
     if not isinstance(qa_pair['question'], str):
-        logger.warning("Question is not a string")
-        return False
+        return _reject("Question is not a string")
         
     if not isinstance(qa_pair['answer'], str):
-        logger.warning("Answer is not a string")
-        return False
+        return _reject("Answer is not a string")
         
     if len(qa_pair['question']) <= 5:
-        logger.warning("Question too short")
-        return False
+        return _reject("Question too short")
         
     if len(qa_pair['answer']) <= 5:
-        logger.warning("Answer too short")
-        return False
+        return _reject("Answer too short")
         
     logger.debug("QA pair validation passed")
-    return True
\ No newline at end of file
+    return None
+
+def validate_tabular_row(row: Dict[str, Any], columns: List[Dict]) -> bool:
+    return check_tabular_row(row, columns) is None
+
+def validate_qa_pair(qa_pair: Dict) -> bool:
+    return check_qa_pair(qa_pair) is None
+
+BOOL_TRUE = ['true', '1', 'yes']
+BOOL_FALSE = ['false', '0', 'no']
+
+def _is_type(values: np.ndarray, kind: type) -> np.ndarray:
+    return np.fromiter((type(v) is kind for v in values), dtype=bool, count=len(values))
+
+def _holds_text(series: pd.Series) -> bool:
+    """Whether a column can hold strings; only then is the .str accessor safe"""
+    return series.dtype == object or pd.api.types.is_string_dtype(series)
+
+def _lowered_strings(series: pd.Series) -> pd.Series:
+    """Lowercased text of string values; other values become '' so they match no literal"""
+    is_str = _is_type(series.to_numpy(), str)
+    return series.astype(str).str.lower().where(is_str, '')
+
+def _coerce_column(series: pd.Series, dtype: str):
+    """Coerce a column the way validate_tabular_row coerces single values.
+
+    Returns (converted, ok) where `ok` marks values that could be converted.
+    """
+    if dtype == 'int':
+        if pd.api.types.is_integer_dtype(series) or pd.api.types.is_bool_dtype(series):
+            # Typed frames use nullable dtypes; nulls are rejected by the caller's notna check
+            return series.astype('Int64' if series.hasnans else 'int64'), np.ones(len(series), dtype=bool)
+        numeric = pd.to_numeric(series, errors='coerce')
+        ok = numeric.notna().to_numpy() & np.isfinite(numeric.to_numpy(dtype=float, na_value=np.nan))
+        if _holds_text(series):
+            # int("3.5") fails, so strings must be integer literals
+            is_str = _is_type(series.to_numpy(), str)
+            int_literal = series.astype(str).str.fullmatch(r'\s*[+-]?\d+\s*').to_numpy(dtype=bool)
+            ok &= ~is_str | int_literal
+        return np.trunc(numeric), ok
+
+    if dtype == 'float':
+        if pd.api.types.is_numeric_dtype(series):
+            return series.astype(float), np.ones(len(series), dtype=bool)
+        numeric = pd.to_numeric(series, errors='coerce')
+        return numeric, numeric.notna().to_numpy()
+
+    if dtype == 'str':
+        return series.astype(str), np.ones(len(series), dtype=bool)
+
+    if dtype == 'bool':
+        if pd.api.types.is_bool_dtype(series):
+            return series, np.ones(len(series), dtype=bool)
+        if not _holds_text(series):
+            # Numbers such as 0/1 are not accepted as bools, matching validate_tabular_row
+            return series, np.zeros(len(series), dtype=bool)
+        values = series.to_numpy()
+        lowered = _lowered_strings(series)
+        is_true = lowered.isin(BOOL_TRUE).to_numpy()
+        is_false = lowered.isin(BOOL_FALSE).to_numpy()
+        is_bool = _is_type(values, bool)
+        converted = pd.Series(np.where(is_bool, values, is_true), index=series.index)
+        return converted, is_bool | is_true | is_false
+
+    return series, np.ones(len(series), dtype=bool)
+
+def validate_tabular_batch(rows: Union[List[Dict[str, Any]], pd.DataFrame], columns: List[Dict]) -> Dict[str, Any]:
+    """Validate a whole dataset column-wise.
+
+    Applies the same existence, type-coercion and rule checks as
+    validate_tabular_row, one vectorized pass per column. Returns the
+    per-row validity mask, per-column failure masks and counts.
+    """
+    if isinstance(rows, pd.DataFrame):
+        df = rows
+        row_ok = np.ones(len(df), dtype=bool)
+    else:
+        row_ok = np.fromiter((isinstance(row, dict) for row in rows), dtype=bool, count=len(rows))
+        df = pd.DataFrame([row if ok else {} for row, ok in zip(rows, row_ok)])
+        for col in columns:
+            name = col['name']
+            if col['dtype'] == 'str' and name in df.columns and df[name].dtype != object:
+                # Rows with ints and nulls load as float64; str(value) must see the original ints
+                df[name] = pd.Series([row.get(name) if ok else None for row, ok in zip(rows, row_ok)], dtype=object)
+
+    valid_mask = row_ok.copy()
+    column_masks = {}
+    column_failures = {}
+
+    for col in columns:
+        col_name = col['name']
+        if col_name not in df.columns:
+            col_valid = np.zeros(len(df), dtype=bool)
+        else:
+            series = df[col_name]
+            converted, type_ok = _coerce_column(series, col['dtype'])
+            col_valid = series.notna().to_numpy() & type_ok
+            if col.get('validation'):
+                col_valid &= compile_rule(col['validation']).mask(converted)
+
+        col_valid &= row_ok
+        column_masks[col_name] = col_valid
+        column_failures[col_name] = int(row_ok.sum() - col_valid.sum())
+        valid_mask &= col_valid
+
+    return {
+        "valid_mask": valid_mask,
+        "column_masks": column_masks,
+        "column_failures": column_failures,
+        "valid_count": int(valid_mask.sum()),
+        "invalid_count": int(len(valid_mask) - valid_mask.sum())
+    }
\ No newline at end of file
@@ -37,9 +37,9 @@ class BusinessValueCalculator:
         estimated_time = base_time_per_row * self.metadata['num_items']
         
         # Quality adjustments
-        completeness = self.quality.get('completeness_score', 1.0)
-        validity = 1 - (sum(v for v in self.quality.get('validity', {}).values() 
-                        if isinstance(v, int)) / self.metadata['num_items'])
+        completeness = self.quality.get('completeness', {}).get('completeness_score', 1.0)
+        # Fraction of rows passing every column rule; per-column failure counts can overlap
+        validity = self.quality.get('validity_score', 1.0)
         
         quality_factor = 0.3 * completeness + 0.7 * validity
         adjusted_time = estimated_time * quality_factor
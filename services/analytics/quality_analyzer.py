@@ -1,6 +1,46 @@
+import hashlib
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, List
+from agents.validator import validate_tabular_batch
+from core.dataset import TabularDataset
+from utils.keyword_automaton import KeywordAutomaton
+
+DOMAIN_COVERAGE_KEYWORDS = {
+    'healthcare': ['patient', 'treatment', 'diagnosis', 'medical'],
+    'finance': ['stock', 'investment', 'loan', 'interest'],
+    'technology': ['software', 'code', 'algorithm', 'system']
+}
+
+# One automaton per domain, labelled by keyword, so each question is read once
+coverage_automata = {
+    domain: KeywordAutomaton({keyword: [keyword] for keyword in keywords})
+    for domain, keywords in DOMAIN_COVERAGE_KEYWORDS.items()
+}
+
+def _add_counts(first: Dict[str, int], second: Dict[str, int]) -> Dict[str, int]:
+    counts = dict(first)
+    for key, count in second.items():
+        counts[key] = counts.get(key, 0) + count
+    return counts
+
+def _merge_moments(first: tuple, second: tuple) -> tuple:
+    """Combine (count, mean, M2, min, max) of two batches (Chan et al. parallel variance)"""
+    count_a, mean_a, m2_a, min_a, max_a = first
+    count_b, mean_b, m2_b, min_b, max_b = second
+    if not count_a:
+        return second
+    if not count_b:
+        return first
+    count = count_a + count_b
+    delta = mean_b - mean_a
+    return (
+        count,
+        mean_a + delta * count_b / count,
+        m2_a + m2_b + delta * delta * count_a * count_b / count,
+        min(min_a, min_b),
+        max(max_a, max_b)
+    )
 
 class DataQualityAnalyzer:
     def __init__(self, dataset, dataset_type, request_metadata):
@@ -10,91 +50,161 @@ class DataQualityAnalyzer:
         self.report = {}
     
     def analyze(self) -> Dict[str, Any]:
-        if self.dataset_type == "tabular":
-            self._analyze_tabular()
-        else:
-            self._analyze_qa()
+        self.report = self.finish(self.totals())
         return self.report
     
-    def _analyze_tabular(self):
-        df = pd.DataFrame(self.dataset)
+    def totals(self) -> Dict[str, Any]:
+        """Additive statistics of the dataset; batches combine with `merge_totals` before `finish`"""
+        if self.dataset_type == "tabular":
+            return self._tabular_totals()
+        return self._qa_totals()
+    
+    def finish(self, totals: Dict[str, Any]) -> Dict[str, Any]:
+        """The quality report from the totals of one dataset or of every batch of one"""
+        if self.dataset_type == "tabular":
+            return self._tabular_report(totals)
+        return self._qa_report(totals)
+    
+    @staticmethod
+    def merge_totals(dataset_type: str, first: Dict[str, Any], second: Dict[str, Any]) -> Dict[str, Any]:
+        if dataset_type != "tabular":
+            return {
+                'questions': first['questions'] + second['questions'],
+                'question_lengths': first['question_lengths'] + second['question_lengths'],
+                'answer_lengths': first['answer_lengths'] + second['answer_lengths'],
+                'question_digests': first['question_digests'] | second['question_digests'],
+                'coverage': first['coverage'] + second['coverage'],
+                'complete_answers': first['complete_answers'] + second['complete_answers']
+            }
         
-        # Completeness analysis
-        self.report['completeness'] = {
-            'missing_values': df.isnull().sum().to_dict(),
-            'completeness_score': 1 - (df.isnull().sum().sum() / (len(df) * len(df.columns)))
+        numeric = dict(first['numeric'])
+        for col, stats in second['numeric'].items():
+            numeric[col] = _merge_moments(numeric[col], stats) if col in numeric else stats
+        return {
+            'rows': first['rows'] + second['rows'],
+            'columns': list(dict.fromkeys(first['columns'] + second['columns'])),
+            'cells': first['cells'] + second['cells'],
+            'missing_values': _add_counts(first['missing_values'], second['missing_values']),
+            'column_failures': _add_counts(first['column_failures'], second['column_failures']),
+            'valid_count': first['valid_count'] + second['valid_count'],
+            'numeric': numeric
+        }
+    
+    def _tabular_totals(self) -> Dict[str, Any]:
+        # Generated datasets arrive already typed; plain rows are only framed as they are
+        df = self.dataset.frame if isinstance(self.dataset, TabularDataset) else pd.DataFrame(self.dataset)
+        totals = {
+            'rows': len(df),
+            'columns': list(df.columns),
+            'cells': len(df) * len(df.columns),
+            'missing_values': {col: int(count) for col, count in df.isnull().sum().items()},
+            'column_failures': {},
+            'valid_count': len(df),
+            'numeric': {}
         }
         
-        # Validity analysis
-        validity_issues = {}
-        for col, col_def in zip(df.columns, self.metadata['columns']):
-            if col_def.get('validation'):
-                try:
-                    valid_mask = df[col].apply(
-                        lambda x: self._evaluate_validation(x, col_def['validation'])
-                    )
-                    validity_issues[col] = len(df) - valid_mask.sum()
-                except:
-                    validity_issues[col] = "Validation error"
-        self.report['validity'] = validity_issues
+        # Validity analysis: rule failures per named column, evaluated column-wise in one pass
+        rule_columns = [col for col in self.metadata['columns'] if col.get('validation')]
+        if rule_columns and len(df):
+            validity = validate_tabular_batch(df, rule_columns)
+            totals['column_failures'] = validity["column_failures"]
+            totals['valid_count'] = validity["valid_count"]
         
-        # Distribution analysis
-        self.report['distributions'] = {}
+        # Distribution moments as (count, mean, sum of squared deviations, min, max)
         for col in df.select_dtypes(include=np.number).columns:
-            self.report['distributions'][col] = {
-                'min': df[col].min(),
-                'max': df[col].max(),
-                'mean': df[col].mean(),
-                'std': df[col].std()
+            values = df[col]
+            count = int(values.count())
+            if count:
+                m2 = values.var() * (count - 1) if count > 1 else 0.0
+                totals['numeric'][col] = (count, values.mean(), m2, values.min(), values.max())
+            else:
+                totals['numeric'][col] = (0, np.nan, 0.0, np.nan, np.nan)
+        return totals
+    
+    def _tabular_report(self, totals: Dict[str, Any]) -> Dict[str, Any]:
+        if not totals['rows']:
+            # No valid rows came back; report an empty dataset instead of dividing by zero
+            return {
+                'completeness': {'missing_values': {}, 'completeness_score': 0.0},
+                'validity': {},
+                'validity_score': 0.0,
+                'distributions': {},
+                'use_case_specificity': self._calculate_use_case_specificity(totals['columns'])
+            }
+        
+        rule_columns = [col for col in self.metadata['columns'] if col.get('validation')]
+        report = {
+            'completeness': {
+                'missing_values': totals['missing_values'],
+                'completeness_score': 1 - sum(totals['missing_values'].values()) / totals['cells']
+            },
+            'validity': totals['column_failures'] if rule_columns else {},
+            'validity_score': totals['valid_count'] / totals['rows'] if rule_columns else 1.0,
+            'distributions': {}
+        }
+        for col, (count, mean, m2, low, high) in totals['numeric'].items():
+            report['distributions'][col] = {
+                'min': low,
+                'max': high,
+                'mean': mean,
+                'std': np.sqrt(m2 / (count - 1)) if count > 1 else np.nan
             }
         
         # Use-case specificity
-        self.report['use_case_specificity'] = self._calculate_use_case_specificity(df)
+        report['use_case_specificity'] = self._calculate_use_case_specificity(totals['columns'])
+        return report
     
-    def _analyze_qa(self):
-        # Question quality metrics
+    def _qa_totals(self) -> Dict[str, Any]:
         questions = [pair['question'] for pair in self.dataset]
         answers = [pair['answer'] for pair in self.dataset]
-        
-        self.report = {
+        return {
+            'questions': len(questions),
             'question_lengths': [len(q) for q in questions],
             'answer_lengths': [len(a) for a in answers],
-            'question_uniqueness': len(set(questions)) / len(questions),
-            'domain_coverage': self._calculate_domain_coverage(questions),
-            'answer_completeness': sum(1 for a in answers if len(a) > 15) / len(answers)
+            # Digests rather than the text, so uniqueness across batches costs a few bytes per question
+            'question_digests': {hashlib.blake2b(q.encode(), digest_size=8).digest() for q in questions},
+            'coverage': self._count_domain_keywords(questions),
+            'complete_answers': sum(1 for a in answers if len(a) > 15)
         }
     
-    def _evaluate_validation(self, value, rule: str) -> bool:    
-        """Non-blocking validation check"""
-        if not rule:
-            return True
-        return True  
+    def _qa_report(self, totals: Dict[str, Any]) -> Dict[str, Any]:
+        count = totals['questions']
+        if not count:
+            # Every batch came back short; report an empty dataset instead of dividing by zero
+            return {
+                'question_lengths': [],
+                'answer_lengths': [],
+                'question_uniqueness': 0.0,
+                'domain_coverage': 0.0,
+                'answer_completeness': 0.0
+            }
+        
+        return {
+            'question_lengths': totals['question_lengths'],
+            'answer_lengths': totals['answer_lengths'],
+            'question_uniqueness': len(totals['question_digests']) / count,
+            'domain_coverage': totals['coverage'] / count,
+            'answer_completeness': totals['complete_answers'] / count
+        }
     
-    def _calculate_use_case_specificity(self, df) -> float:
+    def _calculate_use_case_specificity(self, columns: List[str]) -> float:
         """Calculate how well data matches use-case description"""
         # Implement domain-specific checks
         use_case = self.metadata['use_case'].lower()
         specificity_score = 0.5  # Base score
         
         if 'customer' in use_case:
-            if 'name' in df.columns and 'email' in df.columns:
+            if 'name' in columns and 'email' in columns:
                 specificity_score += 0.3
-            if 'purchase' in use_case and 'transaction_amount' in df.columns:
+            if 'purchase' in use_case and 'transaction_amount' in columns:
                 specificity_score += 0.2
         
         return min(1.0, specificity_score)
     
-    def _calculate_domain_coverage(self, questions) -> float:
-        """Calculate domain coverage for QA datasets"""
+    def _count_domain_keywords(self, questions) -> int:
+        """Domain keywords mentioned, counting each distinct keyword once per question"""
         domain = self.metadata['domain'].lower()
-        keywords = {
-            'healthcare': ['patient', 'treatment', 'diagnosis', 'medical'],
-            'finance': ['stock', 'investment', 'loan', 'interest'],
-            'technology': ['software', 'code', 'algorithm', 'system']
-        }
-        
-        coverage = 0
-        for key in keywords.get(domain, []):
-            coverage += sum(1 for q in questions if key in q.lower())
-        
-        return coverage / len(questions)
\ No newline at end of file
+        automaton = coverage_automata.get(domain)
+        if automaton is None:
+            return 0
+        return sum(len(automaton.labels(q)) for q in questions)
@@ -0,0 +1,79 @@
+import json
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Column definitions shared by every tabular fixture, in request form
+TABULAR_COLUMNS = [
+    {"name": "customer_id", "dtype": "int", "description": "Unique id", "validation": ">= 1", "options": None},
+    {"name": "name", "dtype": "str", "description": "Full name", "validation": "len(value) >= 3", "options": None},
+    {"name": "email", "dtype": "str", "description": "Contact email", "validation": "", "options": None},
+    {"name": "age", "dtype": "int", "description": "Age in years", "validation": ">=18 and <=90", "options": None},
+    {"name": "segment", "dtype": "str", "description": "Customer segment", "validation": "",
+     "options": ["retail", "business", "enterprise"]},
+    {"name": "transaction_amount", "dtype": "float", "description": "Last purchase", "validation": ">= 0",
+     "options": None},
+    {"name": "active", "dtype": "bool", "description": "Has an active plan", "validation": "", "options": None},
+    {"name": "notes", "dtype": "str", "description": "Free-text notes", "validation": "", "options": None}
+]
+
+FIRST_NAMES = np.array(["Ana", "Ben", "Chen", "Dara", "Eli", "Fay", "Gus", "Hana", "Ivo", "Jo"])
+LAST_NAMES = np.array(["Moss", "Reyes", "Okafor", "Lund", "Patel", "Novak", "Kim", "Silva"])
+
+# Mostly clean notes; a few carry PII, company and drug names so guardrails have work to do
+NOTES = np.array([
+    "Prefers email contact", "Asked about the loyalty program", "No issues reported",
+    "Renewal due next quarter", "Requested an invoice copy", "Interested in premium support",
+    "Called from 555-123-4567", "SSN on file 123-45-6789", "Works at Google",
+    "Takes Tylenol daily", "Ships to 12 Main Street", "Paid $25000 upfront"
+])
+NOTE_WEIGHTS = np.array([0.16, 0.16, 0.16, 0.16, 0.15, 0.15, 0.01, 0.01, 0.01, 0.01, 0.01, 0.01])
+
+QA_TOPICS = np.array(["loan", "interest", "stock", "investment", "budget", "credit score", "savings", "tax"])
+QA_TEMPLATES = np.array([
+    "What is a {topic}?", "How does {topic} affect a household?", "When should you review your {topic}?",
+    "Why does {topic} matter for small businesses?"
+])
+
+def tabular_rows(num_rows: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Deterministic generated rows matching TABULAR_COLUMNS, about 2% invalid"""
+    rng = np.random.default_rng(seed)
+    names = np.char.add(np.char.add(rng.choice(FIRST_NAMES, num_rows), " "), rng.choice(LAST_NAMES, num_rows))
+    ids = np.arange(1, num_rows + 1)
+    ages = rng.integers(18, 91, num_rows)
+    ages[rng.random(num_rows) < 0.02] = 12  # fails ">=18 and <=90"
+
+    frame = pd.DataFrame({
+        "customer_id": ids,
+        "name": names,
+        "age": ages,
+        "segment": rng.choice(["retail", "business", "enterprise"], num_rows),
+        "transaction_amount": np.round(rng.gamma(2.0, 120.0, num_rows), 2),
+        "active": rng.random(num_rows) < 0.7,
+        "notes": rng.choice(NOTES, num_rows, p=NOTE_WEIGHTS)
+    })
+    frame.insert(2, "email", frame["name"].str.lower().str.replace(" ", ".", regex=False)
+                 + frame["customer_id"].astype(str) + "@example.com")
+    return frame.to_dict(orient="records")
+
+def qa_pairs(num_pairs: int, seed: int = 0) -> List[Dict[str, str]]:
+    """Deterministic finance QA pairs"""
+    rng = np.random.default_rng(seed)
+    topics = rng.choice(QA_TOPICS, num_pairs)
+    templates = rng.choice(QA_TEMPLATES, num_pairs)
+    return [
+        {
+            "question": template.format(topic=topic),
+            "answer": f"A {topic} should be reviewed against income, costs and goals; case {i} applies."
+        }
+        for i, (topic, template) in enumerate(zip(topics, templates))
+    ]
+
+def model_response(items: List[Dict[str, Any]]) -> str:
+    """Items wrapped the way a model typically answers: prose around a fenced JSON array"""
+    return "Here is the generated data:\n```json\n" + json.dumps(items) + "\n```\nLet me know if you need more."
+
+def enhanced_payload(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Minimal payload in the shape the writers receive"""
+    return {"data": items, "metadata": {"generated_at": "benchmark", "guardrails_version": "1.0"}}
@@ -0,0 +1,70 @@
+"""Checks that the column-wise validator agrees with the per-row one.
+
+Run from services/:
+
+    python -m benchmarks.parity
+
+Every dtype is validated over columns of mixed value types (numbers, numeric
+and non-numeric strings, bools, nulls, containers), alone and under a rule,
+with validate_tabular_batch and validate_tabular_row. The exit status is 1
+when any row gets a different verdict.
+"""
+import logging
+import sys
+from typing import Any, Dict, List
+
+from agents.validator import validate_tabular_batch, validate_tabular_row
+
+MIXED_VALUES: List[Any] = [
+    0, 1, 2, -7, 42, 1.0, 0.0, 3.5, -2.25, float("nan"),
+    True, False, None,
+    "0", "1", "42", " 7 ", "+3", "-4", "3.5", "1e3", "abc", "", "true", "False", "YES", "no",
+    "2024-01-01", [1], {"a": 1}
+]
+
+# (dtype, validation rule) pairs checked over every column variant
+CASES = [
+    ("int", ""), ("int", ">= 1"),
+    ("float", ""), ("float", "> 0"),
+    ("str", ""), ("str", "len(value) >= 2"),
+    ("bool", ""), ("bool", "value == True"),
+    ("datetime", "")
+]
+
+def column_variants() -> Dict[str, List[Any]]:
+    """The mixed column plus homogeneous slices, so dtype-specific fast paths are exercised too"""
+    return {
+        "mixed": MIXED_VALUES,
+        "ints": [v for v in MIXED_VALUES if type(v) is int],
+        "floats": [v for v in MIXED_VALUES if type(v) is float],
+        "bools": [v for v in MIXED_VALUES if type(v) is bool],
+        "strings": [v for v in MIXED_VALUES if type(v) is str],
+        "numbers_and_nulls": [v for v in MIXED_VALUES if v is None or type(v) in (int, float)]
+    }
+
+def mismatches() -> List[str]:
+    found = []
+    for dtype, rule in CASES:
+        columns = [{"name": "value", "dtype": dtype, "validation": rule}]
+        for variant, values in column_variants().items():
+            rows = [{"value": value} for value in values]
+            batch = validate_tabular_batch(rows, columns)["valid_mask"]
+            for row, batch_ok in zip(rows, batch):
+                try:
+                    row_ok = validate_tabular_row(row, columns)
+                except Exception as e:
+                    row_ok = f"raised {type(e).__name__}"
+                if row_ok != bool(batch_ok):
+                    found.append(f"{dtype} {rule!r} [{variant}] {row['value']!r}: row={row_ok} batch={bool(batch_ok)}")
+    return found
+
+def main() -> int:
+    logging.disable(logging.WARNING)
+    found = mismatches()
+    for mismatch in found:
+        print(mismatch)
+    print(f"{len(found)} mismatches" if found else "Validators agree")
+    return 1 if found else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
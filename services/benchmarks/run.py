@@ -0,0 +1,208 @@
+"""Per-stage micro-benchmarks over synthetic fixtures.
+
+Run from services/:
+
+    python -m benchmarks.run                     # standard profile, compare to baseline.json
+    python -m benchmarks.run --profile full      # adds the 1M-row fixtures
+    python -m benchmarks.run --update-baseline   # record the current numbers as the baseline
+
+Each stage is timed (median of --repeat runs) and then run once more under
+tracemalloc for its peak Python allocation. Stages slower or using more
+memory than their baseline beyond the tolerances are measured again, and
+the exit status is 1 when any of them is still over.
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from agents.validator import validate_tabular_batch
+from analytics.quality_analyzer import DataQualityAnalyzer
+from benchmarks.fixtures import TABULAR_COLUMNS, enhanced_payload, model_response, qa_pairs, tabular_rows
+from core.dataset import TabularDataset
+from core.file_writer import write_tabular
+from guardrails.content_safety import ContentGuard
+from guardrails.ethical_guidelines import EthicalEnforcer
+from utils.gemini_client import extract_json_from_response
+from utils.validation_rules import compile_rule, evaluate_rule
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+PROFILES = {
+    "quick": {"tabular": [1_000], "qa": [500]},
+    "standard": {"tabular": [1_000, 100_000], "qa": [500, 50_000]},
+    "full": {"tabular": [1_000, 100_000, 1_000_000], "qa": [500, 50_000]}
+}
+
+AGE_RULE = next(col["validation"] for col in TABULAR_COLUMNS if col["name"] == "age")
+
+def _write_tabular(fixture: Dict[str, Any]):
+    path = write_tabular(fixture["payload"], TABULAR_COLUMNS, "csv")
+    os.remove(path)
+
+def _evaluate_rule(fixture: Dict[str, Any]):
+    for value in fixture["ages"]:
+        evaluate_rule(value, AGE_RULE)
+
+# (stage name, fixture kind, work); work receives the prepared fixture
+STAGES: List[Tuple[str, str, Callable[[Dict[str, Any]], Any]]] = [
+    ("tabular_dataset", "tabular", lambda f: TabularDataset.from_rows(f["rows"], TABULAR_COLUMNS)),
+    ("write_tabular", "tabular", _write_tabular),
+    ("quality_analyzer", "tabular", lambda f: DataQualityAnalyzer(
+        f["rows"], "tabular", {"columns": TABULAR_COLUMNS, "use_case": "customer purchases", "num_items": len(f["rows"])}
+    ).analyze()),
+    ("validator", "tabular", lambda f: validate_tabular_batch(f["rows"], TABULAR_COLUMNS)),
+    ("content_guard", "tabular", lambda f: ContentGuard().check(f["rows"], domain="finance")),
+    ("ethical_enforcer", "tabular", lambda f: EthicalEnforcer().validate(f["rows"], domain="finance")),
+    ("evaluate_rule", "tabular", _evaluate_rule),
+    ("evaluate_rule_mask", "tabular", lambda f: compile_rule(AGE_RULE).mask(f["ages"])),
+    ("extract_json", "tabular", lambda f: extract_json_from_response(f["response"])),
+    ("quality_analyzer", "qa", lambda f: DataQualityAnalyzer(
+        f["rows"], "qa", {"domain": "finance", "complexity": "beginner", "num_items": len(f["rows"])}
+    ).analyze()),
+    ("content_guard", "qa", lambda f: ContentGuard().check(f["rows"], domain="finance")),
+    ("ethical_enforcer", "qa", lambda f: EthicalEnforcer().validate(f["rows"], domain="finance")),
+    ("extract_json", "qa", lambda f: extract_json_from_response(f["response"]))
+]
+
+def build_fixture(kind: str, size: int) -> Dict[str, Any]:
+    rows = tabular_rows(size) if kind == "tabular" else qa_pairs(size)
+    fixture = {"rows": rows, "response": model_response(rows)}
+    if kind == "tabular":
+        fixture["payload"] = enhanced_payload(rows)
+        fixture["ages"] = [row["age"] for row in rows]
+    return fixture
+
+def _size_label(size: int) -> str:
+    if size >= 1_000_000:
+        return f"{size // 1_000_000}M"
+    if size >= 1_000:
+        return f"{size // 1_000}k"
+    return str(size)
+
+def measure(work: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Median wall time over `repeat` runs, then one traced run for peak allocated memory"""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        work()
+        timings.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        work()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": round(statistics.median(timings), 5), "peak_mb": round(peak / 2 ** 20, 3)}
+
+def run(profile: str, repeat: int, only: List[str] = None, keys: List[str] = None) -> Dict[str, Dict[str, float]]:
+    """Results keyed "kind/stage/size"; `only` limits the stage names and `keys` the exact results"""
+    results = {}
+    for kind, sizes in PROFILES[profile].items():
+        for size in sizes:
+            stages = [(name, work) for name, stage_kind, work in STAGES
+                      if stage_kind == kind and (not only or name in only)
+                      and (keys is None or f"{kind}/{name}/{_size_label(size)}" in keys)]
+            if not stages:
+                continue
+            fixture = build_fixture(kind, size)
+            # Large fixtures are timed once; a single run already takes long enough to be stable
+            runs = repeat if size <= 10_000 else 1
+            for name, work in stages:
+                key = f"{kind}/{name}/{_size_label(size)}"
+                results[key] = measure(lambda: work(fixture), runs)
+                print(f"{key:<40} {results[key]['seconds']:>10.4f}s {results[key]['peak_mb']:>10.2f} MB", flush=True)
+            fixture = None
+    return results
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            time_tolerance: float, memory_tolerance: float) -> Dict[str, List[str]]:
+    """Regressions past the tolerances by result key; tiny absolute differences are treated as noise"""
+    regressions = {}
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        if (current["seconds"] > previous["seconds"] * (1 + time_tolerance)
+                and current["seconds"] - previous["seconds"] > 0.005):
+            regressions.setdefault(key, []).append(f"{previous['seconds']:.4f}s -> {current['seconds']:.4f}s")
+        if (current["peak_mb"] > previous["peak_mb"] * (1 + memory_tolerance)
+                and current["peak_mb"] - previous["peak_mb"] > 1):
+            regressions.setdefault(key, []).append(f"{previous['peak_mb']:.2f} MB -> {current['peak_mb']:.2f} MB")
+    return regressions
+
+def load_baseline(path: str) -> Dict[str, Dict[str, float]]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("results", {})
+
+def save_baseline(path: str, results: Dict[str, Dict[str, float]]):
+    merged = {**load_baseline(path), **results}
+    with open(path, "w") as f:
+        json.dump({
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": dict(sorted(merged.items()))
+        }, f, indent=2)
+        f.write("\n")
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="GeniQ per-stage benchmarks")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="standard")
+    parser.add_argument("--stage", action="append", help="Only run this stage (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per stage on small fixtures")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--time-tolerance", type=float, default=0.5, help="Allowed slowdown, 0.5 = 50%%")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25, help="Allowed peak memory growth")
+    parser.add_argument("--output", help="Also write the results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    # Stage code logs every call at INFO; keep the report readable
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = run(args.profile, max(1, args.repeat), args.stage)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        save_baseline(args.baseline, results)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    missing = [key for key in results if key not in baseline]
+    if missing:
+        print(f"No baseline for {len(missing)} stage(s); run with --update-baseline to record them")
+
+    regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+    if regressions:
+        # A single slow measurement is often noise on a busy machine; only report stages that are slow again
+        print(f"Measuring {len(regressions)} stage(s) again to confirm")
+        rerun = run(args.profile, args.repeat, args.stage, keys=list(regressions))
+        regressions = compare(rerun, baseline, args.time_tolerance, args.memory_tolerance)
+    if regressions:
+        print("Regressions:")
+        for key, changes in regressions.items():
+            for change in changes:
+                print(f"  {key}: {change}")
+        return 1
+    print("No regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
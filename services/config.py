@@ -1,17 +1,82 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class Config:
     GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+    # Model backend: "gemini" or "synthetic" (offline, for benchmarks and load tests)
+    MODEL_BACKEND = os.getenv("MODEL_BACKEND", "gemini")
+    SYNTHETIC_BACKEND = {
+        "latency_seconds": float(os.getenv("SYNTHETIC_LATENCY_SECONDS", "0")),
+        "latency_jitter_seconds": float(os.getenv("SYNTHETIC_LATENCY_JITTER_SECONDS", "0")),
+        "failure_rate": float(os.getenv("SYNTHETIC_FAILURE_RATE", "0")),
+        "seed": int(os.getenv("SYNTHETIC_SEED", "0"))
+    }
     MAX_REGENERATION_ATTEMPTS = 3
     MAX_ROWS = 1000
     MAX_QA_PAIRS = 500
+    # Batched generation: each model call produces at most one batch
+    TABULAR_BATCH_SIZE = int(os.getenv("TABULAR_BATCH_SIZE", "25"))
+    QA_BATCH_SIZE = int(os.getenv("QA_BATCH_SIZE", "10"))
+    GENERATION_MAX_CONCURRENCY = int(os.getenv("GENERATION_MAX_CONCURRENCY", "8"))
+    # Time budget for all model calls of one request, retries and backoff included; 0 disables it
+    GENERATION_TIMEOUT_SECONDS = float(os.getenv("GENERATION_TIMEOUT_SECONDS", "600"))
+    # Shared scheduler for every model call: rate limit, adaptive concurrency, retries
+    MODEL_SCHEDULER = {
+        "requests_per_minute": float(os.getenv("MODEL_REQUESTS_PER_MINUTE", "300")),
+        "burst": int(os.getenv("MODEL_REQUEST_BURST", "10")),
+        "initial_concurrency": int(os.getenv("MODEL_INITIAL_CONCURRENCY", "8")),
+        "min_concurrency": int(os.getenv("MODEL_MIN_CONCURRENCY", "1")),
+        "max_concurrency": int(os.getenv("MODEL_MAX_CONCURRENCY", "32")),
+        "max_retries": int(os.getenv("MODEL_MAX_RETRIES", "4")),
+        "base_delay": float(os.getenv("MODEL_RETRY_BASE_DELAY_SECONDS", "0.5")),
+        "max_delay": float(os.getenv("MODEL_RETRY_MAX_DELAY_SECONDS", "20")),
+        "call_timeout": float(os.getenv("MODEL_CALL_TIMEOUT_SECONDS", "120"))
+    }
+    # Cache of generated payloads keyed by normalized request; set directory to "" for memory only
+    RESPONSE_CACHE = {
+        "enabled": os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true",
+        "memory_entries": int(os.getenv("RESPONSE_CACHE_MEMORY_ENTRIES", "64")),
+        "directory": os.getenv("RESPONSE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "geniq_cache")),
+        "max_disk_bytes": int(os.getenv("RESPONSE_CACHE_MAX_DISK_BYTES", str(256 * 1024 * 1024))),
+        "ttl_seconds": int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600")),
+        # Streamed generations are only cached up to this many items; larger ones aren't held in memory
+        "max_stream_items": int(os.getenv("RESPONSE_CACHE_MAX_STREAM_ITEMS", "1000"))
+    }
+    # Background generation jobs (POST /jobs)
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+    JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+    JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+    # Post-generation analytics and guardrail stages run in this pool ("thread" or "process")
+    REPORT_EXECUTOR = os.getenv("REPORT_EXECUTOR", "thread")
+    REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "4"))
+    # Generated datasets, kept for re-download by dataset id (GET /datasets/{id})
+    ARTIFACT_STORE = {
+        "directory": os.getenv("ARTIFACT_DIR", os.path.join(tempfile.gettempdir(), "geniq_artifacts")),
+        "max_bytes": int(os.getenv("ARTIFACT_MAX_BYTES", str(1024 * 1024 * 1024))),
+        "ttl_seconds": int(os.getenv("ARTIFACT_TTL_SECONDS", "86400"))
+    }
+    # Compressed downloads (gzip/zstd); variants are cached next to the artifact
+    ARTIFACT_COMPRESSION = {
+        "gzip_level": int(os.getenv("ARTIFACT_GZIP_LEVEL", "6")),
+        "zstd_level": int(os.getenv("ARTIFACT_ZSTD_LEVEL", "3"))
+    }
     GUARDRAIL_SETTINGS = {
-        "pii_threshold": 0.85,
+        "pii_threshold": 0.85,  # Min share of items free of PII findings
         "max_ethics_violations": 0.05,  # Max 5% violations
-        "blocked_domains": ["weapons", "illegal_drugs"]
+        # Check both budgets per generated batch and abort a generation that exceeds them
+        "enforce_budgets": os.getenv("GUARDRAIL_ENFORCE_BUDGETS", "true").lower() == "true",
+        # Ethical rules reported but not counted against the budget: the ICD-10 check flags
+        # any mention of a condition or disease without a code, which is ordinary vocabulary
+        "budget_exempt_rules": ["diagnosis_codes_must_be_icd_10_compliant"],
+        "budget_min_items": int(os.getenv("GUARDRAIL_BUDGET_MIN_ITEMS", "100")),
+        "blocked_domains": ["weapons", "illegal_drugs"],
+        # Scan field values column by column instead of each row's str() form
+        "scan_fields": os.getenv("GUARDRAIL_SCAN_FIELDS", "false").lower() == "true",
+        # Copy flagged items into guardrail reports instead of referencing them by row index
+        "verbose_reports": os.getenv("GUARDRAIL_VERBOSE_REPORTS", "false").lower() == "true"
     }
     FEEDBACK_ANALYSIS_DAYS = 30
 
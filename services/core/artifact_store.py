@@ -0,0 +1,198 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Download file name (without extension) for each dataset type
+DATASET_FILENAMES = {"tabular": "tabular_dataset", "qa": "qa_pairs"}
+
+_META_FILE = "meta.json"
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+@lru_cache(maxsize=256)
+def _sha256(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def file_sha256(path: str) -> str:
+    """Content hash of a file, cached until the file changes"""
+    stat = os.stat(path)
+    return _sha256(path, stat.st_mtime_ns, stat.st_size)
+
+def strong_etag(path: str) -> str:
+    """Strong ETag for a file, derived from its content"""
+    return f'"{file_sha256(path)}"'
+
+class Artifact:
+    """One generated dataset file kept in the artifact store"""
+
+    def __init__(self, dataset_id: str, dataset_type: str, format: str, path: str,
+                 created_at: float = None, size: int = 0, sha256: str = None):
+        self.id = dataset_id
+        self.dataset_type = dataset_type
+        self.format = format
+        self.path = path
+        self.created_at = created_at if created_at is not None else time.time()
+        self.size = size
+        self.sha256 = sha256
+
+    @property
+    def filename(self) -> str:
+        return os.path.basename(self.path)
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.sha256}"' if self.sha256 else strong_etag(self.path)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "dataset_type": self.dataset_type,
+            "format": self.format,
+            "filename": self.filename,
+            "created_at": self.created_at,
+            "size": self.size,
+            "sha256": self.sha256
+        }
+
+class ArtifactStore:
+    """Generated datasets kept on disk under a dataset id, one directory per dataset.
+
+    Each directory holds the artifact, any compressed variants of it and a
+    meta.json record. Datasets expire `ttl_seconds` after they were created;
+    past `max_bytes` the least recently downloaded ones are evicted first.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 1024 * 1024 * 1024, ttl_seconds: float = 86400):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _dataset_dir(self, dataset_id: str) -> str:
+        return os.path.join(self.directory, dataset_id)
+
+    def save(self, dataset_type: str, format: str, write: Callable[[str], Any]) -> Artifact:
+        """Assign a dataset id, let `write` create the file at the artifact path and record it"""
+        dataset_id = str(uuid.uuid4())
+        dataset_dir = self._dataset_dir(dataset_id)
+        os.makedirs(dataset_dir)
+        artifact = Artifact(
+            dataset_id, dataset_type, format,
+            os.path.join(dataset_dir, f"{DATASET_FILENAMES[dataset_type]}.{format}")
+        )
+
+        try:
+            write(artifact.path)
+            artifact.size = os.path.getsize(artifact.path)
+            artifact.sha256 = file_sha256(artifact.path)
+            meta_path = os.path.join(dataset_dir, _META_FILE)
+            with open(f"{meta_path}.tmp", "w") as f:
+                json.dump(artifact.to_dict(), f)
+            os.replace(f"{meta_path}.tmp", meta_path)
+        except BaseException:
+            shutil.rmtree(dataset_dir, ignore_errors=True)
+            raise
+
+        logger.info(f"Stored {dataset_type} dataset {dataset_id} ({artifact.size} bytes)")
+        self.evict(keep=dataset_id)
+        return artifact
+
+    def get(self, dataset_id: str) -> Optional[Artifact]:
+        """The stored artifact, or None when the id is unknown, expired or evicted"""
+        try:
+            dataset_id = str(uuid.UUID(dataset_id))
+        except ValueError:
+            return None
+
+        dataset_dir = self._dataset_dir(dataset_id)
+        meta_path = os.path.join(dataset_dir, _META_FILE)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable dataset {dataset_id}: {e}")
+            shutil.rmtree(dataset_dir, ignore_errors=True)
+            return None
+
+        artifact = Artifact(
+            dataset_id, meta["dataset_type"], meta["format"], os.path.join(dataset_dir, meta["filename"]),
+            meta["created_at"], meta["size"], meta.get("sha256")
+        )
+        if time.time() - artifact.created_at > self.ttl_seconds or not os.path.exists(artifact.path):
+            shutil.rmtree(dataset_dir, ignore_errors=True)
+            return None
+        # Touch the record, not the artifact, so size-based eviction drops least recently used datasets first
+        os.utime(meta_path)
+        return artifact
+
+    def evict(self, keep: str = None):
+        """Drop expired datasets, then the least recently used ones until under the size limit"""
+        with self._lock:
+            now = time.time()
+            entries = []
+            for dataset_id in os.listdir(self.directory):
+                dataset_dir = self._dataset_dir(dataset_id)
+                meta_path = os.path.join(dataset_dir, _META_FILE)
+                try:
+                    accessed = os.path.getmtime(meta_path)
+                    with open(meta_path) as f:
+                        created_at = json.load(f)["created_at"]
+                except FileNotFoundError:
+                    # Still being written, or left behind by a failed write once it is old enough
+                    try:
+                        if now - os.path.getmtime(dataset_dir) > self.ttl_seconds:
+                            shutil.rmtree(dataset_dir, ignore_errors=True)
+                    except FileNotFoundError:
+                        pass
+                    continue
+                except (OSError, ValueError, KeyError):
+                    shutil.rmtree(dataset_dir, ignore_errors=True)
+                    continue
+
+                if now - created_at > self.ttl_seconds and dataset_id != keep:
+                    shutil.rmtree(dataset_dir, ignore_errors=True)
+                else:
+                    entries.append((accessed, self._dir_size(dataset_dir), dataset_id))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, dataset_id in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if dataset_id == keep:
+                    continue
+                logger.info(f"Evicting dataset {dataset_id} ({size} bytes)")
+                shutil.rmtree(self._dataset_dir(dataset_id), ignore_errors=True)
+                total -= size
+
+    @staticmethod
+    def _dir_size(path: str) -> int:
+        total = 0
+        for name in os.listdir(path):
+            try:
+                total += os.path.getsize(os.path.join(path, name))
+            except FileNotFoundError:
+                pass
+        return total
+
+artifact_store = ArtifactStore(
+    directory=config.ARTIFACT_STORE["directory"],
+    max_bytes=config.ARTIFACT_STORE["max_bytes"],
+    ttl_seconds=config.ARTIFACT_STORE["ttl_seconds"]
+)
@@ -0,0 +1,111 @@
+import gzip
+import logging
+import os
+import shutil
+import tempfile
+from typing import Dict, Optional
+
+from config import config
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstd downloads are unavailable without it
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Encoding -> (file suffix, media type of the compressed file as an attachment)
+ENCODINGS = {
+    "zstd": (".zst", "application/zstd"),
+    "gzip": (".gz", "application/gzip")
+}
+# Values of the `compression` parameter that ask for the file as written
+IDENTITY = ("none", "identity")
+
+CHUNK_SIZE = 1024 * 1024
+
+def available_encodings() -> list:
+    """Supported encodings in order of preference"""
+    return [encoding for encoding in ENCODINGS if encoding != "zstd" or zstandard is not None]
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    """{coding: q} from an Accept-Encoding header"""
+    weights = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    return weights
+
+def negotiate_encoding(requested: Optional[str] = None, accept_encoding: Optional[str] = None) -> Optional[str]:
+    """Encoding to serve an artifact with, or None for the file as written.
+
+    An explicit `requested` encoding wins and raises ValueError when it is
+    unknown or unavailable; otherwise the best available coding accepted by
+    the client is used, preferring zstd over gzip at equal weight.
+    """
+    if requested:
+        requested = requested.strip().lower()
+        if requested in IDENTITY:
+            return None
+        if requested not in ENCODINGS:
+            raise ValueError(f"Unsupported compression: {requested}")
+        if requested not in available_encodings():
+            raise ValueError(f"Compression {requested} is not available on this server")
+        return requested
+
+    if not accept_encoding:
+        return None
+    weights = _parse_accept_encoding(accept_encoding)
+    best, best_q = None, 0.0
+    for encoding in available_encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+def compressed_path(path: str, encoding: str) -> str:
+    return path + ENCODINGS[encoding][0]
+
+def _compress_stream(source, target, encoding: str):
+    settings = config.ARTIFACT_COMPRESSION
+    if encoding == "gzip":
+        # mtime=0 keeps the output byte-identical for identical input
+        with gzip.GzipFile(fileobj=target, mode="wb", compresslevel=settings["gzip_level"], mtime=0) as writer:
+            shutil.copyfileobj(source, writer, CHUNK_SIZE)
+    else:
+        compressor = zstandard.ZstdCompressor(level=settings["zstd_level"])
+        compressor.copy_stream(source, target, read_size=CHUNK_SIZE, write_size=CHUNK_SIZE)
+
+def compress_file(path: str, encoding: str) -> str:
+    """Path of the compressed variant of an artifact, creating it when missing or stale.
+
+    The file is compressed in fixed-size chunks, so memory stays bounded
+    regardless of its size, and written under a temporary name before being
+    moved into place, so concurrent downloads never see a partial variant.
+    """
+    target = compressed_path(path, encoding)
+    if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+        return target
+
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or None, suffix=ENCODINGS[encoding][0] + ".tmp")
+    try:
+        with open(path, "rb") as source, os.fdopen(fd, "wb") as out:
+            _compress_stream(source, out, encoding)
+        os.replace(temp_path, target)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    logger.info(f"Compressed {path} with {encoding}: {os.path.getsize(path)} -> {os.path.getsize(target)} bytes")
+    return target
@@ -0,0 +1,117 @@
+import logging
+from datetime import date
+from typing import Any, Dict, Iterator, List, Union
+
+import numpy as np
+import pandas as pd
+
+from agents.validator import BOOL_TRUE, BOOL_FALSE
+
+logger = logging.getLogger(__name__)
+
+def typed_column(series: pd.Series, dtype: str) -> pd.Series:
+    """Values of one column in the nullable pandas dtype matching a column definition.
+
+    Conversions follow the validator: ints are truncated like int(value) and
+    bools accept the BOOL_TRUE/BOOL_FALSE spellings. Values that can't be
+    converted become null, so each column keeps its defined type.
+    """
+    if dtype in ('int', 'float'):
+        numeric = pd.to_numeric(series, errors='coerce')
+        if dtype == 'float':
+            return numeric.astype('float64')
+        if pd.api.types.is_integer_dtype(numeric):
+            return numeric.astype('Int64')
+        return np.trunc(numeric.astype('float64')).astype('Int64')
+    if dtype == 'bool':
+        if pd.api.types.is_bool_dtype(series):
+            return series.astype('boolean')
+        lowered = series.astype(str).str.lower()
+        typed = pd.Series(pd.NA, index=series.index, dtype='boolean')
+        typed[lowered.isin(BOOL_TRUE)] = True
+        typed[lowered.isin(BOOL_FALSE)] = False
+        return typed
+    if dtype == 'datetime':
+        # Naive timestamps are taken as UTC so every dataset shares one timezone-aware type
+        parsed = pd.to_datetime(series, errors='coerce', utc=True, format='mixed')
+        dropped = int((parsed.isna() & series.notna()).sum())
+        if dropped:
+            logger.warning(f"Column '{series.name}' has {dropped} values that aren't datetimes; setting them to null")
+        return parsed
+    return series.where(series.isna(), series.astype(str)).astype('string')
+
+def _isoformat(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, date) else value
+
+class TabularDataset:
+    """A generated table held column-wise, typed once from its column definitions.
+
+    Every defined column is present, in definition order, with the nullable
+    dtype from `typed_column`; columns the model added beyond the
+    definitions follow unchanged. Validation, analytics, guardrails and the
+    writers all read `frame`; `records()` gives the rows as plain Python
+    values for JSON output and the response cache.
+    """
+
+    def __init__(self, frame: pd.DataFrame, columns: List[Dict]):
+        self.frame = frame
+        self.columns = columns
+        self._records = None
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]], columns: List[Dict]) -> "TabularDataset":
+        raw = pd.DataFrame(list(rows))
+        typed = {}
+        for col in columns:
+            series = raw[col['name']] if col['name'] in raw.columns else pd.Series([None] * len(raw), dtype=object)
+            typed[col['name']] = typed_column(series, col['dtype'])
+        for name in raw.columns:
+            if name not in typed:
+                typed[name] = raw[name]
+        return cls(pd.DataFrame(typed, index=pd.RangeIndex(len(raw))), columns)
+
+    @classmethod
+    def concat(cls, parts: List["TabularDataset"], columns: List[Dict]) -> "TabularDataset":
+        """One dataset from typed batches, without coercing any value again"""
+        if not parts:
+            return cls.from_rows([], columns)
+        frames = [part.frame for part in parts]
+        if len(frames) == 1:
+            return cls(frames[0], columns)
+        return cls(pd.concat(frames, ignore_index=True), columns)
+
+    @classmethod
+    def coerce(cls, data: Union["TabularDataset", List[Dict[str, Any]]], columns: List[Dict]) -> "TabularDataset":
+        """`data` as a TabularDataset, typing raw rows (e.g. from the response cache) when needed"""
+        return data if isinstance(data, TabularDataset) else cls.from_rows(data, columns)
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self.frame.columns)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.records())
+
+    def text_frame(self) -> pd.DataFrame:
+        """The frame with datetimes rendered as ISO 8601 text, as written to CSV and JSON"""
+        datetimes = [
+            name for name in self.frame.columns
+            if pd.api.types.is_datetime64_any_dtype(self.frame[name])
+            or (self.frame[name].dtype == object and any(isinstance(value, date) for value in self.frame[name]))
+        ]
+        if not datetimes:
+            return self.frame
+        frame = self.frame.copy()
+        for name in datetimes:
+            frame[name] = frame[name].map(_isoformat, na_action='ignore')
+        return frame
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Rows as dicts of plain Python values, with None for nulls; built once and shared"""
+        if self._records is None:
+            frame = self.text_frame().astype(object)
+            self._records = frame.where(frame.notna(), None).to_dict(orient='records')
+        return self._records
@@ -1,16 +1,32 @@
 import csv
+import io
 import json
 import os
 import tempfile
-import pandas as pd
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict, Tuple
 import logging
 import numpy as np
+from core.dataset import TabularDataset
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - only needed for parquet/arrow output
+    pa = None
+    pq = None
 
 logger = logging.getLogger(__name__)
 
+TABULAR_FORMATS = ("csv", "json", "parquet", "arrow")
+# Typed columnar formats, written through pyarrow with the schema taken from the column definitions
+COLUMNAR_FORMATS = ("parquet", "arrow")
+# Schema key-value entry holding the report metadata as JSON
+ARROW_METADATA_KEY = b"geniq"
+
 def convert_np(obj):
-    if isinstance(obj, dict):
+    if isinstance(obj, TabularDataset):
+        return obj.records()
+    elif isinstance(obj, dict):
         return {k: convert_np(v) for k, v in obj.items()}
     elif isinstance(obj, list):
         return [convert_np(v) for v in obj]
@@ -23,93 +39,147 @@ def convert_np(obj):
     else:
         return obj
 
-def write_tabular(data: List[Dict], columns: List[Dict], format: str) -> str:
-    logger.info(f"Writing {len(data)} rows to {format} format")
-    logger.debug(f"Data to write: {data}")
-    logger.debug(f"Columns: {columns}")
+def _output_path(suffix: str) -> str:
+    """Closed temp file for writers called without a destination; the caller owns and removes it"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+        return temp_file.name
 
-    # Separate main data from metadata
-    main_data = data.get("data", [])
+def write_tabular(data: Dict, columns: List[Dict], format: str, path: str = None) -> str:
+    # Separate main data from metadata; rows arrive typed unless they came from the response cache
+    dataset = TabularDataset.coerce(data.get("data", []), columns)
     metadata = data.get("metadata", {})
+    logger.info(f"Writing {len(dataset)} rows to {format} format")
+    logger.debug(f"Columns: {columns}")
     
-    df = pd.DataFrame(main_data)
+    path = path or _output_path(f".{format}")
+    logger.info(f"Writing file: {path}")
     
-    # Create temp file
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=f".{format}")
-    logger.info(f"Creating temp file: {temp_file.name}")
+    if format in COLUMNAR_FORMATS:
+        write_columnar(dataset, metadata, format, path)
+        logger.info(f"File written successfully: {path}")
+        return path
     
-    if not main_data:
+    if not len(dataset):
         logger.warning("No data to write, creating empty dataset with headers only")
-        # Create empty DataFrame with correct columns
-        column_names = [col['name'] for col in columns]
-        df = pd.DataFrame(columns=column_names)
-        
         # Write empty dataset
         if format == "csv":
-            df.to_csv(temp_file.name, index=False)
-        else:  # json
-            df.to_json(temp_file.name, orient="records", indent=2)
-    else:
-        # Ensure all expected columns exist
-        expected_columns = [col['name'] for col in columns]
-        missing_columns = set(expected_columns) - set(df.columns)
-        
-        if missing_columns:
-            logger.warning(f"Missing columns in data: {missing_columns}")
-            for col_name in missing_columns:
-                df[col_name] = None
-        
-        # Convert data types properly (handle JSON string values)
-        for col in columns:
-            col_name = col['name']
-            logger.debug(f"Processing column: {col_name} with dtype: {col['dtype']}")
-            
-            if col_name in df.columns:
-                try:
-                    if col['dtype'] == 'int':
-                        # Convert string/int/float to int
-                        df[col_name] = pd.to_numeric(df[col_name], errors='coerce').astype('Int64')
-                    elif col['dtype'] == 'float':
-                        # Convert string/int/float to float
-                        df[col_name] = pd.to_numeric(df[col_name], errors='coerce')
-                    elif col['dtype'] == 'bool':
-                        # Convert string to bool
-                        df[col_name] = df[col_name].astype(str).str.lower().isin(['true', '1', 'yes'])
-                    elif col['dtype'] == 'str':
-                        # Ensure string type
-                        df[col_name] = df[col_name].astype(str)
-                except Exception as e:
-                    logger.warning(f"Failed to convert column {col_name} to {col['dtype']}: {e}")
-        
-        # Write data
-        if format == "csv":
-            df.to_csv(temp_file.name, index=False)
-            with open(temp_file.name, 'a') as f:
-                f.write(f"\n\n# METADATA_START\n")
-                for key, value in convert_np(metadata).items():
-                    f.write(f"# {key}: {json.dumps(value)}\n")
-
+            dataset.frame.to_csv(path, index=False)
         else:  # json
-            full_data = {
-            "data": df.to_dict(orient='records'),
+            dataset.frame.to_json(path, orient="records", indent=2)
+    elif format == "csv":
+        dataset.text_frame().to_csv(path, index=False)
+        with open(path, 'a') as f:
+            f.write(csv_metadata_trailer(metadata))
+    else:  # json
+        full_data = {
+            "data": dataset.records(),
             "metadata": metadata
-            }
-            with open(temp_file.name, 'w') as f:
-                json.dump(convert_np(full_data), f, indent=2)
+        }
+        with open(path, 'w') as f:
+            json.dump(convert_np(full_data), f, indent=2)
+    
+    logger.info(f"File written successfully: {path}")
+    return path
+
+def _arrow_type(dtype: str):
+    return {
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'bool': pa.bool_(),
+        'datetime': pa.timestamp('us', tz='UTC')
+    }.get(dtype, pa.string())
 
+def to_arrow_table(dataset: TabularDataset, metadata: Dict):
+    """Arrow table with one nullable field per column definition and the metadata in the schema"""
+    if pa is None:
+        raise ValueError("Parquet and Arrow output require the pyarrow package")
     
-    logger.info(f"File written successfully: {temp_file.name}")
-    return temp_file.name
+    fields = []
+    arrays = []
+    for col in dataset.columns:
+        series = dataset.frame[col['name']]
+        arrow_type = _arrow_type(col['dtype'])
+        arrays.append(pa.Array.from_pandas(series).cast(arrow_type, safe=False))
+        fields.append(pa.field(col['name'], arrow_type, nullable=True, metadata={
+            'description': col.get('description') or '',
+            'validation': col.get('validation') or ''
+        }))
+    
+    schema = pa.schema(fields, metadata={
+        ARROW_METADATA_KEY: json.dumps(convert_np(metadata), default=str)
+    })
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+def write_columnar(dataset: TabularDataset, metadata: Dict, format: str, path: str):
+    """Write a Parquet file or an Arrow IPC file (memory-mappable) typed from the column definitions"""
+    table = to_arrow_table(dataset, metadata)
+    if format == "parquet":
+        pq.write_table(table, path)
+    else:
+        with pa.OSFile(path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
 
-def write_qa_pairs(data: List[Dict]) -> str:
+def write_qa_pairs(data: List[Dict], path: str = None) -> str:
     logger.info(f"Writing {len(data)} QA pairs to JSON")
     logger.debug(f"QA pairs to write: {data}")
     
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".json")
-    logger.info(f"Creating temp file: {temp_file.name}")
+    path = path or _output_path(".json")
+    logger.info(f"Writing file: {path}")
     
-    with open(temp_file.name, 'w') as f:
+    with open(path, 'w') as f:
         json.dump(data, f, indent=2)
     
-    logger.info(f"File written successfully: {temp_file.name}")
-    return temp_file.name
\ No newline at end of file
+    logger.info(f"File written successfully: {path}")
+    return path
+
+def csv_metadata_trailer(metadata: Dict) -> str:
+    """Metadata appended after CSV rows as '#' comment lines"""
+    lines = ["\n\n# METADATA_START\n"]
+    for key, value in convert_np(metadata).items():
+        lines.append(f"# {key}: {json.dumps(value)}\n")
+    return "".join(lines)
+
+def csv_chunk(rows: List[Dict], column_names: List[str], include_header: bool = False) -> str:
+    """Render a batch of rows as CSV text, optionally preceded by the header"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=column_names, extrasaction="ignore")
+    if include_header:
+        writer.writeheader()
+    writer.writerows(convert_np(rows))
+    return buffer.getvalue()
+
+def ndjson_chunk(rows: List[Dict]) -> str:
+    """Render a batch of rows as newline-delimited JSON"""
+    return "".join(json.dumps(row) + "\n" for row in convert_np(rows))
+
+async def encode_stream(events: AsyncIterator[Tuple[str, object]], format: str,
+                        column_names: List[str] = None) -> AsyncIterator[str]:
+    """Encode ("rows" | "metadata") generation events as NDJSON or CSV text chunks.
+
+    NDJSON emits one object per row and a trailing {"_metadata": ...} record;
+    CSV emits the header with the first batch and the metadata as trailing
+    '#' comment lines, matching write_tabular's file layout.
+    """
+    header_sent = False
+    try:
+        async for kind, payload in events:
+            if kind == "rows":
+                if format == "csv":
+                    yield csv_chunk(payload, column_names, include_header=not header_sent)
+                    header_sent = True
+                else:
+                    yield ndjson_chunk(payload)
+            elif format == "csv":
+                if not header_sent:
+                    yield csv_chunk([], column_names, include_header=True)
+                yield csv_metadata_trailer(payload)
+            else:
+                yield json.dumps({"_metadata": convert_np(payload)}) + "\n"
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band as the final record
+        logger.error(f"Streaming generation failed: {str(e)}")
+        if format == "csv":
+            yield f"\n# ERROR: {json.dumps(str(e))}\n"
+        else:
+            yield json.dumps({"_error": str(e)}) + "\n"
\ No newline at end of file
@@ -1,16 +1,21 @@
 from datetime import datetime
-import pandas as pd
-from agents.data_generator import generate_tabular_data, generate_qa_pairs
+from agents.data_generator import iter_tabular_batches, iter_qa_batches
 from agents.monitor import GenerationMonitor
-from core.file_writer import write_tabular, write_qa_pairs
-from analytics.quality_analyzer import DataQualityAnalyzer
-from analytics.business_value import BusinessValueCalculator
+from core.file_writer import write_tabular, write_qa_pairs, convert_np
+from core.artifact_store import Artifact, artifact_store
+from core.dataset import TabularDataset
+from core.response_cache import response_cache, request_cache_key
+from core.report_stages import run_report_stages, quality_stage, guardrail_stage, get_report_executor, StreamedReport
+from core.single_flight import SingleFlight
 from analytics.efficiency_calculator import EfficiencyMetrics
-from typing import Union
+from typing import AsyncIterator, Tuple, Union
 from schemas.tabular_schema import TabularRequest
 from schemas.qa_schema import QARequest
-from guardrails.content_safety import ContentGuard
-from guardrails.ethical_guidelines import EthicalEnforcer
+from utils.gemini_client import gemini_client
+from utils.keyword_automaton import KeywordAutomaton
+from guardrails.budget import GuardrailBudget, scan_batch
+from config import config
+import asyncio
 import logging
 import time
 
@@ -18,146 +23,334 @@ import time
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+in_flight_generations = SingleFlight()
+
+# Common domain keywords, checked in order
+DOMAIN_KEYWORDS = {
+    'healthcare': ['health', 'medical', 'patient', 'hospital', 'doctor', 'treatment'],
+    'finance': ['financial', 'banking', 'investment', 'stock', 'market', 'loan', 'credit'],
+    'education': ['education', 'student', 'school', 'university', 'learning', 'academic'],
+    'ecommerce': ['ecommerce', 'retail', 'shopping', 'product', 'customer', 'sales'],
+    'technology': ['tech', 'software', 'programming', 'computer', 'digital', 'app'],
+    'marketing': ['marketing', 'advertising', 'campaign', 'brand', 'promotion'],
+    'human_resources': ['hr', 'employee', 'recruitment', 'personnel', 'workforce'],
+    'logistics': ['logistics', 'supply chain', 'transportation', 'shipping', 'warehouse']
+}
+
+domain_automaton = KeywordAutomaton(DOMAIN_KEYWORDS)
+
 def identify_domain(use_case: str) -> str:
     """Extract domain from use case description"""
-    use_case_lower = use_case.lower()
+    found = domain_automaton.labels(use_case)
     
-    # Common domain keywords
-    domains = {
-        'healthcare': ['health', 'medical', 'patient', 'hospital', 'doctor', 'treatment'],
-        'finance': ['financial', 'banking', 'investment', 'stock', 'market', 'loan', 'credit'],
-        'education': ['education', 'student', 'school', 'university', 'learning', 'academic'],
-        'ecommerce': ['ecommerce', 'retail', 'shopping', 'product', 'customer', 'sales'],
-        'technology': ['tech', 'software', 'programming', 'computer', 'digital', 'app'],
-        'marketing': ['marketing', 'advertising', 'campaign', 'brand', 'promotion'],
-        'human_resources': ['hr', 'employee', 'recruitment', 'personnel', 'workforce'],
-        'logistics': ['logistics', 'supply chain', 'transportation', 'shipping', 'warehouse']
-    }
-    
-    for domain, keywords in domains.items():
-        if any(keyword in use_case_lower for keyword in keywords):
+    for domain in DOMAIN_KEYWORDS:
+        if domain in found:
             return domain
     
     # Default to general domain if no specific keywords found
     return "general"
 
-async def generate_dataset(request: Union[TabularRequest, QARequest], dataset_type: str) -> str:
+async def generate_dataset(request: Union[TabularRequest, QARequest], dataset_type: str,
+                           monitor: GenerationMonitor = None) -> Artifact:
     logger.info(f"Starting dataset generation for type: {dataset_type}")
     start_time = time.time()
     
-    if dataset_type == "tabular":
-        result = await generate_tabular_dataset(request)
-    else:
-        result = await generate_qa_dataset(request)
+    # Identical concurrent requests share one generation and receive the same artifact;
+    # its progress is reported to every caller's monitor
+    result = await in_flight_generations.do(
+        _flight_key(request, dataset_type),
+        lambda progress: _generate_dataset(request, dataset_type, progress),
+        monitor
+    )
     
     total_time = time.time() - start_time
     logger.info(f"Dataset generation completed in {total_time:.2f} seconds")
     return result
 
-async def generate_tabular_dataset(request: TabularRequest) -> str:
+def _flight_key(request: Union[TabularRequest, QARequest], dataset_type: str) -> str:
+    output_format = request.output_format if dataset_type == "tabular" else "json"
+    return f"{dataset_cache_key(request, dataset_type)}:{output_format}:{request.use_cache}"
+
+async def _generate_dataset(request: Union[TabularRequest, QARequest], dataset_type: str,
+                            monitor: GenerationMonitor = None) -> Artifact:
+    if dataset_type == "tabular":
+        return await generate_tabular_dataset(request, monitor)
+    return await generate_qa_dataset(request, monitor)
+
+def dataset_cache_key(request: Union[TabularRequest, QARequest], dataset_type: str) -> str:
+    """Cache key for a request under the currently configured backend and model"""
+    model = config.GEMINI_MODEL if config.MODEL_BACKEND == "gemini" else config.MODEL_BACKEND
+    return request_cache_key(request, dataset_type, model, gemini_client.temperature)
+
+def request_columns(request: TabularRequest) -> list:
+    """Column definitions of a tabular request as plain dicts"""
+    return [col.model_dump() for col in request.columns]
+
+def guardrail_domain(request: Union[TabularRequest, QARequest], dataset_type: str) -> str:
+    return identify_domain(request.use_case) if dataset_type == "tabular" else request.domain
+
+def new_guardrail_budget(request: Union[TabularRequest, QARequest], dataset_type: str,
+                         keep_findings: bool = True) -> GuardrailBudget:
+    """Budget for one generation, configured from GUARDRAIL_SETTINGS"""
+    settings = config.GUARDRAIL_SETTINGS
+    return GuardrailBudget(
+        guardrail_domain(request, dataset_type),
+        fields=settings["scan_fields"],
+        max_pii_rate=1 - settings["pii_threshold"],
+        max_violation_rate=settings["max_ethics_violations"],
+        min_items=settings["budget_min_items"],
+        enforce=settings["enforce_budgets"],
+        keep_findings=keep_findings
+    )
+
+async def iter_validated_batches(request: Union[TabularRequest, QARequest], dataset_type: str,
+                                 monitor: GenerationMonitor = None,
+                                 budget: GuardrailBudget = None) -> AsyncIterator[Tuple[list, int]]:
+    """Yield (valid_batch, rejected_count) for each generated batch in order, reporting progress to the monitor.
+
+    Tabular batches are typed into a TabularDataset as soon as they are
+    validated, so guardrails and every later stage read typed columns
+    instead of converting the rows again. With a budget, every batch is run through the guardrails before it is
+    yielded; going over budget raises GuardrailBudgetExceeded, which closes
+    the batch generator and cancels the model calls still in flight.
+    """
+    if dataset_type == "tabular":
+        batches = iter_tabular_batches(request)
+    else:
+        batches = iter_qa_batches(request)
+    columns = request_columns(request) if dataset_type == "tabular" else None
+
+    loop = asyncio.get_running_loop()
+    try:
+        async for batch, rejected in batches:
+            if columns is not None:
+                batch = TabularDataset.from_rows(batch, columns)
+            if budget is not None:
+                budget.record(*await loop.run_in_executor(
+                    get_report_executor(), scan_batch, batch, budget.domain, budget.fields
+                ))
+            if monitor:
+                monitor.log_batch(len(batch), rejected)
+            yield batch, rejected
+    finally:
+        await batches.aclose()
+
+    if budget is not None:
+        budget.finish()
+
+async def _cached_payload(request: Union[TabularRequest, QARequest], dataset_type: str, build_payload,
+                          monitor: GenerationMonitor = None) -> dict:
+    """Return the generated payload for a request, reusing a cached one when allowed"""
+    if not config.RESPONSE_CACHE["enabled"]:
+        return await build_payload(request, monitor)
+
+    key = dataset_cache_key(request, dataset_type)
+    if request.use_cache:
+        cached = response_cache.get(key)
+        if cached is not None:
+            logger.info(f"Response cache hit for {dataset_type} request {key[:12]}")
+            if monitor:
+                monitor.log_batch(len(cached["data"]))
+            return {
+                "data": cached["data"],
+                "metadata": {**cached["metadata"], "cache": {"hit": True, "key": key}}
+            }
+
+    payload = await build_payload(request, monitor)
+    # The cache holds plain JSON; the caller keeps the typed data for writing
+    response_cache.set(key, convert_np(payload))
+    return {
+        "data": payload["data"],
+        "metadata": {**convert_np(payload["metadata"]), "cache": {"hit": False, "key": key}}
+    }
+
+async def stream_dataset(request: Union[TabularRequest, QARequest], dataset_type: str,
+                         monitor: GenerationMonitor = None) -> AsyncIterator[Tuple[str, object]]:
+    """Yield ("rows", batch) for each generated and validated batch, then ("metadata", metadata).
+
+    Serves from the response cache when allowed. Otherwise the report is
+    built batch by batch as the stream goes, and streams of up to
+    RESPONSE_CACHE["max_stream_items"] items are cached once they finish.
+    """
+    cache_enabled = config.RESPONSE_CACHE["enabled"]
+    key = dataset_cache_key(request, dataset_type) if cache_enabled else None
+
+    if cache_enabled and request.use_cache:
+        cached = response_cache.get(key)
+        if cached is not None:
+            logger.info(f"Response cache hit for streamed {dataset_type} request {key[:12]}")
+            if monitor:
+                monitor.log_batch(len(cached["data"]))
+            batch_size = config.TABULAR_BATCH_SIZE if dataset_type == "tabular" else config.QA_BATCH_SIZE
+            for start in range(0, len(cached["data"]), batch_size):
+                yield "rows", cached["data"][start:start + batch_size]
+            yield "metadata", {**cached["metadata"], "cache": {"hit": True, "key": key}}
+            return
+
     start_time = time.time()
-    
-    # Generate raw dataset
-    raw_data = generate_tabular_data(request)
-    
-    # Convert to dict for analysis
-    columns = [col.model_dump() for col in request.columns]
-    
-    # Generate quality report
-    quality_analyzer = DataQualityAnalyzer(
-        raw_data, 
-        "tabular",
-        {
-            "columns": columns,
-            "use_case": request.use_case,
-            "num_items": request.num_rows
-        }
+    settings = config.GUARDRAIL_SETTINGS
+    domain = identify_domain(request.use_case) if dataset_type == "tabular" else request.domain
+    report = StreamedReport(dataset_type, analyzer_metadata(request, dataset_type), domain,
+                            settings["scan_fields"], settings["verbose_reports"])
+    # Batches are folded into the report as they stream, so only streams small
+    # enough to cache keep their records around
+    cached_records = [] if cache_enabled else None
+    delivered = 0
+    rejected_items = 0
+    batch_count = 0
+    budget = new_guardrail_budget(request, dataset_type, keep_findings=False)
+    batches = iter_validated_batches(request, dataset_type, monitor, budget)
+    try:
+        async for batch, rejected in batches:
+            batch_count += 1
+            rejected_items += rejected
+            delivered += len(batch)
+            records = batch.records() if dataset_type == "tabular" else batch
+            yield "rows", records
+            await report.add(batch, budget.batch_findings)
+            if cached_records is not None:
+                if delivered <= config.RESPONSE_CACHE["max_stream_items"]:
+                    cached_records.extend(records)
+                else:
+                    cached_records = None
+    finally:
+        await batches.aclose()
+
+    requested = request.num_rows if dataset_type == "tabular" else request.num_pairs
+    sections, stage_timings = await report.sections(requested)
+    metadata = convert_np(report_metadata(request, dataset_type, sections, stage_timings, start_time, budget))
+    if cached_records is not None:
+        response_cache.set(key, {"data": convert_np(cached_records), "metadata": metadata})
+    elif cache_enabled:
+        logger.info(f"Streamed {dataset_type} request {key[:12]} is too large to cache")
+
+    yield "metadata", {
+        **metadata,
+        "generation": generation_summary(requested, delivered, batch_count, rejected_items),
+        "cache": {"hit": False, "key": key}
+    }
+
+async def generate_tabular_dataset(request: TabularRequest, monitor: GenerationMonitor = None) -> Artifact:
+    enhanced_data = await _cached_payload(request, "tabular", build_tabular_payload, monitor)
+    columns = request_columns(request)
+    return artifact_store.save(
+        "tabular", request.output_format,
+        lambda path: write_tabular(enhanced_data, columns, request.output_format, path)
     )
-    quality_report = quality_analyzer.analyze()
+
+async def generate_qa_dataset(request: QARequest, monitor: GenerationMonitor = None) -> Artifact:
+    enhanced_data = await _cached_payload(request, "qa", build_qa_payload, monitor)
+    return artifact_store.save("qa", "json", lambda path: write_qa_pairs(enhanced_data, path))
+
+async def build_tabular_payload(request: TabularRequest, monitor: GenerationMonitor = None) -> dict:
+    start_time = time.time()
     
-    # Generate business value report
-    value_calculator = BusinessValueCalculator(
-        "tabular",
-        quality_report,
-        {"num_items": request.num_rows}
-    )
-    business_value = value_calculator.calculate()
+    # Generate the dataset batch by batch; batches arrive already typed
+    parts = []
+    batch_count = 0
+    rejected_items = 0
+    budget = new_guardrail_budget(request, "tabular")
+    async for batch, rejected in iter_validated_batches(request, "tabular", monitor, budget):
+        parts.append(batch)
+        batch_count += 1
+        rejected_items += rejected
     
-    # Calculate efficiency metrics
-    efficiency = EfficiencyMetrics(start_time, request.num_rows).calculate()
+    dataset = TabularDataset.concat(parts, request_columns(request))
+    payload = await build_tabular_report(request, dataset, start_time, budget)
+    payload["metadata"]["generation"] = generation_summary(request.num_rows, len(dataset), batch_count, rejected_items)
+    return payload
+
+def generation_summary(requested: int, delivered: int, batches: int, rejected: int) -> dict:
+    """metadata["generation"]: batch and rejection counts, and how many requested items never arrived"""
+    shortfall = max(requested - delivered, 0)
+    if shortfall:
+        logger.warning(f"Delivered {delivered} of {requested} requested items")
+    return {
+        "batches": batches,
+        "rejected_items": rejected,
+        "requested_items": requested,
+        "delivered_items": delivered,
+        "shortfall": shortfall
+    }
 
-     # Apply guardrails
-    content_guard = ContentGuard()
-    safety_report = content_guard.check(raw_data, domain=identify_domain(request.use_case))
+def _guardrail_args(data: Union[TabularDataset, list], domain: str, budget: GuardrailBudget = None) -> tuple:
+    """Guardrail stage arguments, reusing the findings of a per-batch budget when there is one"""
+    settings = config.GUARDRAIL_SETTINGS
+    findings = budget.findings if budget is not None else None
+    return data, domain, settings["scan_fields"], settings["verbose_reports"], findings
+
+async def build_tabular_report(request: TabularRequest, data: Union[TabularDataset, list], start_time: float,
+                               budget: GuardrailBudget = None) -> dict:
+    """Run analytics and guardrails over the generated dataset and attach them as metadata"""
+    columns = request_columns(request)
+    dataset = TabularDataset.coerce(data, columns)
     
-    ethical_enforcer = EthicalEnforcer()
-    ethics_report = ethical_enforcer.validate(raw_data, domain=identify_domain(request.use_case))
+    # Quality analysis and guardrails are independent; run them concurrently off the event loop
+    sections, stage_timings = await run_report_stages([
+        (quality_stage, ("tabular", dataset, analyzer_metadata(request, "tabular"), request.num_rows)),
+        (guardrail_stage, _guardrail_args(dataset, identify_domain(request.use_case), budget))
+    ])
     
-    # Prepare enhanced output
-    enhanced_data = {
-        "data": raw_data,  # Using raw_data directly now
-        "metadata": {
-            "generated_at": datetime.utcnow().isoformat(),
-            "quality_report": quality_report,
-            "business_value": business_value,
-            "efficiency_metrics": efficiency,
-            "columns_definition": columns,
-            "safety_report": safety_report,
-            "ethics_report": ethics_report,
-            "guardrails_version": "1.0"
-        }
+    return {
+        "data": dataset,  # Typed once, written as-is
+        "metadata": report_metadata(request, "tabular", sections, stage_timings, start_time, budget)
     }
-    
-    return write_tabular(enhanced_data, columns, request.output_format)
 
-async def generate_qa_dataset(request: QARequest) -> str:
+def analyzer_metadata(request: Union[TabularRequest, QARequest], dataset_type: str) -> dict:
+    """Request details the quality analyzer needs"""
+    if dataset_type == "tabular":
+        return {"columns": request_columns(request), "use_case": request.use_case, "num_items": request.num_rows}
+    return {"domain": request.domain, "complexity": request.complexity, "num_items": request.num_pairs}
+
+def report_metadata(request: Union[TabularRequest, QARequest], dataset_type: str, sections: dict,
+                    stage_timings: dict, start_time: float, budget: GuardrailBudget = None) -> dict:
+    """The metadata report attached to a generated dataset"""
+    num_items = request.num_rows if dataset_type == "tabular" else request.num_pairs
+    metadata = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "quality_report": sections["quality_report"],
+        "business_value": sections["business_value"],
+        "efficiency_metrics": EfficiencyMetrics(start_time, num_items).calculate()
+    }
+    if dataset_type == "tabular":
+        metadata["columns_definition"] = request_columns(request)
+    metadata.update({
+        "safety_report": sections["safety_report"],
+        "ethics_report": sections["ethics_report"],
+        "stage_timings": stage_timings,
+        "guardrails_version": "1.0"
+    })
+    if budget is not None:
+        metadata["guardrail_budget"] = budget.to_dict()
+    return metadata
+
+async def build_qa_payload(request: QARequest, monitor: GenerationMonitor = None) -> dict:
     start_time = time.time()
     
     # Generate raw QA pairs
-    raw_pairs = generate_qa_pairs(request)
+    raw_pairs = []
+    batch_count = 0
+    rejected_items = 0
+    budget = new_guardrail_budget(request, "qa")
+    async for batch, rejected in iter_validated_batches(request, "qa", monitor, budget):
+        raw_pairs.extend(batch)
+        batch_count += 1
+        rejected_items += rejected
     
-    # Generate quality report
-    quality_analyzer = DataQualityAnalyzer(
-        raw_pairs,
-        "qa",
-        {
-            "domain": request.domain,
-            "complexity": request.complexity,
-            "num_items": request.num_pairs
-        }
-    )
-    quality_report = quality_analyzer.analyze()
-    
-    # Generate business value report
-    value_calculator = BusinessValueCalculator(
-        "qa",
-        quality_report,
-        {"num_items": request.num_pairs}
-    )
-    business_value = value_calculator.calculate()
-    
-    # Calculate efficiency metrics
-    efficiency = EfficiencyMetrics(start_time, request.num_pairs).calculate()
+    payload = await build_qa_report(request, raw_pairs, start_time, budget)
+    payload["metadata"]["generation"] = generation_summary(request.num_pairs, len(raw_pairs), batch_count, rejected_items)
+    return payload
 
-     # Apply guardrails
-    content_guard = ContentGuard()
-    safety_report = content_guard.check(raw_pairs, domain=request.domain)
-    
-    ethical_enforcer = EthicalEnforcer()
-    ethics_report = ethical_enforcer.validate(raw_pairs, domain=request.domain)
+async def build_qa_report(request: QARequest, raw_pairs: list, start_time: float,
+                          budget: GuardrailBudget = None) -> dict:
+    """Run analytics and guardrails over generated QA pairs and attach them as metadata"""
+    # Quality analysis and guardrails are independent; run them concurrently off the event loop
+    sections, stage_timings = await run_report_stages([
+        (quality_stage, ("qa", raw_pairs, analyzer_metadata(request, "qa"), request.num_pairs)),
+        (guardrail_stage, _guardrail_args(raw_pairs, request.domain, budget))
+    ])
     
-    # Prepare enhanced output
-    enhanced_data = {
+    return {
         "data": raw_pairs,  # Using raw_pairs directly
-        "metadata": {
-            "generated_at": datetime.utcnow().isoformat(),
-            "quality_report": quality_report,
-            "business_value": business_value,
-            "efficiency_metrics": efficiency,
-            "safety_report": safety_report,
-            "ethics_report": ethics_report,
-            "guardrails_version": "1.0"
-        }
+        "metadata": report_metadata(request, "qa", sections, stage_timings, start_time, budget)
     }
-    
-    return write_qa_pairs(enhanced_data)
\ No newline at end of file
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, Optional, Union
+
+from agents.monitor import GenerationMonitor
+from config import config
+from core.artifact_store import Artifact
+from core.generation_engine import generate_dataset
+from schemas.qa_schema import QARequest
+from schemas.tabular_schema import TabularRequest
+
+logger = logging.getLogger(__name__)
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+TERMINAL_STATUSES = {JobStatus.COMPLETED, JobStatus.FAILED}
+
+class JobQueueFull(Exception):
+    """Raised when no more jobs can be queued"""
+
+class Job:
+    def __init__(self, request: Union[TabularRequest, QARequest], dataset_type: str):
+        self.id = str(uuid.uuid4())
+        self.request = request
+        self.dataset_type = dataset_type
+        self.status = JobStatus.QUEUED
+        self.artifact: Optional[Artifact] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+        total = request.num_rows if dataset_type == "tabular" else request.num_pairs
+        self.monitor = GenerationMonitor(total, on_update=self.notify)
+        self._changed = asyncio.Event()
+
+    def notify(self):
+        """Wake everything waiting for the next state change"""
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_for_change(self, timeout: float) -> bool:
+        """Wait for the next state change; returns False on timeout"""
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "dataset_type": self.dataset_type,
+            "status": self.status,
+            "progress": self.monitor.get_progress(),
+            "error": self.error,
+            "dataset_id": self.artifact.id if self.artifact else None,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+class JobManager:
+    """In-process job queue drained by a bounded pool of worker tasks"""
+
+    def __init__(self, max_workers: int, max_queued: int, retention_seconds: float):
+        self.max_workers = max_workers
+        self.retention_seconds = retention_seconds
+        self.jobs: Dict[str, Job] = {}
+        self._queue: "asyncio.Queue[Job]" = asyncio.Queue(maxsize=max_queued)
+        self._workers = []
+
+    def start(self):
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.max_workers)]
+            logger.info(f"Job manager started with {self.max_workers} workers")
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, request: Union[TabularRequest, QARequest], dataset_type: str) -> Job:
+        self._prune()
+        job = Job(request, dataset_type)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFull("Too many queued generation jobs, try again later")
+        self.jobs[job.id] = job
+        logger.info(f"Queued {dataset_type} job {job.id}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def events(self, job: Job, heartbeat_seconds: float = 15) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield a job snapshot after every change until it finishes; None marks a heartbeat"""
+        snapshot = job.to_dict()
+        yield snapshot
+        while job.status not in TERMINAL_STATUSES:
+            if await job.wait_for_change(heartbeat_seconds):
+                snapshot = job.to_dict()
+                yield snapshot
+            else:
+                yield None
+        # The job may have finished while the last snapshot was being sent
+        if snapshot["status"] not in TERMINAL_STATUSES:
+            yield job.to_dict()
+
+    async def _worker(self, worker_id: int):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        job.notify()
+        logger.info(f"Running {job.dataset_type} job {job.id}")
+
+        try:
+            job.artifact = await generate_dataset(job.request, job.dataset_type, job.monitor)
+            job.status = JobStatus.COMPLETED
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {str(e)}")
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+        finally:
+            job.finished_at = time.time()
+            job.monitor.finish(job.finished_at)
+            job.notify()
+
+    def _prune(self):
+        """Forget finished jobs older than the retention window"""
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.status in TERMINAL_STATUSES and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+job_manager = JobManager(
+    max_workers=config.JOB_WORKERS,
+    max_queued=config.JOB_QUEUE_SIZE,
+    retention_seconds=config.JOB_RETENTION_SECONDS
+)
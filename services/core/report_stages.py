@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+from analytics.business_value import BusinessValueCalculator
+from analytics.quality_analyzer import DataQualityAnalyzer
+from config import config
+from core.dataset import TabularDataset
+from guardrails.content_safety import ContentGuard
+from guardrails.ethical_guidelines import EthicalEnforcer
+from guardrails.pattern_scanner import scan_fields, scan_items
+
+logger = logging.getLogger(__name__)
+
+# A stage returns (report sections, {step name: seconds})
+StageResult = Tuple[Dict[str, Any], Dict[str, float]]
+
+_executor: Executor = None
+
+def get_report_executor() -> Executor:
+    """Pool shared by every report build, created on first use"""
+    global _executor
+    if _executor is None:
+        pool = ProcessPoolExecutor if config.REPORT_EXECUTOR == "process" else ThreadPoolExecutor
+        _executor = pool(max_workers=config.REPORT_WORKERS)
+        logger.info(f"Report stages run in a {config.REPORT_EXECUTOR} pool of {config.REPORT_WORKERS} workers")
+    return _executor
+
+def shutdown_report_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+def _timed(timings: Dict[str, float], step: str, work: Callable[[], Any]) -> Any:
+    started = time.perf_counter()
+    try:
+        return work()
+    finally:
+        timings[step] = round(time.perf_counter() - started, 4)
+
+def quality_stage(dataset_type: str, data: Union[TabularDataset, List[dict]], analyzer_metadata: Dict[str, Any],
+                  num_items: int) -> StageResult:
+    """Quality report and the business value derived from it"""
+    timings = {}
+    quality_report = _timed(
+        timings, "quality", lambda: DataQualityAnalyzer(data, dataset_type, analyzer_metadata).analyze()
+    )
+    business_value = _timed(
+        timings, "business_value",
+        lambda: BusinessValueCalculator(dataset_type, quality_report, {"num_items": num_items}).calculate()
+    )
+    return {"quality_report": quality_report, "business_value": business_value}, timings
+
+def quality_totals_stage(dataset_type: str, data: Union[TabularDataset, List[dict]],
+                         analyzer_metadata: Dict[str, Any]) -> StageResult:
+    """Additive quality statistics of one batch, for reports built batch by batch"""
+    timings = {}
+    totals = _timed(
+        timings, "quality", lambda: DataQualityAnalyzer(data, dataset_type, analyzer_metadata).totals()
+    )
+    return {"quality_totals": totals}, timings
+
+def guardrail_stage(data: Union[TabularDataset, List[dict]], domain: str, fields: bool, verbose: bool = False,
+                    findings: List[dict] = None) -> StageResult:
+    """Safety and ethics reports over one shared pattern scan; pass `findings` to reuse an earlier scan"""
+    timings = {}
+    if findings is None:
+        findings = _timed(
+            timings, "scan", lambda: scan_fields(data, domain) if fields else scan_items(data, domain)
+        )
+    safety_report = _timed(
+        timings, "safety", lambda: ContentGuard().check(
+            data, domain=domain, findings=findings, fields=fields, verbose=verbose
+        )
+    )
+    ethics_report = _timed(
+        timings, "ethics", lambda: EthicalEnforcer().validate(
+            data, domain=domain, findings=findings, fields=fields, verbose=verbose
+        )
+    )
+    return {"safety_report": safety_report, "ethics_report": ethics_report}, timings
+
+async def run_report_stages(stages: List[Tuple[Callable[..., StageResult], tuple]]) -> StageResult:
+    """Run independent stages concurrently in the report pool, off the event loop.
+
+    Each stage is a (function, args) pair so it can also be shipped to a
+    process pool. Returns the merged report sections and per-step timings,
+    plus the wall time of the whole fan-out as "total".
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_report_executor()
+    started = time.perf_counter()
+    outputs = await asyncio.gather(*(loop.run_in_executor(executor, stage, *args) for stage, args in stages))
+
+    sections, timings = {}, {}
+    for stage_sections, stage_timings in outputs:
+        sections.update(stage_sections)
+        timings.update(stage_timings)
+    timings["total"] = round(time.perf_counter() - started, 4)
+    return sections, timings
+
+class StreamedReport:
+    """Report sections of a streamed generation, built one batch at a time.
+
+    Every batch goes through the same quality and guardrail code as a whole
+    dataset; quality totals and guardrail reports are merged once the
+    stream ends, so no batch has to be kept for the report.
+    """
+
+    def __init__(self, dataset_type: str, analyzer_metadata: Dict[str, Any], domain: str,
+                 fields: bool, verbose: bool = False):
+        self.dataset_type = dataset_type
+        self.analyzer_metadata = analyzer_metadata
+        self.domain = domain
+        self.fields = fields
+        self.verbose = verbose
+        self.quality_totals = None
+        self.safety_reports: List[dict] = []
+        self.ethics_reports: List[dict] = []
+        self.timings: Dict[str, float] = {}
+
+    async def add(self, batch: Union[TabularDataset, List[dict]], findings: List[dict] = None):
+        """Fold one batch in; pass the batch's scanner `findings` to skip scanning it again"""
+        sections, timings = await run_report_stages([
+            (quality_totals_stage, (self.dataset_type, batch, self.analyzer_metadata)),
+            (guardrail_stage, (batch, self.domain, self.fields, self.verbose, findings))
+        ])
+        totals = sections["quality_totals"]
+        if self.quality_totals is not None:
+            totals = DataQualityAnalyzer.merge_totals(self.dataset_type, self.quality_totals, totals)
+        self.quality_totals = totals
+        self.safety_reports.append(sections["safety_report"])
+        self.ethics_reports.append(sections["ethics_report"])
+        for step, seconds in timings.items():
+            self.timings[step] = round(self.timings.get(step, 0) + seconds, 4)
+
+    async def sections(self, num_items: int) -> StageResult:
+        """The quality, business value, safety and ethics sections over every batch added"""
+        if self.quality_totals is None:
+            empty = TabularDataset.from_rows([], self.analyzer_metadata["columns"]) if self.dataset_type == "tabular" else []
+            await self.add(empty)
+        analyzer = DataQualityAnalyzer(None, self.dataset_type, self.analyzer_metadata)
+        quality_report = _timed(self.timings, "quality_finish", lambda: analyzer.finish(self.quality_totals))
+        business_value = _timed(
+            self.timings, "business_value",
+            lambda: BusinessValueCalculator(self.dataset_type, quality_report, {"num_items": num_items}).calculate()
+        )
+        return {
+            "quality_report": quality_report,
+            "business_value": business_value,
+            "safety_report": ContentGuard.merge(self.safety_reports),
+            "ethics_report": EthicalEnforcer.merge(self.ethics_reports)
+        }, dict(self.timings)
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Free-text request fields that are compared case- and whitespace-insensitively
+_TEXT_FIELDS = {"use_case", "description", "domain", "complexity", "context", "constraints"}
+# Fields that don't change the generated payload
+_IGNORED_FIELDS = {"use_cache", "output_format"}
+
+def _normalize_text(value: str) -> str:
+    return " ".join(value.split()).lower()
+
+def normalize_request(request) -> Dict[str, Any]:
+    """Canonical, JSON-serializable form of a TabularRequest/QARequest"""
+    normalized = {}
+    for field, value in request.model_dump().items():
+        if field in _IGNORED_FIELDS:
+            continue
+        if field in _TEXT_FIELDS and isinstance(value, str):
+            value = _normalize_text(value)
+        elif field == "columns":
+            value = [
+                {
+                    "name": col["name"].strip(),
+                    "dtype": col["dtype"].strip().lower(),
+                    "description": _normalize_text(col["description"]),
+                    "validation": " ".join((col.get("validation") or "").split()),
+                    "options": col.get("options")
+                }
+                for col in value
+            ]
+        normalized[field] = value
+    return normalized
+
+def request_cache_key(request, dataset_type: str, model: str, temperature: float) -> str:
+    """Content hash of a normalized request plus the model settings that produced it"""
+    canonical = json.dumps(
+        {
+            "dataset_type": dataset_type,
+            "request": normalize_request(request),
+            "model": model,
+            "temperature": temperature
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+class ResponseCache:
+    """Two-tier cache of generated payloads: in-memory LRU in front of a disk directory.
+
+    Both tiers expire entries `ttl_seconds` after they were created, however
+    often they are read; the creation time is stored with each entry and
+    carried from disk into memory. Past `max_disk_bytes` the disk tier
+    evicts the least recently used files first, tracked by their access time.
+    """
+
+    def __init__(self, max_entries: int = 64, directory: str = None,
+                 max_disk_bytes: int = 256 * 1024 * 1024, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+
+        entry = self._disk_get(key, now)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            created_at, value = entry
+            self._memory_set(key, value, created_at)
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]):
+        now = time.time()
+        with self._lock:
+            self._memory_set(key, value, now)
+        self._disk_set(key, value, now)
+
+    def _memory_set(self, key: str, value: Dict[str, Any], created_at: float):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _disk_get(self, key: str, now: float) -> Optional[tuple]:
+        """(created_at, value) of a live disk entry, or None"""
+        if not self.directory:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            created_at, value = float(entry["created_at"]), entry["value"]
+            if now - created_at > self.ttl_seconds:
+                self._remove(path)
+                return None
+            # Mark the file used for size-based eviction; its mtime stays the write time
+            os.utime(path, (now, os.stat(path).st_mtime))
+            return created_at, value
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+    def _disk_set(self, key: str, value: Dict[str, Any], created_at: float):
+        if not self.directory:
+            return
+
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"created_at": created_at, "value": value}, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Failed to write cache entry {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """Drop expired entries, then the least recently used ones until under the size limit.
+
+        Files are written once, so their mtime bounds their age; reads only
+        move the access time.
+        """
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.ttl_seconds:
+                self._remove(path)
+            else:
+                entries.append((max(stat.st_atime, stat.st_mtime), stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory)
+        }
+
+response_cache = ResponseCache(
+    max_entries=config.RESPONSE_CACHE["memory_entries"],
+    directory=config.RESPONSE_CACHE["directory"],
+    max_disk_bytes=config.RESPONSE_CACHE["max_disk_bytes"],
+    ttl_seconds=config.RESPONSE_CACHE["ttl_seconds"]
+)
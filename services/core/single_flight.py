@@ -0,0 +1,55 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from agents.monitor import GenerationMonitor, MonitorFanOut
+
+logger = logging.getLogger(__name__)
+
+class _Call:
+    def __init__(self):
+        self.task: asyncio.Task = None
+        self.waiters = 0
+        self.monitors = MonitorFanOut()
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one shared task.
+
+    Every caller awaits the same result (or exception). A caller that is
+    cancelled only stops waiting; the shared task is cancelled once its
+    last waiter is gone. The factory receives a MonitorFanOut to report
+    progress to, so every caller's monitor follows the shared work.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, factory: Callable[[MonitorFanOut], Awaitable[Any]],
+                 monitor: GenerationMonitor = None) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call()
+            call.task = asyncio.create_task(factory(call.monitors))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            logger.info(f"Joining in-flight generation {key[:12]} ({call.waiters} waiting)")
+
+        call.monitors.add(monitor)
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                logger.info(f"Last waiter left, cancelling shared generation {key[:12]}")
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key: str, call: _Call):
+        # Only drop our own entry; a newer call may already be registered under the key
+        if self._calls.get(key) is call:
+            del self._calls[key]
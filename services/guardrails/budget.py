@@ -0,0 +1,100 @@
+import logging
+from typing import Any, Dict, List, Tuple
+
+from config import config
+from guardrails.ethical_guidelines import EthicalEnforcer
+from guardrails.pattern_scanner import scan_fields, scan_items, has_any
+
+logger = logging.getLogger(__name__)
+
+class GuardrailBudgetExceeded(Exception):
+    """Generation stopped because guardrail violations ran over budget"""
+
+    def __init__(self, message: str, budget: Dict[str, Any]):
+        super().__init__(message)
+        self.budget = budget
+
+def scan_batch(batch: List[dict], domain: str, fields: bool) -> Tuple[List[dict], int, int]:
+    """Findings, PII item count and ethics-violating item count for one batch.
+
+    Only `pii:*` findings count as PII; domain keyword hits describe the
+    subject matter and stay in the findings for the safety report. An item
+    counts once however many rules it breaks, and rules listed in
+    `budget_exempt_rules` are not counted.
+    """
+    findings = scan_fields(batch, domain) if fields else scan_items(batch, domain)
+    pii_items = sum(1 for item_findings in findings if has_any(item_findings, "pii:"))
+    ethics = EthicalEnforcer().validate(batch, domain=domain, findings=findings, fields=fields)
+    exempt = config.GUARDRAIL_SETTINGS["budget_exempt_rules"]
+    violating_items = len({violation["index"] for violation in ethics["violations"] if violation["rule"] not in exempt})
+    return findings, pii_items, violating_items
+
+class GuardrailBudget:
+    """Running PII and ethics rates over the batches of one generation.
+
+    Rates are enforced once `min_items` have been checked, so a single early
+    batch can't abort a run, and again over the complete data at `finish()`.
+    The findings of every batch are kept so the final report can reuse them
+    instead of scanning the whole dataset again; with `keep_findings` off
+    only the latest batch's are, for reports built batch by batch.
+    """
+
+    def __init__(self, domain: str, fields: bool, max_pii_rate: float,
+                 max_violation_rate: float, min_items: int, enforce: bool = True, keep_findings: bool = True):
+        self.domain = domain
+        self.fields = fields
+        self.max_pii_rate = max_pii_rate
+        self.max_violation_rate = max_violation_rate
+        self.min_items = min_items
+        self.enforce = enforce
+        self.keep_findings = keep_findings
+        self.findings: List[dict] = []
+        self.batch_findings: List[dict] = []
+        self.items = 0
+        self.pii_items = 0
+        self.violating_items = 0
+
+    def record(self, findings: List[dict], pii_items: int, violating_items: int):
+        """Add one batch's results and abort if the running rates are over budget"""
+        self.batch_findings = findings
+        if self.keep_findings:
+            self.findings.extend(findings)
+        self.items += len(findings)
+        self.pii_items += pii_items
+        self.violating_items += violating_items
+        if self.items >= self.min_items:
+            self._enforce()
+
+    def finish(self):
+        """Enforce the budget over the complete data, however small"""
+        if self.items:
+            self._enforce()
+
+    def _enforce(self):
+        if not self.enforce:
+            return
+        pii_rate, violation_rate = self.rates()
+        if pii_rate > self.max_pii_rate:
+            reason = f"{pii_rate:.1%} of items contain PII (budget {self.max_pii_rate:.1%})"
+        elif violation_rate > self.max_violation_rate:
+            reason = f"{violation_rate:.1%} of items break an ethical rule (budget {self.max_violation_rate:.1%})"
+        else:
+            return
+        logger.warning(f"Guardrail budget exceeded after {self.items} items: {reason}")
+        raise GuardrailBudgetExceeded(f"Generation aborted: {reason}", self.to_dict())
+
+    def rates(self) -> Tuple[float, float]:
+        if not self.items:
+            return 0.0, 0.0
+        return self.pii_items / self.items, self.violating_items / self.items
+
+    def to_dict(self) -> Dict[str, Any]:
+        pii_rate, violation_rate = self.rates()
+        return {
+            "items_checked": self.items,
+            "pii_rate": round(pii_rate, 4),
+            "violation_rate": round(violation_rate, 4),
+            "max_pii_rate": round(self.max_pii_rate, 4),
+            "max_violation_rate": self.max_violation_rate,
+            "enforced": self.enforce
+        }
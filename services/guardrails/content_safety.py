@@ -1,5 +1,6 @@
-import re
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
+from guardrails.patterns import PII_PATTERNS, DOMAIN_SPECIFIC_PATTERNS
+from guardrails.pattern_scanner import scan_item, scan_items, scan_fields, has_any, prefix_matches
 
 # Define safety categories and thresholds manually since google.generativeai.safety_settings is not available
 class SafetyCategory:
@@ -36,27 +37,24 @@ SAFETY_CONFIG = {
 
 class ContentGuard:
     def __init__(self):
-        self.pii_patterns = {
-            'ssn': r'\b\d{3}-\d{2}-\d{4}\b',
-            'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            'phone': r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',
-            'credit_card': r'\b\d{4}[- ]?\d{4}[- ]?\d{4}[- ]?\d{4}\b',
-            'address': r'\b\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Drive|Dr|Lane|Ln|Way|Place|Pl|Court|Ct)\b'
-        }
-        
-        self.domain_specific_patterns = {
-            'healthcare': [
-                r'\b(patient|medical record|diagnosis|treatment|prescription|medication)\b',
-                r'\b\d{10,}\b',  # Medical record numbers
-            ],
-            'finance': [
-                r'\b(account number|routing number|swift code|iban)\b',
-                r'\b\d{8,}\b',  # Account numbers
-            ]
-        }
+        self.pii_patterns = PII_PATTERNS
+        self.domain_specific_patterns = DOMAIN_SPECIFIC_PATTERNS
     
-    def check(self, data: List[Dict[str, Any]], domain: str = "default") -> Dict[str, Any]:
-        """Scan data for domain-specific risks and PII"""
+    def check(self, data: List[Dict[str, Any]], domain: str = "default",
+              findings: List[Dict[str, list]] = None, fields: bool = False,
+              verbose: bool = False) -> Dict[str, Any]:
+        """Scan data for domain-specific risks and PII.
+
+        `findings` are per-item scanner results from `scan_items(data, domain)`
+        (or `scan_fields` when `fields` is set); pass them in to share one scan
+        with EthicalEnforcer. With `fields`, only individual field values are
+        scanned and the report adds (row, column, issue) `field_findings`.
+
+        Flagged items are reported compactly by row index, issue ids and the
+        matched spans (offsets into the item's scanned text, or columns for
+        field scans), with per-issue counts. `verbose` copies each flagged
+        item and its issue messages into the report instead.
+        """
         results = {
             "flagged": [],
             "passed": True,
@@ -64,29 +62,44 @@ class ContentGuard:
             "domain": domain,
             "checks_performed": []
         }
+        issue_counts: Dict[str, int] = {}
+        issue_labels: Dict[str, str] = {}
         
         safety_config = SAFETY_CONFIG.get(domain, SAFETY_CONFIG["default"])
         results["checks_performed"].append(f"Using {domain} safety configuration")
         
-        for item in data:
-            item_issues = []
-            
-            # Check for PII patterns
-            pii_found = self._check_pii(item)
-            if pii_found:
-                item_issues.extend(pii_found)
-            
-            # Check for domain-specific sensitive patterns
-            domain_issues = self._check_domain_specific(item, domain)
-            if domain_issues:
-                item_issues.extend(domain_issues)
+        if findings is None:
+            findings = scan_fields(data, domain) if fields else scan_items(data, domain)
+        if fields:
+            results["field_findings"] = []
+        
+        for index, (item, item_findings) in enumerate(zip(data, findings)):
+            # PII patterns, then domain-specific sensitive patterns
+            item_issues = self._pii_issues(item_findings) + self._domain_issues(domain, item_findings)
+            if not item_issues:
+                continue
             
-            if item_issues:
+            severity = "high" if len(item_issues) > 2 else "medium"
+            if verbose:
                 results["flagged"].append({
                     "item": item,
-                    "issues": item_issues,
-                    "severity": "high" if len(item_issues) > 2 else "medium"
+                    "issues": [message for _, message, _ in item_issues],
+                    "severity": severity
                 })
+            else:
+                results["flagged"].append({
+                    "index": index,
+                    "issues": [issue_id for issue_id, _, _ in item_issues],
+                    "matches": {issue_id: matches for issue_id, _, matches in item_issues},
+                    "severity": severity
+                })
+            
+            for issue_id, message, matches in item_issues:
+                issue_counts[issue_id] = issue_counts.get(issue_id, 0) + 1
+                issue_labels[issue_id] = message
+                if fields:
+                    label = message if verbose else issue_id
+                    results["field_findings"].extend((index, column, label) for column in matches)
         
         # Calculate safety score
         total_items = len(data)
@@ -95,6 +108,8 @@ class ContentGuard:
             results["safety_score"] = max(0, 100 - (flagged_items / total_items) * 100)
         
         results["passed"] = len(results["flagged"]) == 0
+        results["issue_counts"] = issue_counts
+        results["issue_labels"] = issue_labels
         results["summary"] = {
             "total_items": total_items,
             "flagged_items": flagged_items,
@@ -103,26 +118,59 @@ class ContentGuard:
         
         return results
     
-    def _check_pii(self, item: Any) -> List[str]:
-        """Check for personally identifiable information"""
-        issues = []
-        item_str = str(item).lower()
-        
-        for pii_type, pattern in self.pii_patterns.items():
-            if re.search(pattern, item_str, re.IGNORECASE):
-                issues.append(f"Potential {pii_type.upper()} detected")
+    @staticmethod
+    def merge(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """One report from the reports of consecutive batches, as if checked together"""
+        merged = dict(reports[0])
+        merged["flagged"] = []
+        merged["issue_counts"] = {}
+        merged["issue_labels"] = {}
+        if "field_findings" in merged:
+            merged["field_findings"] = []
+        offset = 0
+        for report in reports:
+            for flagged in report["flagged"]:
+                merged["flagged"].append({**flagged, "index": flagged["index"] + offset} if "index" in flagged else flagged)
+            for issue_id, count in report["issue_counts"].items():
+                merged["issue_counts"][issue_id] = merged["issue_counts"].get(issue_id, 0) + count
+            merged["issue_labels"].update(report["issue_labels"])
+            if "field_findings" in report:
+                merged["field_findings"].extend((row + offset, column, label) for row, column, label in report["field_findings"])
+            offset += report["summary"]["total_items"]
         
-        return issues
+        flagged_items = len(merged["flagged"])
+        merged["safety_score"] = max(0, 100 - (flagged_items / offset) * 100) if offset else 100
+        merged["passed"] = flagged_items == 0
+        merged["summary"] = {
+            "total_items": offset,
+            "flagged_items": flagged_items,
+            "safety_score": merged["safety_score"]
+        }
+        return merged
+    
+    def _pii_issues(self, findings: Dict[str, list]) -> List[Tuple[str, str, list]]:
+        """(issue id, message, matches) for each kind of PII found"""
+        return [
+            (f"pii:{pii_type}", f"Potential {pii_type.upper()} detected", findings[f"pii:{pii_type}"])
+            for pii_type in self.pii_patterns
+            if f"pii:{pii_type}" in findings
+        ]
     
-    def _check_domain_specific(self, item: Any, domain: str) -> List[str]:
+    def _domain_issues(self, domain: str, findings: Dict[str, list]) -> List[Tuple[str, str, list]]:
+        """(issue id, message, matches) if domain-specific sensitive information was found"""
+        if domain not in self.domain_specific_patterns or not has_any(findings, f"domain:{domain}:"):
+            return []
+        matches = prefix_matches(findings, f"domain:{domain}:")
+        return [(f"domain:{domain}", "Domain-specific sensitive information detected", matches)]
+    
+    def _check_pii(self, item: Any, findings: Dict[str, list] = None) -> List[str]:
+        """Check for personally identifiable information"""
+        if findings is None:
+            findings = scan_item(item)
+        return [message for _, message, _ in self._pii_issues(findings)]
+    
+    def _check_domain_specific(self, item: Any, domain: str, findings: Dict[str, list] = None) -> List[str]:
         """Check for domain-specific sensitive information"""
-        issues = []
-        item_str = str(item).lower()
-        
-        if domain in self.domain_specific_patterns:
-            for pattern in self.domain_specific_patterns[domain]:
-                if re.search(pattern, item_str, re.IGNORECASE):
-                    issues.append(f"Domain-specific sensitive information detected")
-                    break
-        
-        return issues
\ No newline at end of file
+        if findings is None:
+            findings = scan_item(item)
+        return [message for _, message, _ in self._domain_issues(domain, findings)]
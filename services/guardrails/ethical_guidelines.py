@@ -1,131 +1,119 @@
-import re
 from typing import Dict, List, Any
-
-ETHICAL_RULES = {
-    "healthcare": [
-        "No real patient identifiers",
-        "Diagnosis codes must be ICD-10 compliant",
-        "Drug names must be generic"
-    ],
-    "finance": [
-        "No real account numbers",
-        "Transaction amounts below $10,000",
-        "Fake bank names only"
-    ],
-    "general": [
-        "No real personal information",
-        "No real company names",
-        "No real addresses"
-    ]
-}
+from guardrails.patterns import ETHICAL_RULES, ETHICS_PATTERNS, ETHICS_KEYWORDS, rule_id, rule_violation_categories
+from guardrails.pattern_scanner import scan_item, scan_items, scan_fields, has_any, prefix_matches
 
 class EthicalEnforcer:
     def __init__(self):
-        self.patterns = {
-            "patient identifiers": [
-                r'\b[A-Z]{2}\d{6}\b',  # Medical record numbers
-                r'\b\d{3}-\d{2}-\d{4}\b',  # SSN
-                r'\b[A-Za-z]+\s+\d{6,}\b'  # Name + number patterns
-            ],
-            "real account numbers": [
-                r'\b\d{4}[- ]?\d{4}[- ]?\d{4}[- ]?\d{4}\b',  # Credit card
-                r'\b\d{8,12}\b'  # Account numbers
-            ],
-            "real company names": [
-                r'\b(Apple|Google|Microsoft|Amazon|Facebook|Tesla|Netflix|Uber|Airbnb)\b',
-                r'\b(JP Morgan|Goldman Sachs|Morgan Stanley|Bank of America|Wells Fargo)\b'
-            ],
-            "real addresses": [
-                r'\b\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Drive|Dr|Lane|Ln|Way|Place|Pl|Court|Ct)\b'
-            ],
-            "high amounts": [
-                r'\$\d{5,}',  # Amounts $10,000+
-                r'\d{5,}\s*dollars',
-                r'\d{5,}\s*USD'
-            ]
-        }
+        self.patterns = ETHICS_PATTERNS
+        self.keywords = ETHICS_KEYWORDS
+        self._rule_prefixes: Dict[str, List[str]] = {}
     
-    def validate(self, data: list, domain: str) -> dict:
-        """Apply domain-specific ethical rules"""
+    def validate(self, data: list, domain: str, findings: List[Dict[str, list]] = None,
+                 fields: bool = False, verbose: bool = False) -> dict:
+        """Apply domain-specific ethical rules.
+
+        `findings` are per-item scanner results from `scan_items(data, domain)`
+        (or `scan_fields` when `fields` is set); pass them in to share one scan
+        with ContentGuard. With `fields`, the report adds (row, column, rule)
+        `field_findings`.
+
+        Violations are reported compactly by row index, rule id and the
+        matched spans (or columns, for field scans), with per-rule counts.
+        `verbose` copies the rule text and offending item into each violation.
+        """
         violations = []
+        field_findings = []
         rules = ETHICAL_RULES.get(domain, ETHICAL_RULES["general"])
+        rule_counts = {rule_id(rule): 0 for rule in rules}
         
-        for i, item in enumerate(data):
+        if findings is None:
+            findings = scan_fields(data, domain) if fields else scan_items(data, domain)
+        
+        for i, (item, item_findings) in enumerate(zip(data, findings)):
             for rule in rules:
-                if not self._complies(item, rule):
-                    violations.append({
+                offending = self._offending_prefixes(rule, item_findings)
+                if not offending:
+                    continue
+                
+                matches = []
+                for prefix in offending:
+                    matches.extend(m for m in prefix_matches(item_findings, prefix) if m not in matches)
+                
+                if verbose:
+                    violation = {
                         "index": i,
                         "rule": rule,
                         "offending_data": item
-                    })
+                    }
+                    if fields:
+                        violation["fields"] = matches
+                else:
+                    violation = {"index": i, "rule": rule_id(rule), "matches": matches}
+                violations.append(violation)
+                rule_counts[rule_id(rule)] += 1
+                if fields:
+                    label = rule if verbose else rule_id(rule)
+                    field_findings.extend((i, column, label) for column in matches)
         
         compliance_score = 1 - (len(violations) / len(data)) if data else 1
         
-        return {
+        report = {
             "violations": violations,
             "compliance_score": compliance_score,
             "total_items": len(data),
             "violation_count": len(violations),
+            "rule_counts": rule_counts,
+            "rules": {rule_id(rule): rule for rule in rules},
             "domain": domain
         }
+        if fields:
+            report["field_findings"] = field_findings
+        return report
     
-    def _complies(self, item: Any, rule: str) -> bool:
-        """Check if an item complies with a specific ethical rule"""
-        item_str = str(item).lower()
-        
-        # Check for patient identifiers
-        if "patient identifiers" in rule.lower():
-            for pattern in self.patterns["patient identifiers"]:
-                if re.search(pattern, item_str, re.IGNORECASE):
-                    return False
-        
-        # Check for real account numbers
-        if "account numbers" in rule.lower():
-            for pattern in self.patterns["real account numbers"]:
-                if re.search(pattern, item_str, re.IGNORECASE):
-                    return False
+    @staticmethod
+    def merge(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """One report from the reports of consecutive batches, as if validated together"""
+        merged = dict(reports[0])
+        merged["violations"] = []
+        merged["rule_counts"] = dict.fromkeys(merged["rule_counts"], 0)
+        if "field_findings" in merged:
+            merged["field_findings"] = []
+        offset = 0
+        for report in reports:
+            merged["violations"].extend({**violation, "index": violation["index"] + offset} for violation in report["violations"])
+            for rule, count in report["rule_counts"].items():
+                merged["rule_counts"][rule] += count
+            if "field_findings" in report:
+                merged["field_findings"].extend((row + offset, column, label) for row, column, label in report["field_findings"])
+            offset += report["total_items"]
         
-        # Check for real company names
-        if "company names" in rule.lower():
-            for pattern in self.patterns["real company names"]:
-                if re.search(pattern, item_str, re.IGNORECASE):
-                    return False
-        
-        # Check for real addresses
-        if "addresses" in rule.lower():
-            for pattern in self.patterns["real addresses"]:
-                if re.search(pattern, item_str, re.IGNORECASE):
-                    return False
-        
-        # Check for high amounts
-        if "below $10,000" in rule.lower():
-            for pattern in self.patterns["high amounts"]:
-                if re.search(pattern, item_str, re.IGNORECASE):
-                    return False
-        
-        # Check for generic drug names (healthcare)
-        if "generic" in rule.lower() and "drug" in rule.lower():
-            # Check if drug names are generic (not brand names)
-            brand_patterns = [
-                r'\b(Advil|Tylenol|Aspirin|Ibuprofen|Acetaminophen)\b',
-                r'\b(Vicodin|OxyContin|Percocet|Codeine|Morphine)\b'
-            ]
-            for pattern in brand_patterns:
-                if re.search(pattern, item_str, re.IGNORECASE):
-                    return False
+        merged["compliance_score"] = 1 - (len(merged["violations"]) / offset) if offset else 1
+        merged["total_items"] = offset
+        merged["violation_count"] = len(merged["violations"])
+        return merged
+    
+    def _violation_prefixes(self, rule: str) -> List[str]:
+        """Scanner id prefixes whose presence breaks a rule"""
+        prefixes = self._rule_prefixes.get(rule)
+        if prefixes is None:
+            prefixes = [f"ethics:{category}:" for category in rule_violation_categories(rule)]
+            self._rule_prefixes[rule] = prefixes
+        return prefixes
+    
+    def _offending_prefixes(self, rule: str, findings: Dict[str, list]) -> List[str]:
+        """Finding id prefixes that make an item break a rule; empty if it complies"""
+        offending = [prefix for prefix in self._violation_prefixes(rule) if has_any(findings, prefix)]
         
         # Check for ICD-10 compliance (healthcare)
-        if "icd-10" in rule.lower():
-            # Basic ICD-10 format check (A00-Z99.XXX)
-            icd10_pattern = r'\b[A-Z]\d{2}\.\d{1,3}\b'
-            if re.search(icd10_pattern, item_str, re.IGNORECASE):
-                return True  # Valid ICD-10 code
-            elif re.search(r'\b[A-Z]\d{2}\b', item_str, re.IGNORECASE):
-                return True  # Valid ICD-10 code without decimal
-            else:
-                # If it looks like a diagnosis but not ICD-10 format, flag it
-                diagnosis_keywords = ['diagnosis', 'condition', 'disease', 'syndrome']
-                if any(keyword in item_str for keyword in diagnosis_keywords):
-                    return False
+        if "icd-10" in rule.lower() and not has_any(findings, "ethics:icd10 codes:"):
+            # If it looks like a diagnosis but not ICD-10 format, flag it
+            if has_any(findings, "ethics:diagnosis keywords:"):
+                offending.append("ethics:diagnosis keywords:")
         
-        return True
\ No newline at end of file
+        return offending
+    
+    def _complies(self, item: Any, rule: str, findings: Dict[str, list] = None) -> bool:
+        """Check if an item complies with a specific ethical rule"""
+        if findings is None:
+            findings = scan_item(item)
+        return not self._offending_prefixes(rule, findings)
\ No newline at end of file
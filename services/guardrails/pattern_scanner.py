@@ -0,0 +1,209 @@
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+from core.dataset import TabularDataset
+from guardrails.patterns import (
+    PII_PATTERNS, DOMAIN_SPECIFIC_PATTERNS, ETHICS_PATTERNS, ETHICS_KEYWORDS, ETHICAL_RULES,
+    NUMERIC_CHECKS, rule_categories
+)
+from utils.keyword_automaton import KeywordAutomaton
+
+Span = Tuple[int, int]
+# (row, column, finding id) reported by field scanning
+FieldFinding = Tuple[int, str, str]
+
+# Joins item texts into one corpus; no guardrail pattern can match across it
+_SEPARATOR = "\x00"
+
+class PatternScanner:
+    """Finds many regex patterns across many texts with one pass per distinct pattern.
+
+    Patterns are deduplicated and compiled once. `scan_texts` joins the texts
+    with a separator none of the patterns can consume, runs each pattern over
+    the joined corpus and maps every match back to its text, so a batch costs
+    one regex call per pattern instead of one per pattern per item. Keyword
+    blocklists ({id: [keywords]}) share a single whole-word automaton pass.
+    """
+
+    def __init__(self, patterns: Dict[str, str], keywords: Dict[str, List[str]] = None,
+                 flags: int = re.IGNORECASE):
+        self._compiled: Dict[str, Tuple["re.Pattern", List[str]]] = {}
+        for pattern_id, pattern in patterns.items():
+            if pattern not in self._compiled:
+                self._compiled[pattern] = (re.compile(pattern, flags), [])
+            self._compiled[pattern][1].append(pattern_id)
+        self._automaton = KeywordAutomaton(keywords, whole_words=True) if keywords else None
+
+    def scan_texts(self, texts: List[str]) -> List[Dict[str, List[Span]]]:
+        """Return {pattern_id: [(start, end), ...]} for every text, offsets relative to that text"""
+        results: List[Dict[str, List[Span]]] = [{} for _ in texts]
+        if not texts:
+            return results
+
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + len(_SEPARATOR)
+        corpus = _SEPARATOR.join(text.replace(_SEPARATOR, " ") for text in texts)
+
+        for regex, pattern_ids in self._compiled.values():
+            for match in regex.finditer(corpus):
+                index = bisect_right(starts, match.start()) - 1
+                base = starts[index]
+                span = (match.start() - base, match.end() - base)
+                for pattern_id in pattern_ids:
+                    results[index].setdefault(pattern_id, []).append(span)
+
+        if self._automaton is not None:
+            for start, end, keyword_id in self._automaton.finditer(corpus):
+                index = bisect_right(starts, start) - 1
+                base = starts[index]
+                results[index].setdefault(keyword_id, []).append((start - base, end - base))
+        return results
+
+    def scan(self, text: str) -> Dict[str, List[Span]]:
+        return self.scan_texts([text])[0]
+
+def _ethics_categories(domain: str = None) -> List[str]:
+    if domain is None:
+        return list(dict.fromkeys([*ETHICS_PATTERNS, *ETHICS_KEYWORDS]))
+    rules = ETHICAL_RULES.get(domain, ETHICAL_RULES["general"])
+    return list(dict.fromkeys(category for rule in rules for category in rule_categories(rule)))
+
+def _pattern_table(domain: str = None) -> Dict[str, str]:
+    """Regex pattern ids for one domain's checks, or for every check when domain is None"""
+    patterns = {f"pii:{name}": pattern for name, pattern in PII_PATTERNS.items()}
+
+    domains = DOMAIN_SPECIFIC_PATTERNS if domain is None else [domain]
+    for name in domains:
+        for i, pattern in enumerate(DOMAIN_SPECIFIC_PATTERNS.get(name, [])):
+            patterns[f"domain:{name}:{i}"] = pattern
+
+    for category in _ethics_categories(domain):
+        for i, pattern in enumerate(ETHICS_PATTERNS.get(category, [])):
+            patterns[f"ethics:{category}:{i}"] = pattern
+    return patterns
+
+def _keyword_table(domain: str = None) -> Dict[str, List[str]]:
+    """Keyword blocklist ids for one domain's checks, or for every check when domain is None"""
+    return {
+        f"ethics:{category}:keywords": ETHICS_KEYWORDS[category]
+        for category in _ethics_categories(domain) if category in ETHICS_KEYWORDS
+    }
+
+# Every PII, domain and ethics pattern and blocklist, compiled once at import
+guardrail_scanner = PatternScanner(_pattern_table(), _keyword_table())
+
+def table_domain(domain: str) -> str:
+    """The domain whose pattern tables apply: a configured domain, else "general".
+
+    Request domains are free text; only these keys change what is scanned,
+    so caches are keyed by them and stay bounded.
+    """
+    return domain if domain in DOMAIN_SPECIFIC_PATTERNS or domain in ETHICAL_RULES else "general"
+
+@lru_cache(maxsize=None)
+def _scanner_for(domain: str) -> PatternScanner:
+    return PatternScanner(_pattern_table(domain), _keyword_table(domain))
+
+def scanner_for(domain: str) -> PatternScanner:
+    """Scanner limited to the patterns ContentGuard and EthicalEnforcer use for a domain"""
+    return _scanner_for(table_domain(domain))
+
+def item_text(item: Any) -> str:
+    """Text that guardrail patterns are matched against for one item"""
+    return str(item).lower()
+
+def scan_items(data: List[Any], domain: str) -> List[Dict[str, List[Span]]]:
+    """Findings for each item, shared by every guardrail checking the data for a domain"""
+    return scanner_for(domain).scan_texts([item_text(item) for item in data])
+
+def scan_item(item: Any) -> Dict[str, List[Span]]:
+    """Findings for a single item against every guardrail pattern"""
+    return guardrail_scanner.scan(item_text(item))
+
+@lru_cache(maxsize=None)
+def _numeric_checks_for(domain: str) -> Dict[str, dict]:
+    pattern_ids = [*_pattern_table(domain), *_keyword_table(domain)]
+    return {
+        check_id: check for check_id, check in NUMERIC_CHECKS.items()
+        if any(pattern_id.startswith(check_id.rsplit(":", 1)[0] + ":") for pattern_id in pattern_ids)
+    }
+
+def numeric_checks_for(domain: str) -> Dict[str, dict]:
+    """NUMERIC_CHECKS relevant to the patterns scanned for a domain"""
+    return _numeric_checks_for(table_domain(domain))
+
+def _numeric_mask(series: pd.Series, column: str, check: dict) -> np.ndarray:
+    values = pd.to_numeric(series, errors="coerce")
+    mask = np.zeros(len(values), dtype=bool)
+    if "digits" in check:
+        magnitude = values.abs()
+        for low, high in check["digits"]:
+            in_range = magnitude >= 10 ** (low - 1)
+            if high is not None:
+                in_range &= magnitude < 10 ** high
+            mask |= in_range.fillna(False).to_numpy(dtype=bool)
+    if "min_value" in check and any(hint in str(column).lower() for hint in check["columns"]):
+        mask |= (values >= check["min_value"]).fillna(False).to_numpy(dtype=bool)
+    return mask
+
+def scan_frame(frame: pd.DataFrame, domain: str) -> List[FieldFinding]:
+    """Scan a table field by field, one column at a time.
+
+    String columns go through the domain's text patterns, numeric columns
+    only through NUMERIC_CHECKS, and other dtypes (booleans, datetimes) are
+    skipped. Rows are positional.
+    """
+    scanner = scanner_for(domain)
+    numeric_checks = numeric_checks_for(domain)
+    frame = frame.reset_index(drop=True)
+    findings: List[FieldFinding] = []
+
+    for column in frame.columns:
+        series = frame[column]
+        if ptypes.is_bool_dtype(series) or ptypes.is_datetime64_any_dtype(series):
+            continue
+        if ptypes.is_numeric_dtype(series):
+            for check_id, check in numeric_checks.items():
+                rows = np.flatnonzero(_numeric_mask(series, column, check))
+                findings.extend((int(row), column, check_id) for row in rows)
+            continue
+
+        values = series.dropna()
+        texts = values.astype(str).str.lower().tolist()
+        for row, hits in zip(values.index, scanner.scan_texts(texts)):
+            findings.extend((int(row), column, pattern_id) for pattern_id in hits)
+
+    findings.sort()
+    return findings
+
+def scan_fields(data: Union[List[Dict[str, Any]], pd.DataFrame, TabularDataset],
+                domain: str) -> List[Dict[str, List[str]]]:
+    """Per-item findings from field scanning, as {finding id: [columns]}"""
+    if isinstance(data, TabularDataset):
+        frame = data.frame
+    else:
+        frame = data if isinstance(data, pd.DataFrame) else pd.DataFrame(list(data))
+    results: List[Dict[str, List[str]]] = [{} for _ in range(len(frame))]
+    for row, column, finding_id in scan_frame(frame, domain):
+        results[row].setdefault(finding_id, []).append(column)
+    return results
+
+def has_any(findings: Dict[str, List[Span]], prefix: str) -> bool:
+    return any(pattern_id.startswith(prefix) for pattern_id in findings)
+
+def prefix_matches(findings: Dict[str, list], prefix: str) -> list:
+    """Spans (or columns, for field scans) of every finding whose id starts with prefix"""
+    matches = []
+    for finding_id, finding_matches in findings.items():
+        if finding_id.startswith(prefix):
+            matches.extend(match for match in finding_matches if match not in matches)
+    return matches
@@ -0,0 +1,130 @@
+import re
+from typing import List
+
+# Pattern tables and rules shared by ContentGuard, EthicalEnforcer and the pattern scanner
+
+ETHICAL_RULES = {
+    "healthcare": [
+        "No real patient identifiers",
+        "Diagnosis codes must be ICD-10 compliant",
+        "Drug names must be generic"
+    ],
+    "finance": [
+        "No real account numbers",
+        "Transaction amounts below $10,000",
+        "Fake bank names only"
+    ],
+    "general": [
+        "No real personal information",
+        "No real company names",
+        "No real addresses"
+    ]
+}
+
+PII_PATTERNS = {
+    'ssn': r'\b\d{3}-\d{2}-\d{4}\b',
+    'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+    'phone': r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',
+    'credit_card': r'\b\d{4}[- ]?\d{4}[- ]?\d{4}[- ]?\d{4}\b',
+    'address': r'\b\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Drive|Dr|Lane|Ln|Way|Place|Pl|Court|Ct)\b'
+}
+
+DOMAIN_SPECIFIC_PATTERNS = {
+    'healthcare': [
+        r'\b(patient|medical record|diagnosis|treatment|prescription|medication)\b',
+        r'\b\d{10,}\b',  # Medical record numbers
+    ],
+    'finance': [
+        r'\b(account number|routing number|swift code|iban)\b',
+        r'\b\d{8,}\b',  # Account numbers
+    ]
+}
+
+ETHICS_PATTERNS = {
+    "patient identifiers": [
+        r'\b[A-Z]{2}\d{6}\b',  # Medical record numbers
+        r'\b\d{3}-\d{2}-\d{4}\b',  # SSN
+        r'\b[A-Za-z]+\s+\d{6,}\b'  # Name + number patterns
+    ],
+    "real account numbers": [
+        r'\b\d{4}[- ]?\d{4}[- ]?\d{4}[- ]?\d{4}\b',  # Credit card
+        r'\b\d{8,12}\b'  # Account numbers
+    ],
+    "real addresses": [
+        r'\b\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Drive|Dr|Lane|Ln|Way|Place|Pl|Court|Ct)\b'
+    ],
+    "high amounts": [
+        r'\$\d{5,}',  # Amounts $10,000+
+        r'\d{5,}\s*dollars',
+        r'\d{5,}\s*USD'
+    ],
+    # Basic ICD-10 format check (A00-Z99.XXX), with and without the decimal part
+    "icd10 codes": [
+        r'\b[A-Z]\d{2}\.\d{1,3}\b',
+        r'\b[A-Z]\d{2}\b'
+    ],
+    "diagnosis keywords": [
+        r'diagnosis|condition|disease|syndrome'
+    ]
+}
+
+def rule_id(rule: str) -> str:
+    """Short stable id for an ethical rule, e.g. "no_real_account_numbers" """
+    return re.sub(r'[^a-z0-9]+', '_', rule.lower()).strip('_')
+
+# Whole-word name blocklists, matched by one keyword automaton rather than regex
+# alternations, so they can grow to full real-world lists
+ETHICS_KEYWORDS = {
+    "real company names": [
+        "Apple", "Google", "Microsoft", "Amazon", "Facebook", "Tesla", "Netflix", "Uber", "Airbnb",
+        "JP Morgan", "Goldman Sachs", "Morgan Stanley", "Bank of America", "Wells Fargo"
+    ],
+    # Brand names only; generics such as ibuprofen or morphine comply with the rule
+    "brand drug names": [
+        "Advil", "Motrin", "Aleve", "Tylenol", "Zoloft",
+        "Vicodin", "OxyContin", "Percocet", "Xanax", "Lipitor"
+    ]
+}
+
+# Pattern categories whose presence violates a rule, keyed by a phrase in the rule text
+RULE_VIOLATIONS = [
+    ("patient identifiers", "patient identifiers"),
+    ("account numbers", "real account numbers"),
+    ("company names", "real company names"),
+    ("addresses", "real addresses"),
+    ("below $10,000", "high amounts")
+]
+
+def rule_violation_categories(rule: str) -> List[str]:
+    """ETHICS_PATTERNS categories whose presence breaks a rule"""
+    rule_lower = rule.lower()
+    categories = [category for phrase, category in RULE_VIOLATIONS if phrase in rule_lower]
+    # Drug names must be generic (not brand names)
+    if "generic" in rule_lower and "drug" in rule_lower:
+        categories.append("brand drug names")
+    return categories
+
+def rule_categories(rule: str) -> List[str]:
+    """Every ETHICS_PATTERNS category a rule looks at"""
+    categories = rule_violation_categories(rule)
+    if "icd-10" in rule.lower():
+        categories += ["icd10 codes", "diagnosis keywords"]
+    return categories
+
+# Numeric-column checks used by field scanning, keyed by the finding id they report.
+# Text patterns never see numeric fields; these cover the same rules directly:
+# "digits" bounds the length of the integer part, "min_value" flags amounts in
+# columns whose name contains one of "columns".
+AMOUNT_COLUMN_HINTS = (
+    "amount", "price", "cost", "balance", "salary", "income", "payment",
+    "revenue", "fee", "total", "usd", "dollar"
+)
+
+NUMERIC_CHECKS = {
+    "pii:phone": {"digits": [(10, 10)]},
+    "pii:credit_card": {"digits": [(16, 16)]},
+    "domain:healthcare:numeric": {"digits": [(10, None)]},  # Medical record numbers
+    "domain:finance:numeric": {"digits": [(8, None)]},  # Account numbers
+    "ethics:real account numbers:numeric": {"digits": [(8, 12), (16, 16)]},
+    "ethics:high amounts:numeric": {"min_value": 10000, "columns": AMOUNT_COLUMN_HINTS}
+}
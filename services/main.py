@@ -1,19 +1,47 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from schemas.tabular_schema import TabularRequest
 from schemas.qa_schema import QARequest
-from core.generation_engine import generate_dataset
+from core.generation_engine import generate_dataset, stream_dataset
+from core.file_writer import encode_stream
+from core.compression import ENCODINGS, compress_file, negotiate_encoding
+from core.artifact_store import Artifact, artifact_store, strong_etag
+from core.job_manager import job_manager, JobQueueFull, JobStatus
+from core.report_stages import shutdown_report_executor
+from guardrails.budget import GuardrailBudgetExceeded
+from schemas.job_schema import JobSubmission
 from feedback.feedback_handler import FeedbackSystem
 from schemas.feedback_schema import FeedbackSubmission
-import os
+from utils.gemini_client import gemini_client
+from utils.rate_limiter import ModelUnavailableError, model_scheduler
+from config import config
+from contextlib import asynccontextmanager
+from typing import Optional
+import asyncio
+import json
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Configure the model client once so requests reuse its transport and model handles
+    if config.MODEL_BACKEND == "gemini":
+        try:
+            gemini_client.configure()
+        except ValueError as e:
+            logger.warning(f"Gemini client not configured at startup: {str(e)}")
+    # Drop datasets that expired while the server was down
+    artifact_store.evict()
+    job_manager.start()
+    yield
+    await job_manager.stop()
+    shutdown_report_executor()
+
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware to allow access from everywhere
 app.add_middleware(
@@ -22,6 +50,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all methods
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["X-Dataset-Id", "ETag", "Content-Range", "Accept-Ranges"],
 )
 
 feedback_handler = FeedbackSystem()
@@ -45,40 +74,209 @@ async def health_check_detailed():
         "endpoints": {
             "tabular": "/generate/tabular",
             "qa": "/generate/qa",
+            "tabular_stream": "/generate/tabular/stream",
+            "qa_stream": "/generate/qa/stream",
+            "jobs": "/jobs",
+            "datasets": "/datasets/{dataset_id}",
             "feedback": "/feedback"
-        }
+        },
+        "model_scheduler": model_scheduler.get_stats()
     }
 
+OUTPUT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "json": "application/json",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file"
+}
+
+def _download_encoding(compression: Optional[str], accept_encoding: Optional[str]) -> Optional[str]:
+    """Encoding for a download, checked before any work is done for the request"""
+    try:
+        return negotiate_encoding(compression, accept_encoding)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match test; it uses weak comparison, so a W/ prefix is ignored"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return etag in (candidate[2:] if candidate.startswith("W/") else candidate for candidate in candidates)
+
+async def artifact_download(artifact: Artifact, encoding: Optional[str] = None, explicit: bool = False,
+                            if_none_match: Optional[str] = None) -> Response:
+    """Serve a stored dataset, compressed when an encoding was negotiated.
+
+    An explicit `compression` parameter returns the compressed file itself
+    (e.g. tabular_dataset.csv.gz); an encoding negotiated from
+    Accept-Encoding keeps the original type and sets Content-Encoding.
+    Every representation carries a strong ETag from its content hash, and a
+    matching If-None-Match answers 304. Range and If-Range requests are
+    served by FileResponse against that ETag. The dataset id is returned in
+    the X-Dataset-Id header.
+    """
+    media_type = OUTPUT_MEDIA_TYPES[artifact.format]
+    filename = artifact.filename
+    path = artifact.path
+    headers = {"X-Dataset-Id": artifact.id}
+    if not explicit:
+        headers["Vary"] = "Accept-Encoding"
+
+    if encoding is None:
+        headers["ETag"] = artifact.etag
+    else:
+        path = await asyncio.to_thread(compress_file, artifact.path, encoding)
+        headers["ETag"] = await asyncio.to_thread(strong_etag, path)
+        suffix, compressed_type = ENCODINGS[encoding]
+        if explicit:
+            media_type = compressed_type
+            filename += suffix
+        else:
+            headers["Content-Encoding"] = encoding
+
+    if etag_matches(if_none_match, headers["ETag"]):
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, filename=filename, headers=headers)
+
 @app.post("/generate/tabular")
-async def generate_tabular(request: TabularRequest):
+async def generate_tabular(request: TabularRequest, compression: Optional[str] = None,
+                           accept_encoding: Optional[str] = Header(None)):
     logger.info(f"Received tabular generation request for {request.num_rows} rows")
+    encoding = _download_encoding(compression, accept_encoding)
     try:
-        file_path = await generate_dataset(request, "tabular")
-        logger.info(f"Tabular generation completed successfully: {file_path}")
-        return FileResponse(
-            file_path,
-            media_type="text/csv" if request.output_format == "csv" else "application/json",
-            filename=f"tabular_dataset.{request.output_format}"
-        )
+        artifact = await generate_dataset(request, "tabular")
+        logger.info(f"Tabular generation completed successfully: dataset {artifact.id}")
+        return await artifact_download(artifact, encoding, explicit=bool(compression))
+    except ModelUnavailableError as e:
+        logger.error(f"Tabular generation failed, model unavailable: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    except GuardrailBudgetExceeded as e:
+        logger.error(f"Tabular generation aborted by guardrails: {str(e)}")
+        raise HTTPException(status_code=422, detail={"message": str(e), "guardrail_budget": e.budget})
     except Exception as e:
         logger.error(f"Tabular generation failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/generate/qa")
-async def generate_qa(request: QARequest):
+async def generate_qa(request: QARequest, compression: Optional[str] = None,
+                      accept_encoding: Optional[str] = Header(None)):
     logger.info(f"Received QA generation request for {request.num_pairs} pairs")
+    encoding = _download_encoding(compression, accept_encoding)
     try:
-        file_path = await generate_dataset(request, "qa")
-        logger.info(f"QA generation completed successfully: {file_path}")
-        return FileResponse(
-            file_path,
-            media_type="application/json",
-            filename="qa_pairs.json"
-        )
+        artifact = await generate_dataset(request, "qa")
+        logger.info(f"QA generation completed successfully: dataset {artifact.id}")
+        return await artifact_download(artifact, encoding, explicit=bool(compression))
+    except ModelUnavailableError as e:
+        logger.error(f"QA generation failed, model unavailable: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    except GuardrailBudgetExceeded as e:
+        logger.error(f"QA generation aborted by guardrails: {str(e)}")
+        raise HTTPException(status_code=422, detail={"message": str(e), "guardrail_budget": e.budget})
     except Exception as e:
         logger.error(f"QA generation failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+@app.post("/generate/tabular/stream")
+async def generate_tabular_stream(request: TabularRequest, format: str = "ndjson"):
+    """Stream rows as NDJSON or CSV while batches are generated; metadata is the trailing record"""
+    if format not in STREAM_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported stream format: {format}")
+    logger.info(f"Received streaming tabular generation request for {request.num_rows} rows ({format})")
+    column_names = [col.name for col in request.columns]
+    return StreamingResponse(
+        encode_stream(stream_dataset(request, "tabular"), format, column_names),
+        media_type=STREAM_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tabular_dataset.{format}"'}
+    )
+
+@app.post("/generate/qa/stream")
+async def generate_qa_stream(request: QARequest):
+    """Stream QA pairs as NDJSON while batches are generated; metadata is the trailing record"""
+    logger.info(f"Received streaming QA generation request for {request.num_pairs} pairs")
+    return StreamingResponse(
+        encode_stream(stream_dataset(request, "qa"), "ndjson"),
+        media_type=STREAM_MEDIA_TYPES["ndjson"],
+        headers={"Content-Disposition": 'attachment; filename="qa_pairs.ndjson"'}
+    )
+
+def _get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+@app.post("/jobs", status_code=202)
+async def submit_job(submission: JobSubmission):
+    """Queue a generation job and return its id immediately"""
+    try:
+        job = job_manager.submit(submission.request, submission.dataset_type)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return job.to_dict()
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    return _get_job(job_id).to_dict()
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Server-sent events with job progress until the job completes or fails"""
+    job = _get_job(job_id)
+
+    async def event_stream():
+        async for snapshot in job_manager.events(job):
+            if snapshot is None:
+                yield ": keepalive\n\n"
+            else:
+                event = snapshot["status"] if snapshot["status"] in (JobStatus.COMPLETED, JobStatus.FAILED) else "progress"
+                yield f"event: {event}\ndata: {json.dumps(snapshot)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str, compression: Optional[str] = None,
+                         accept_encoding: Optional[str] = Header(None),
+                         if_none_match: Optional[str] = Header(None)):
+    job = _get_job(job_id)
+    encoding = _download_encoding(compression, accept_encoding)
+    if job.status == JobStatus.FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != JobStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+
+    artifact = artifact_store.get(job.artifact.id)
+    if artifact is None:
+        raise HTTPException(status_code=410, detail=f"Dataset {job.artifact.id} has expired")
+    return await artifact_download(artifact, encoding, explicit=bool(compression), if_none_match=if_none_match)
+
+@app.api_route("/datasets/{dataset_id}", methods=["GET", "HEAD"])
+async def get_dataset(dataset_id: str, compression: Optional[str] = None,
+                      accept_encoding: Optional[str] = Header(None),
+                      if_none_match: Optional[str] = Header(None)):
+    """Download a previously generated dataset again without regenerating it.
+
+    Supports conditional requests (If-None-Match) and byte ranges (Range,
+    If-Range) for resumable or parallel chunked downloads.
+    """
+    encoding = _download_encoding(compression, accept_encoding)
+    artifact = artifact_store.get(dataset_id)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail=f"Dataset not found: {dataset_id}")
+    return await artifact_download(artifact, encoding, explicit=bool(compression), if_none_match=if_none_match)
+
 @app.post("/feedback")
 async def submit_feedback(feedback: dict):
     """Submit feedback from the contact form"""
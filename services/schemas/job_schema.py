@@ -0,0 +1,17 @@
+from pydantic import BaseModel, model_validator
+from typing import Union
+from .tabular_schema import TabularRequest
+from .qa_schema import QARequest
+
+class JobSubmission(BaseModel):
+    dataset_type: str  # 'tabular' or 'qa'
+    request: Union[TabularRequest, QARequest]
+    
+    @model_validator(mode='after')
+    def validate_dataset_type(self):
+        expected = TabularRequest if self.dataset_type == "tabular" else QARequest
+        if self.dataset_type not in ("tabular", "qa"):
+            raise ValueError("dataset_type must be 'tabular' or 'qa'")
+        if not isinstance(self.request, expected):
+            raise ValueError(f"request does not match dataset_type '{self.dataset_type}'")
+        return self
\ No newline at end of file
@@ -6,6 +6,7 @@ class QARequest(BaseModel):
     num_pairs: int
     context: str = ""
     constraints: str = ""
+    use_cache: bool = True  # False forces a fresh generation
     
     @field_validator('num_pairs')
     def validate_num_pairs(cls, v):
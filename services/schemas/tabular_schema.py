@@ -7,7 +7,14 @@ class TabularRequest(BaseModel):
     num_rows: int
     description: str
     use_case: str
-    output_format: str = "csv"  # 'csv' or 'json'
+    output_format: str = "csv"  # 'csv', 'json', 'parquet' or 'arrow'
+    use_cache: bool = True  # False forces a fresh generation
+    
+    @field_validator('output_format')
+    def validate_output_format(cls, v):
+        if v not in ("csv", "json", "parquet", "arrow"):
+            raise ValueError("Output format must be one of csv, json, parquet or arrow")
+        return v
     
     @field_validator('num_rows')
     def validate_num_rows(cls, v):
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The services modules import each other from the services directory, as under uvicorn
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,70 @@
+import json
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from core.dataset import TabularDataset
+from core.file_writer import to_arrow_table, write_tabular
+
+COLUMNS = [
+    {"name": "joined", "dtype": "datetime"},
+    {"name": "age", "dtype": "int"},
+    {"name": "score", "dtype": "float"},
+    {"name": "active", "dtype": "bool"},
+    {"name": "name", "dtype": "str"}
+]
+
+def _batches():
+    first = TabularDataset.from_rows([
+        {"joined": "2024-01-01", "age": "41", "score": "1.5", "active": "yes", "name": "Ann"},
+        {"joined": "2024-02-01 10:00", "age": 7.9, "score": 2, "active": True, "name": 3}
+    ], COLUMNS)
+    second = TabularDataset.from_rows([
+        {"joined": "N/A", "age": "old", "score": "x", "active": "maybe", "name": None},
+        {"joined": "2024-03-01T00:00:00Z", "age": 5, "score": 0.25, "active": "False", "name": "Bo"}
+    ], COLUMNS)
+    return first, second
+
+def test_unconvertible_values_become_null_in_every_dtype():
+    _, second = _batches()
+    assert second.frame.iloc[0].isna().all()
+    assert pd.api.types.is_datetime64_any_dtype(second.frame["joined"])
+
+def test_concat_keeps_the_defined_types():
+    dataset = TabularDataset.concat(list(_batches()), COLUMNS)
+    dtypes = {name: str(dtype) for name, dtype in dataset.frame.dtypes.items()}
+    assert dtypes["age"] == "Int64"
+    assert dtypes["score"] == "float64"
+    assert dtypes["active"] == "boolean"
+    assert str(dataset.frame["joined"].dt.tz) == "UTC"
+    assert dataset.frame["age"].tolist()[:2] == [41, 7]
+
+def test_arrow_schema_follows_column_definitions():
+    table = to_arrow_table(TabularDataset.concat(list(_batches()), COLUMNS), {})
+    assert table.schema.field("joined").type == pa.timestamp("us", tz="UTC")
+    assert table.schema.field("age").type == pa.int64()
+    assert table.schema.field("active").type == pa.bool_()
+    assert table.column("joined").null_count == 1
+
+def test_records_are_json_values():
+    dataset = TabularDataset.concat(list(_batches()), COLUMNS)
+    records = dataset.records()
+    assert records[0] == {"joined": "2024-01-01T00:00:00+00:00", "age": 41, "score": 1.5, "active": True, "name": "Ann"}
+    assert records[2] == {"joined": None, "age": None, "score": None, "active": None, "name": None}
+    json.dumps(records)
+
+def test_text_frame_renders_timestamps_in_object_columns():
+    frame = pd.DataFrame({"extra": [pd.Timestamp("2024-01-01", tz="UTC"), "text", None]})
+    assert TabularDataset(frame, []).records() == [
+        {"extra": "2024-01-01T00:00:00+00:00"}, {"extra": "text"}, {"extra": None}
+    ]
+
+@pytest.mark.parametrize("format", ["csv", "json", "parquet", "arrow"])
+def test_every_format_writes_a_concatenated_dataset(tmp_path, format):
+    dataset = TabularDataset.concat(list(_batches()), COLUMNS)
+    path = write_tabular({"data": dataset, "metadata": {"rows": 4}}, COLUMNS, format, str(tmp_path / f"out.{format}"))
+    assert (tmp_path / f"out.{format}").stat().st_size > 0
+    if format == "json":
+        with open(path) as f:
+            assert len(json.load(f)["data"]) == 4
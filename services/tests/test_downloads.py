@@ -0,0 +1,71 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from core.artifact_store import ArtifactStore
+
+CONTENT = b"id,name\n" + b"".join(f"{i},name {i}\n".encode() for i in range(200))
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    store = ArtifactStore(str(tmp_path / "artifacts"))
+    monkeypatch.setattr(main, "artifact_store", store)
+    artifact = store.save("tabular", "csv", lambda path: open(path, "wb").write(CONTENT))
+    # No lifespan: the download routes don't need the job workers or model client. httpx
+    # asks for compressed bodies by default; these tests want the stored file unless they say otherwise
+    return TestClient(main.app, headers={"Accept-Encoding": "identity"}), artifact
+
+def test_download_has_a_strong_etag(dataset):
+    client, artifact = dataset
+    response = client.get(f"/datasets/{artifact.id}")
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["etag"] == artifact.etag and not artifact.etag.startswith("W/")
+    assert response.headers["x-dataset-id"] == artifact.id
+    assert response.headers["accept-ranges"] == "bytes"
+
+@pytest.mark.parametrize("if_none_match", ["{etag}", "W/{etag}", '"other", {etag}', "*"])
+def test_matching_if_none_match_answers_not_modified(dataset, if_none_match):
+    client, artifact = dataset
+    response = client.get(f"/datasets/{artifact.id}", headers={"If-None-Match": if_none_match.format(etag=artifact.etag)})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == artifact.etag
+
+def test_stale_if_none_match_gets_the_file(dataset):
+    client, artifact = dataset
+    response = client.get(f"/datasets/{artifact.id}", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200 and response.content == CONTENT
+
+def test_range_request_returns_the_slice(dataset):
+    client, artifact = dataset
+    response = client.get(f"/datasets/{artifact.id}", headers={"Range": "bytes=8-19"})
+
+    assert response.status_code == 206
+    assert response.content == CONTENT[8:20]
+    assert response.headers["content-range"] == f"bytes 8-19/{len(CONTENT)}"
+
+def test_if_range_only_honours_the_current_etag(dataset):
+    client, artifact = dataset
+    current = client.get(f"/datasets/{artifact.id}", headers={"Range": "bytes=0-9", "If-Range": artifact.etag})
+    stale = client.get(f"/datasets/{artifact.id}", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+
+    assert current.status_code == 206 and current.content == CONTENT[:10]
+    assert stale.status_code == 200 and stale.content == CONTENT
+
+def test_compressed_download_has_its_own_etag(dataset):
+    client, artifact = dataset
+    response = client.get(f"/datasets/{artifact.id}", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] != artifact.etag
+    assert response.content == CONTENT  # httpx decodes the gzip body
+    repeat = client.get(f"/datasets/{artifact.id}", headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]})
+    assert repeat.status_code == 304
+
+def test_unknown_dataset_is_not_found(dataset):
+    client, _ = dataset
+    assert client.get("/datasets/00000000-0000-0000-0000-000000000000").status_code == 404
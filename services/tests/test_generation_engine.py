@@ -0,0 +1,139 @@
+import asyncio
+import json
+
+import pytest
+
+from agents import data_generator
+from config import config
+from core import generation_engine
+from schemas.base_models import ColumnDefinition
+from schemas.qa_schema import QARequest
+from schemas.tabular_schema import TabularRequest
+from utils.model_backends import ModelBackend
+from utils.rate_limiter import ModelCallScheduler
+
+class EmptyBackend(ModelBackend):
+    """Backend whose every response parses to no items"""
+    name = "empty"
+
+    async def generate(self, prompt: str, request=None) -> str:
+        return "[]"
+
+class FixedBackend(ModelBackend):
+    """Backend that returns the same rows for every prompt"""
+    name = "fixed"
+
+    def __init__(self, items):
+        self.items = items
+
+    async def generate(self, prompt: str, request=None) -> str:
+        return json.dumps(self.items)
+
+@pytest.fixture
+def use_backend(monkeypatch):
+    # The shared scheduler's locks bind to the first event loop that waits on them
+    monkeypatch.setattr(data_generator, "model_scheduler", ModelCallScheduler(**config.MODEL_SCHEDULER))
+
+    def use(backend):
+        monkeypatch.setattr(data_generator, "get_backend", lambda name=None: backend)
+    return use
+
+def _tabular_request(num_rows=4, output_format="csv"):
+    return TabularRequest(
+        columns=[ColumnDefinition(name="age", dtype="int", description="age", validation=">= 0")],
+        num_rows=num_rows, description="people", use_case="customer records", output_format=output_format
+    )
+
+def test_empty_tabular_generation_reports_the_shortfall(use_backend):
+    use_backend(EmptyBackend())
+    payload = asyncio.run(generation_engine.build_tabular_payload(_tabular_request()))
+
+    assert len(payload["data"]) == 0
+    assert payload["metadata"]["generation"] == {
+        "batches": 1, "rejected_items": 0, "requested_items": 4, "delivered_items": 0, "shortfall": 4
+    }
+    assert payload["metadata"]["quality_report"]["completeness"]["completeness_score"] == 0.0
+
+def test_short_tabular_generation_reports_rejected_and_missing_rows(use_backend):
+    use_backend(FixedBackend([{"age": 5}, {"age": -1}]))
+    payload = asyncio.run(generation_engine.build_tabular_payload(_tabular_request(num_rows=3)))
+
+    generation = payload["metadata"]["generation"]
+    assert generation["delivered_items"] == len(payload["data"]) == 3
+    assert generation["rejected_items"] > 0
+    assert generation["shortfall"] == 0
+
+def test_empty_qa_generation_reports_the_shortfall(use_backend):
+    use_backend(EmptyBackend())
+    request = QARequest(domain="healthcare", complexity="beginner", num_pairs=3)
+    payload = asyncio.run(generation_engine.build_qa_payload(request))
+
+    assert payload["metadata"]["generation"]["shortfall"] == 3
+    assert payload["metadata"]["generation"]["delivered_items"] == 0
+
+async def _collect_stream(request, dataset_type):
+    events = [event async for event in generation_engine.stream_dataset(request, dataset_type)]
+    rows = [item for kind, batch in events if kind == "rows" for item in batch]
+    assert events[-1][0] == "metadata"
+    return rows, events[-1][1]
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    monkeypatch.setattr(generation_engine.config, "TABULAR_BATCH_SIZE", 2)
+    monkeypatch.setattr(generation_engine.config, "QA_BATCH_SIZE", 2)
+    monkeypatch.setitem(config.RESPONSE_CACHE, "enabled", False)
+    monkeypatch.setitem(config.GUARDRAIL_SETTINGS, "enforce_budgets", False)
+
+REPORT_SECTIONS = ["quality_report", "business_value", "safety_report", "ethics_report", "guardrail_budget"]
+
+def test_streamed_tabular_report_matches_the_whole_dataset_report(use_backend, small_batches):
+    use_backend(FixedBackend([
+        {"age": 52, "note": "Advil daily"}, {"age": 30, "note": "call 555-123-4567"}, {"age": 41, "note": "fine"}
+    ]))
+    request = TabularRequest(
+        columns=[
+            ColumnDefinition(name="age", dtype="int", description="age"),
+            ColumnDefinition(name="note", dtype="string", description="note")
+        ],
+        num_rows=5, description="patients", use_case="hospital patient records", output_format="csv"
+    )
+    async def generate():
+        return await _collect_stream(request, "tabular"), await generation_engine.build_tabular_payload(request)
+    (rows, streamed), payload = asyncio.run(generate())
+
+    assert rows == payload["data"].records()
+    whole = generation_engine.convert_np(payload["metadata"])
+    for section in REPORT_SECTIONS:
+        assert streamed[section] == whole[section], section
+    assert streamed["generation"] == whole["generation"]
+
+def test_streamed_qa_report_matches_the_whole_dataset_report(use_backend, small_batches):
+    use_backend(FixedBackend([
+        {"question": "What does a patient take?", "answer": "Patients take treatment as the doctor says."},
+        {"question": "Who runs a hospital?", "answer": "Staff"}
+    ]))
+    request = QARequest(domain="healthcare", complexity="beginner", num_pairs=5)
+    async def generate():
+        return await _collect_stream(request, "qa"), await generation_engine.build_qa_payload(request)
+    (rows, streamed), payload = asyncio.run(generate())
+
+    assert rows == payload["data"]
+    whole = generation_engine.convert_np(payload["metadata"])
+    for section in REPORT_SECTIONS:
+        assert streamed[section] == whole[section], section
+
+def test_large_streams_are_not_cached(use_backend, monkeypatch):
+    use_backend(FixedBackend([{"age": 5}]))
+    stored = []
+    monkeypatch.setitem(config.RESPONSE_CACHE, "enabled", True)
+    monkeypatch.setitem(config.RESPONSE_CACHE, "max_stream_items", 2)
+    monkeypatch.setattr(generation_engine.response_cache, "get", lambda key: None)
+    monkeypatch.setattr(generation_engine.response_cache, "set", lambda key, value: stored.append(value))
+
+    async def generate():
+        await _collect_stream(_tabular_request(num_rows=2), "tabular")
+        return await _collect_stream(_tabular_request(num_rows=3), "tabular")
+    _, metadata = asyncio.run(generate())
+
+    assert len(stored) == 1 and len(stored[0]["data"]) == 2
+    assert metadata["generation"]["delivered_items"] == 3
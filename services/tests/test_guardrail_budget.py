@@ -0,0 +1,59 @@
+import pytest
+
+from config import config
+from guardrails.budget import GuardrailBudget, GuardrailBudgetExceeded, scan_batch
+
+HEALTHCARE_ROWS = [
+    {"patient_id": "P-1043", "condition": "Type 2 diabetes", "medication": "Metformin", "notes": "Chronic condition"},
+    {"patient_id": "P-1044", "condition": "Hypertension", "medication": "Ibuprofen", "notes": "Follow-up in 3 months"},
+    {"patient_id": "P-1045", "condition": "Asthma", "diagnosis_code": "J45.909", "medication": "Albuterol"}
+]
+
+def _budget(domain="general", **overrides):
+    settings = dict(fields=False, max_pii_rate=0.15, max_violation_rate=0.05, min_items=1)
+    settings.update(overrides)
+    return GuardrailBudget(domain, **settings)
+
+def test_budgets_are_enforced_by_default():
+    assert config.GUARDRAIL_SETTINGS["enforce_budgets"]
+
+@pytest.mark.parametrize("fields", [False, True])
+def test_ordinary_healthcare_vocabulary_stays_within_budget(fields):
+    findings, pii_items, violating_items = scan_batch(HEALTHCARE_ROWS, "healthcare", fields)
+    assert (pii_items, violating_items) == (0, 0)
+    _budget("healthcare", fields=fields).record(findings, pii_items, violating_items)
+
+def test_domain_findings_are_not_pii():
+    rows = [{"notes": "patient diagnosis and treatment plan"}]
+    findings, pii_items, _ = scan_batch(rows, "healthcare", False)
+    assert any(finding_id.startswith("domain:") for finding_id in findings[0])
+    assert pii_items == 0
+
+def test_item_breaking_several_rules_counts_once():
+    rows = [{"company": "Apple", "address": "12 Main Street", "email": "someone@example.com"}]
+    _, pii_items, violating_items = scan_batch(rows, "general", False)
+    assert (pii_items, violating_items) == (1, 1)
+
+def test_violation_rate_never_exceeds_one():
+    rows = [{"company": "Google", "address": "9 Elm Road"}] * 4
+    budget = _budget(max_pii_rate=1.0, max_violation_rate=1.0)
+    budget.record(*scan_batch(rows, "general", False))
+    assert budget.rates()[1] == 1.0
+
+def test_pii_over_budget_aborts():
+    rows = [{"name": "Ann"}] * 5 + [{"email": "ann@example.com"}]
+    with pytest.raises(GuardrailBudgetExceeded) as exc:
+        _budget().record(*scan_batch(rows, "general", False))
+    assert exc.value.budget["pii_rate"] == round(1 / 6, 4)
+
+def test_rates_wait_for_min_items_then_finish_enforces():
+    rows = [{"company": "Tesla"}]
+    budget = _budget(min_items=10)
+    budget.record(*scan_batch(rows, "general", False))
+    with pytest.raises(GuardrailBudgetExceeded):
+        budget.finish()
+
+def test_disabled_budget_never_aborts():
+    budget = _budget(enforce=False)
+    budget.record(*scan_batch([{"email": "ann@example.com"}], "general", False))
+    budget.finish()
@@ -0,0 +1,38 @@
+import asyncio
+
+from utils.json_stream import IncrementalJSONParser, aiter_json_objects, iter_json_objects
+
+RESPONSE = 'Here you go:\n```json\n[{"a": 1, "b": "x}"}, {"a": 2, "nested": {"c": [1, {"d": "\\"}"}]}}]\n```'
+
+def test_objects_are_emitted_however_the_text_is_split():
+    expected = [{"a": 1, "b": "x}"}, {"a": 2, "nested": {"c": [1, {"d": '"}'}]}}]
+    assert list(iter_json_objects([RESPONSE])) == expected
+    assert list(iter_json_objects(RESPONSE)) == expected  # one character per chunk
+    for cut in range(len(RESPONSE)):
+        assert list(iter_json_objects([RESPONSE[:cut], RESPONSE[cut:]])) == expected
+
+def test_object_is_emitted_as_soon_as_it_closes():
+    parser = IncrementalJSONParser()
+    assert parser.feed('[{"a": 1}, {"a"') == [{"a": 1}]
+    assert parser.feed(': 2}]') == [{"a": 2}]
+
+def test_malformed_object_is_dropped_without_losing_its_neighbours():
+    parser = IncrementalJSONParser()
+    assert parser.feed('[{"a": 1}, {"a": nope}, {"a": 3}]') == [{"a": 1}, {"a": 3}]
+    assert (parser.emitted, parser.discarded) == (2, 1)
+
+def test_truncated_trailing_object_is_reported_on_close():
+    parser = IncrementalJSONParser()
+    assert parser.feed('[{"a": 1}, {"a": 2, "b": "unfinished') == [{"a": 1}]
+    assert parser.close() is True
+    assert parser.discarded == 1
+    assert parser.close() is False
+
+def test_async_stream():
+    async def chunks():
+        for chunk in ('[{"a"', ': 1}, {"a": 2}', ']'):
+            yield chunk
+
+    async def collect():
+        return [obj async for obj in aiter_json_objects(chunks())]
+    assert asyncio.run(collect()) == [{"a": 1}, {"a": 2}]
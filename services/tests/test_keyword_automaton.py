@@ -0,0 +1,43 @@
+import random
+import re
+
+from utils.keyword_automaton import KeywordAutomaton
+
+KEYWORDS = {
+    "health": ["patient", "doctor", "health", "he"],
+    "finance": ["loan", "she", "hers", "supply chain"]
+}
+
+def _regex_hits(text, whole_words):
+    hits = set()
+    for label, keywords in KEYWORDS.items():
+        for keyword in keywords:
+            pattern = rf"\b{re.escape(keyword)}\b" if whole_words else re.escape(keyword)
+            # Lookahead so overlapping occurrences are all found
+            for match in re.finditer(f"(?=({pattern}))", text.lower()):
+                hits.add((match.start(1), match.end(1), label))
+    return hits
+
+def test_overlapping_and_nested_keywords_are_all_found():
+    automaton = KeywordAutomaton(KEYWORDS)
+    assert sorted(automaton.finditer("ushers")) == [(1, 4, "finance"), (2, 4, "health"), (2, 6, "finance")]
+
+def test_matching_is_case_insensitive():
+    automaton = KeywordAutomaton(KEYWORDS)
+    assert automaton.labels("The DOCTOR approved the Loan") == {"health", "finance"}
+    assert "SUPPLY CHAIN delays" in automaton
+    assert "nothing relevant" not in automaton
+
+def test_whole_words_respect_boundaries():
+    automaton = KeywordAutomaton(KEYWORDS, whole_words=True)
+    assert automaton.labels("healthcare theme") == set()
+    assert automaton.labels("he said: health_check, health!") == {"health"}
+
+def test_hits_agree_with_regex_search():
+    rng = random.Random(7)
+    words = ["patient", "he", "she", "hers", "ushers", "loan", "loans", "supply", "chain", "x", "doctors"]
+    for whole_words in (False, True):
+        automaton = KeywordAutomaton(KEYWORDS, whole_words=whole_words)
+        for _ in range(200):
+            text = rng.choice(["", " ", "_", "-"]).join(rng.choice(words) for _ in range(6))
+            assert set(automaton.finditer(text)) == _regex_hits(text, whole_words), text
@@ -0,0 +1,28 @@
+import asyncio
+import json
+
+import pytest
+
+from schemas.base_models import ColumnDefinition
+from schemas.tabular_schema import TabularRequest
+from utils.model_backends import ModelBackend, SyntheticBackend
+
+def test_backend_without_generate_fails_when_created():
+    class Incomplete(ModelBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_synthetic_backend_is_deterministic_for_a_seed():
+    request = TabularRequest(
+        columns=[ColumnDefinition(name="age", dtype="int", description="age", validation=">= 0")],
+        num_rows=5, description="people", use_case="customers"
+    )
+
+    async def generate():
+        return await SyntheticBackend(seed=7).generate("prompt", request)
+
+    first, second = asyncio.run(generate()), asyncio.run(generate())
+    assert first == second
+    assert len(json.loads(first)) == 5
@@ -0,0 +1,43 @@
+import math
+
+from core.dataset import TabularDataset
+from core.report_stages import quality_stage
+
+COLUMNS = [
+    {"name": "age", "dtype": "int", "validation": ">= 0"},
+    {"name": "name", "dtype": "str", "validation": ""}
+]
+METADATA = {"columns": COLUMNS, "use_case": "customer records"}
+
+def _numbers(value):
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from _numbers(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _numbers(item)
+    elif isinstance(value, (int, float)):
+        yield value
+
+def test_empty_tabular_dataset_reports_finite_scores():
+    dataset = TabularDataset.from_rows([], COLUMNS)
+    sections, _ = quality_stage("tabular", dataset, METADATA, 50)
+
+    quality = sections["quality_report"]
+    assert quality["completeness"]["completeness_score"] == 0.0
+    assert quality["validity_score"] == 0.0
+    assert quality["distributions"] == {}
+    assert all(math.isfinite(number) for number in _numbers(sections))
+
+def test_tabular_scores():
+    rows = [{"age": 30, "name": "Ann"}, {"age": -1, "name": None}]
+    sections, _ = quality_stage("tabular", TabularDataset.from_rows(rows, COLUMNS), METADATA, 2)
+
+    quality = sections["quality_report"]
+    assert quality["completeness"]["completeness_score"] == 0.75
+    assert quality["validity"] == {"age": 1}
+    assert quality["validity_score"] == 0.5
+
+def test_empty_qa_dataset_reports_finite_scores():
+    sections, _ = quality_stage("qa", [], {"domain": "healthcare"}, 10)
+    assert all(math.isfinite(number) for number in _numbers(sections))
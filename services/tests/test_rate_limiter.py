@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+import pytest
+
+from agents import data_generator
+from config import config
+from schemas.qa_schema import QARequest
+from utils.model_backends import ModelBackend
+from utils.rate_limiter import (
+    AdaptiveConcurrencyLimiter, ModelCallScheduler, ModelThrottledError, ModelUnavailableError,
+    RetryableModelError, TokenBucket
+)
+
+def _scheduler(**overrides):
+    settings = dict(
+        requests_per_minute=60000, burst=100, initial_concurrency=4, min_concurrency=1, max_concurrency=8,
+        max_retries=3, base_delay=0.001, max_delay=0.01, call_timeout=5
+    )
+    settings.update(overrides)
+    return ModelCallScheduler(**settings)
+
+def _flaky(failures, error=RetryableModelError):
+    calls = []
+
+    async def call():
+        calls.append(time.monotonic())
+        if len(calls) <= failures:
+            raise error("transient")
+        return "ok"
+    return call, calls
+
+def test_token_bucket_limits_call_rate():
+    async def run():
+        bucket = TokenBucket(rate=50, capacity=2)
+        started = time.monotonic()
+        for _ in range(7):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    # Two calls from the burst, then five at 50 per second
+    assert 0.08 <= asyncio.run(run()) < 0.5
+
+def test_retryable_errors_are_retried():
+    scheduler = _scheduler()
+    call, calls = _flaky(2)
+    assert asyncio.run(scheduler.run(call)) == "ok"
+    assert len(calls) == 3
+    assert scheduler.stats["retries"] == 2
+
+def test_retries_give_up_after_max_retries():
+    scheduler = _scheduler(max_retries=2)
+    call, calls = _flaky(10)
+    with pytest.raises(ModelUnavailableError):
+        asyncio.run(scheduler.run(call))
+    assert len(calls) == 3
+    assert scheduler.stats["failures"] == 1
+
+def test_other_errors_are_not_retried():
+    scheduler = _scheduler()
+    call, calls = _flaky(1, error=ValueError)
+    with pytest.raises(ValueError):
+        asyncio.run(scheduler.run(call))
+    assert len(calls) == 1
+
+def test_throttling_halves_concurrency():
+    scheduler = _scheduler(initial_concurrency=8)
+    call, _ = _flaky(1, error=ModelThrottledError)
+    asyncio.run(scheduler.run(call))
+    assert scheduler.stats["throttled"] == 1
+    assert int(scheduler.limiter.limit) == 4
+
+def test_limiter_bounds_concurrent_calls():
+    async def run():
+        limiter = AdaptiveConcurrencyLimiter(initial=2, minimum=1, maximum=4)
+        peak = 0
+
+        async def work():
+            nonlocal peak
+            await limiter.acquire()
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+            await limiter.release()
+
+        await asyncio.gather(*(work() for _ in range(6)))
+        return peak
+
+    assert asyncio.run(run()) == 2
+
+def test_deadline_stops_retries():
+    scheduler = _scheduler(max_retries=1000, base_delay=0.02, max_delay=0.02)
+    call, calls = _flaky(10 ** 6)
+    started = time.monotonic()
+    with pytest.raises(ModelUnavailableError):
+        asyncio.run(scheduler.run(call, deadline=started + 0.2))
+    assert time.monotonic() - started < 0.5
+    assert 1 < len(calls) < 1000
+
+class FailingBackend(ModelBackend):
+    name = "failing"
+
+    async def generate(self, prompt: str, request=None) -> str:
+        raise RetryableModelError("always down")
+
+def test_generation_passes_its_time_budget_to_the_scheduler(monkeypatch):
+    monkeypatch.setattr(config, "GENERATION_TIMEOUT_SECONDS", 0.3)
+    monkeypatch.setattr(data_generator, "model_scheduler", _scheduler(max_retries=1000, base_delay=0.02, max_delay=0.02))
+    request = QARequest(domain="healthcare", complexity="beginner", num_pairs=2)
+
+    async def run():
+        async for _ in data_generator.iter_qa_batches(request, backend=FailingBackend()):
+            pass
+
+    started = time.monotonic()
+    with pytest.raises(ModelUnavailableError):
+        asyncio.run(run())
+    assert time.monotonic() - started < 1.5
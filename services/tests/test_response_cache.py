@@ -0,0 +1,87 @@
+import os
+import time
+
+import pytest
+
+from core import response_cache as response_cache_module
+from core.response_cache import ResponseCache
+
+class Clock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache_module.time, "time", clock)
+    return clock
+
+def test_memory_entry_expires_after_ttl_even_when_read(clock):
+    cache = ResponseCache(ttl_seconds=10)
+    cache.set("k", {"data": 1})
+    for _ in range(3):
+        clock.now += 3
+        assert cache.get("k") == {"data": 1}
+    clock.now += 2
+    assert cache.get("k") is None
+
+def test_disk_entry_expires_after_ttl_even_when_read(tmp_path, clock):
+    cache = ResponseCache(directory=str(tmp_path), ttl_seconds=10)
+    cache.set("k", {"data": 1})
+    # Each read comes from disk and goes back into memory with its original creation time
+    for _ in range(3):
+        clock.now += 3
+        cache._memory.clear()
+        assert cache.get("k") == {"data": 1}
+    clock.now += 2
+    assert cache.get("k") is None
+    assert not os.path.exists(tmp_path / "k.json")
+
+def test_disk_hit_keeps_creation_time_in_memory(tmp_path, clock):
+    cache = ResponseCache(directory=str(tmp_path), ttl_seconds=10)
+    cache.set("k", {"data": 1})
+    created_at = clock.now
+    cache._memory.clear()
+    clock.now += 8
+    assert cache.get("k") == {"data": 1}
+    assert cache._memory["k"][0] == created_at
+    clock.now += 3
+    assert cache.get("k") is None
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", {"v": "a"})
+    cache.set("b", {"v": "b"})
+    cache.get("a")
+    cache.set("c", {"v": "c"})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": "a"}
+    assert cache.get("c") == {"v": "c"}
+    assert cache.stats() == {"hits": 3, "misses": 1, "memory_entries": 2}
+
+def test_disk_tier_evicts_least_recently_used_past_size_limit(tmp_path):
+    cache = ResponseCache(max_entries=1, directory=str(tmp_path), max_disk_bytes=10 ** 6)
+    cache.set("a", {"v": "a"})
+    cache.set("b", {"v": "b"})
+    entry_size = os.path.getsize(tmp_path / "a.json")
+    now = time.time()
+    os.utime(tmp_path / "a.json", (now - 50, now - 50))
+    os.utime(tmp_path / "b.json", (now - 100, now - 100))
+    cache._memory.clear()
+    assert cache.get("b") == {"v": "b"}
+    # Reading b refreshed its access time without touching its mtime
+    assert os.stat(tmp_path / "b.json").st_mtime == pytest.approx(now - 100)
+
+    # Room for two entries; sizes differ by a few bytes with the length of created_at
+    cache.max_disk_bytes = 2 * entry_size + 16
+    cache.set("c", {"v": "c"})
+    assert sorted(os.listdir(tmp_path)) == ["b.json", "c.json"]
+
+def test_legacy_disk_entry_without_creation_time_is_discarded(tmp_path):
+    (tmp_path / "k.json").write_text('{"data": 1}')
+    cache = ResponseCache(directory=str(tmp_path))
+    assert cache.get("k") is None
+    assert not os.path.exists(tmp_path / "k.json")
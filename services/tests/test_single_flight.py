@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from agents.monitor import GenerationMonitor
+from core.single_flight import SingleFlight
+
+def test_concurrent_calls_share_one_task():
+    async def run():
+        flight = SingleFlight()
+        calls = []
+
+        async def work(monitors):
+            calls.append(monitors)
+            await asyncio.sleep(0.01)
+            monitors.log_batch(3)
+            return "done"
+
+        results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+        return results, calls, flight.in_flight()
+
+    results, calls, in_flight = asyncio.run(run())
+    assert results == ["done"] * 5
+    assert len(calls) == 1
+    assert in_flight == 0
+
+def test_every_caller_gets_the_shared_exception():
+    async def run():
+        flight = SingleFlight()
+
+        async def fail(monitors):
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+        return await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+
+def test_late_monitor_catches_up_with_progress():
+    async def run():
+        flight = SingleFlight()
+        halfway = asyncio.Event()
+
+        async def work(monitors):
+            monitors.log_batch(4, 1)
+            halfway.set()
+            await asyncio.sleep(0.01)
+            monitors.log_batch(6)
+            return "done"
+
+        first, second = GenerationMonitor(10), GenerationMonitor(10)
+        task = asyncio.create_task(flight.do("key", work, first))
+        await halfway.wait()
+        await flight.do("key", work, second)
+        await task
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert (first.valid, first.invalid) == (second.valid, second.invalid) == (10, 1)
+
+def test_shared_task_survives_until_the_last_waiter_leaves():
+    async def run():
+        flight = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def work(monitors):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        first = asyncio.create_task(flight.do("key", work))
+        second = asyncio.create_task(flight.do("key", work))
+        await started.wait()
+
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert not cancelled.is_set() and flight.in_flight() == 1
+
+        second.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        assert flight.in_flight() == 0
+        for task in (first, second):
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    asyncio.run(run())
+
+def test_new_call_after_completion_starts_fresh():
+    async def run():
+        flight = SingleFlight()
+        calls = []
+
+        async def work(monitors):
+            calls.append(1)
+            return len(calls)
+        return await flight.do("key", work), await flight.do("key", work)
+
+    assert asyncio.run(run()) == (1, 2)
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.validation_rules import compile_rule, evaluate_rule
+
+VALUES = [0, 1, 5, -3, 2.5, 18, 35, 36, np.nan, None, "abc", "ID-7", "", "42", True, [1, 2]]
+
+RULES = [
+    ">= 18 and <= 35",
+    "> 0 or == -3",
+    "not value > 1",
+    "value % 2 == 0",
+    "10 / value > 1",
+    "abs(value) < 3",
+    "round(value) == 2",
+    "max(value, 3) == 3",
+    "len(value) >= 3",
+    "value.startswith('ID')",
+    "value.isdigit()",
+    "value in [1, 5, 'abc']",
+    "value not in (0, 1)",
+    "0 < value < 10",
+    "pow(value, 2) > 4",
+]
+
+@pytest.mark.parametrize("rule", RULES)
+def test_mask_agrees_with_the_scalar_rule(rule):
+    compiled = compile_rule(rule)
+    for values in (VALUES, [v for v in VALUES if type(v) in (int, float)], ["abc", "ID-7", "", "42"]):
+        expected = [compiled(v) and not pd.isna(v) if np.ndim(v) == 0 else compiled(v) for v in values]
+        assert compiled.mask(values).tolist() == expected, (rule, values)
+
+def test_mask_accepts_series_and_typed_columns():
+    compiled = compile_rule(">= 2")
+    assert compiled.mask(pd.Series([1, 2, None], dtype="Int64")).tolist() == [False, True, False]
+    assert compiled.mask(np.array([3.0, np.nan])).tolist() == [True, False]
+
+@pytest.mark.parametrize("rule", ["__import__('os')", "value.__class__", "open('x')", "len(value, key=1)", "value >"])
+def test_unsafe_or_invalid_rules_reject_everything(rule):
+    compiled = compile_rule(rule)
+    assert compiled.error
+    assert compiled("anything") is False
+    assert not compiled.mask([1, "a"]).any()
+
+def test_empty_rule_accepts_everything():
+    assert evaluate_rule(None, "") is True
+    assert evaluate_rule(7, ">= 18") is False
@@ -1,8 +1,12 @@
 import google.generativeai as genai
 import os
 from dotenv import load_dotenv
+from config import config
+from utils.json_stream import iter_json_objects
+from typing import AsyncIterator, Dict
 import json
 import logging
+import threading
 import time
 
 logger = logging.getLogger(__name__)
@@ -15,48 +19,116 @@ def init_gemini():
         raise ValueError("GEMINI_API_KEY not found in environment variables")
     genai.configure(api_key=api_key)
 
-def generate_with_gemini(prompt: str, model: str = "gemini-1.5-flash") -> str:
-    logger.info(f"Initializing Gemini with model: {model}")
-    init_gemini()
-    model = genai.GenerativeModel(model)
-    
-    logger.info("Sending request to Gemini API...")
-    api_start = time.time()
-    response = model.generate_content(
-        prompt,
-        generation_config=genai.types.GenerationConfig(
-            temperature=0.7,
-            max_output_tokens=2048
+class GeminiClient:
+    """Process-wide Gemini client: configured once, model handles reused by name"""
+
+    def __init__(self, temperature: float = 0.7, max_output_tokens: int = 2048):
+        self.temperature = temperature
+        self.max_output_tokens = max_output_tokens
+        self._configured = False
+        self._models: Dict[str, genai.GenerativeModel] = {}
+        self._lock = threading.Lock()
+
+    def configure(self):
+        """Configure the API transport; safe to call more than once"""
+        with self._lock:
+            if not self._configured:
+                init_gemini()
+                self._configured = True
+                logger.info("Gemini client configured")
+
+    def get_model(self, model: str = None) -> genai.GenerativeModel:
+        """Return the cached model handle for a model name, creating it on first use"""
+        model = model or config.GEMINI_MODEL
+        handle = self._models.get(model)
+        if handle is None:
+            self.configure()
+            with self._lock:
+                handle = self._models.get(model)
+                if handle is None:
+                    logger.info(f"Initializing Gemini with model: {model}")
+                    handle = genai.GenerativeModel(model)
+                    self._models[model] = handle
+        return handle
+
+    def _generation_config(self):
+        return genai.types.GenerationConfig(
+            temperature=self.temperature,
+            max_output_tokens=self.max_output_tokens
         )
-    )
-    api_time = time.time() - api_start
-    logger.info(f"Gemini API response received in {api_time:.2f} seconds")
-    
-    return response.text
+
+    async def generate(self, prompt: str, model: str = None) -> str:
+        """Generate a completion without blocking the event loop"""
+        handle = self.get_model(model)
+
+        logger.info("Sending async request to Gemini API...")
+        api_start = time.time()
+        response = await handle.generate_content_async(
+            prompt,
+            generation_config=self._generation_config()
+        )
+        api_time = time.time() - api_start
+        logger.info(f"Gemini API response received in {api_time:.2f} seconds")
+
+        return response.text
+
+    async def stream(self, prompt: str, model: str = None) -> AsyncIterator[str]:
+        """Yield response text chunks as the model produces them"""
+        handle = self.get_model(model)
+
+        logger.info("Sending streaming request to Gemini API...")
+        response = await handle.generate_content_async(
+            prompt,
+            generation_config=self._generation_config(),
+            stream=True
+        )
+        async for chunk in response:
+            # Chunks without text (e.g. safety-only updates) raise on .text
+            if chunk.parts:
+                yield chunk.text
+
+    def generate_sync(self, prompt: str, model: str = None) -> str:
+        """Blocking variant for scripts and callers outside an event loop"""
+        handle = self.get_model(model)
+
+        logger.info("Sending request to Gemini API...")
+        api_start = time.time()
+        response = handle.generate_content(
+            prompt,
+            generation_config=self._generation_config()
+        )
+        api_time = time.time() - api_start
+        logger.info(f"Gemini API response received in {api_time:.2f} seconds")
+
+        return response.text
+
+gemini_client = GeminiClient()
+
+def generate_with_gemini(prompt: str, model: str = None) -> str:
+    return gemini_client.generate_sync(prompt, model)
 
 def extract_json_from_response(response: str) -> list:
     logger.info("Attempting to extract JSON from response...")
     logger.debug(f"Raw response: {response[:500]}...")  # Log first 500 chars
     
-    try:
-        # Handle code block responses
-        start = response.find('[')
-        end = response.rfind(']') + 1
-        
-        if start == -1 or end == 0:
-            logger.error("No JSON array found in response")
-            logger.error(f"Full response: {response}")
-            raise ValueError("No JSON array found in response")
-            
-        json_str = response[start:end]
-        logger.debug(f"Extracted JSON string: {json_str}")
-        
-        result = json.loads(json_str)
-        logger.info(f"Successfully extracted JSON with {len(result)} items")
-        logger.debug(f"Parsed data: {result}")
-        return result
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse Gemini response as JSON: {e}")
+    # Fast path: a single well-formed array (possibly wrapped in a code block)
+    start = response.find('[')
+    end = response.rfind(']') + 1
+    if start != -1 and end > start:
+        try:
+            result = json.loads(response[start:end])
+            if isinstance(result, list):
+                logger.info(f"Successfully extracted JSON with {len(result)} items")
+                return result
+        except json.JSONDecodeError as e:
+            logger.warning(f"Response is not a clean JSON array ({e}), salvaging complete objects")
+    
+    # Salvage every complete object from truncated or noisy output
+    result = list(iter_json_objects([response]))
+    if not result:
+        logger.error("No JSON objects found in response")
         logger.error(f"Response preview: {response[:200]}...")
-        logger.error(f"Full response: {response}")
-        raise ValueError("Failed to parse Gemini response as JSON")
\ No newline at end of file
+        raise ValueError("Failed to parse Gemini response as JSON")
+    
+    logger.info(f"Salvaged {len(result)} JSON objects from response")
+    return result
\ No newline at end of file
@@ -0,0 +1,129 @@
+import json
+import logging
+import re
+from typing import AsyncIterator, Iterable, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+# Characters that change parser state outside and inside JSON strings
+_STRUCTURAL = re.compile(r'[{}\[\]"]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+class IncrementalJSONParser:
+    """Incrementally extracts complete JSON objects from streamed model output.
+
+    Text outside objects (array brackets, commas, markdown fences, chatter) is
+    skipped, and every object is emitted as soon as its closing brace arrives.
+    Objects that fail to decode are dropped without affecting their
+    neighbours, and an unterminated trailing object is simply never emitted,
+    so all complete rows of a truncated or noisy response are salvaged.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0          # Scan position within the buffer
+        self._start = -1       # Buffer offset of the current object's opening brace
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.emitted = 0
+        self.discarded = 0
+
+    def feed(self, chunk: str) -> List[dict]:
+        """Consume a chunk of text and return the objects it completed"""
+        self._buffer += chunk
+        objects = []
+
+        while self._pos < len(self._buffer):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                    self._pos += 1
+                    continue
+                match = _STRING_SPECIAL.search(self._buffer, self._pos)
+                if match is None:
+                    self._pos = len(self._buffer)
+                    break
+                self._pos = match.end()
+                if match.group() == "\\":
+                    self._escaped = True
+                else:
+                    self._in_string = False
+                continue
+
+            match = _STRUCTURAL.search(self._buffer, self._pos)
+            if match is None:
+                self._pos = len(self._buffer)
+                break
+            char = match.group()
+            self._pos = match.end()
+
+            if self._depth == 0:
+                # Only an opening brace starts an object; anything else is noise
+                if char == "{":
+                    self._start = match.start()
+                    self._depth = 1
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    obj = self._decode(self._buffer[self._start:self._pos])
+                    if obj is not None:
+                        objects.append(obj)
+                    self._start = -1
+
+        self._compact()
+        return objects
+
+    def close(self) -> bool:
+        """Finish the stream; returns True if a truncated object was left over"""
+        truncated = self._depth > 0
+        if truncated:
+            logger.warning("Discarding truncated JSON object at end of response")
+            self.discarded += 1
+        self._buffer = ""
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        return truncated
+
+    def _decode(self, text: str):
+        try:
+            obj = json.loads(text)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Skipping malformed JSON object: {e}")
+            self.discarded += 1
+            return None
+        self.emitted += 1
+        return obj
+
+    def _compact(self):
+        """Drop consumed text so the buffer only holds the object in progress"""
+        keep_from = self._start if self._depth > 0 else self._pos
+        if keep_from > 0:
+            self._buffer = self._buffer[keep_from:]
+            self._pos -= keep_from
+            if self._start >= 0:
+                self._start -= keep_from
+
+def iter_json_objects(chunks: Iterable[str]) -> Iterator[dict]:
+    """Yield each complete JSON object from an iterable of text chunks"""
+    parser = IncrementalJSONParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    parser.close()
+
+async def aiter_json_objects(chunks: AsyncIterator[str]) -> AsyncIterator[dict]:
+    """Yield each complete JSON object from an async stream of text chunks"""
+    parser = IncrementalJSONParser()
+    async for chunk in chunks:
+        for obj in parser.feed(chunk):
+            yield obj
+    parser.close()
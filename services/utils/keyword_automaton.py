@@ -0,0 +1,87 @@
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+def _at_boundary(text: str, index: int) -> bool:
+    """Same test as a regex \\b at text[index]"""
+    before = index > 0 and _is_word_char(text[index - 1])
+    after = index < len(text) and _is_word_char(text[index])
+    return before != after
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over a table of labelled keywords.
+
+    Built once, it finds every occurrence of every keyword in a single
+    left-to-right pass over the text, so lookups cost the same whether the
+    table holds ten keywords or ten thousand. Matching is case-insensitive:
+    keywords and text are lowercased, and offsets refer to the lowercased
+    text. With `whole_words`, a hit must start and end on word boundaries,
+    the same as a regex `\\b...\\b` around the keyword.
+    """
+
+    def __init__(self, keywords: Dict[str, Iterable[str]], whole_words: bool = False):
+        self.whole_words = whole_words
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str]]] = [[]]
+
+        for label, label_keywords in keywords.items():
+            for keyword in label_keywords:
+                keyword = keyword.lower()
+                if keyword:
+                    self._add(keyword, label)
+        self._link()
+
+    def _add(self, keyword: str, label: str):
+        state = 0
+        for ch in keyword:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        self._out[state].append((len(keyword), label))
+
+    def _link(self):
+        """Breadth-first pass filling failure links and merging outputs along them"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Yield (start, end, label) for every keyword occurrence, ordered by end"""
+        text = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for end, ch in enumerate(text, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            for length, label in out[state]:
+                start = end - length
+                if self.whole_words and not (_at_boundary(text, start) and _at_boundary(text, end)):
+                    continue
+                yield start, end, label
+
+    def labels(self, text: str) -> Set[str]:
+        """Labels of every keyword found in the text"""
+        return {label for _, _, label in self.finditer(text)}
+
+    def __contains__(self, text: str) -> bool:
+        return next(self.finditer(text), None) is not None
@@ -0,0 +1,148 @@
+import asyncio
+import hashlib
+import json
+import logging
+import random
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict
+
+from config import config
+from utils.gemini_client import gemini_client
+from utils.rate_limiter import RetryableModelError
+from utils.validation_rules import evaluate_rule
+
+logger = logging.getLogger(__name__)
+
+class ModelBackend(ABC):
+    """Interface for the model that turns a generation prompt into raw text"""
+    name = "base"
+
+    @abstractmethod
+    async def generate(self, prompt: str, request=None) -> str:
+        """Return the raw model response for a prompt.
+
+        `request` is the (batch-sized) TabularRequest/QARequest the prompt was
+        built from; backends that don't need it ignore it.
+        """
+
+    async def stream(self, prompt: str, request=None) -> AsyncIterator[str]:
+        """Yield the response as text chunks; defaults to one chunk from generate()"""
+        yield await self.generate(prompt, request)
+
+class GeminiBackend(ModelBackend):
+    name = "gemini"
+
+    def __init__(self, model: str = None, client=gemini_client):
+        self.model = model or config.GEMINI_MODEL
+        self.client = client
+
+    async def generate(self, prompt: str, request=None) -> str:
+        return await self.client.generate(prompt, self.model)
+
+    async def stream(self, prompt: str, request=None) -> AsyncIterator[str]:
+        async for chunk in self.client.stream(prompt, self.model):
+            yield chunk
+
+class SyntheticBackendError(RetryableModelError):
+    """Transient failure injected by the synthetic backend"""
+
+class SyntheticBackend(ModelBackend):
+    """Offline stand-in that returns schema-conformant JSON for a request.
+
+    Output is deterministic for a given seed and prompt, so repeated runs
+    produce identical datasets for benchmarking and perf regression checks.
+    """
+    name = "synthetic"
+
+    def __init__(self, latency_seconds: float = 0.0, latency_jitter_seconds: float = 0.0,
+                 failure_rate: float = 0.0, seed: int = 0, chunk_size: int = 256):
+        self.latency_seconds = latency_seconds
+        self.latency_jitter_seconds = latency_jitter_seconds
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.calls = 0
+        # Failures are drawn per call (not per prompt) so retries of the same prompt can succeed
+        self._failure_rng = random.Random(seed)
+
+    def _rng(self, prompt: str) -> random.Random:
+        digest = hashlib.sha256(f"{self.seed}:{prompt}".encode()).hexdigest()
+        return random.Random(int(digest[:16], 16))
+
+    async def generate(self, prompt: str, request=None) -> str:
+        if request is None:
+            raise ValueError("Synthetic backend requires the request the prompt was built from")
+
+        self.calls += 1
+        rng = self._rng(prompt)
+
+        delay = self.latency_seconds + rng.uniform(0, self.latency_jitter_seconds)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self._failure_rng.random() < self.failure_rate:
+            raise SyntheticBackendError("Injected synthetic backend failure")
+
+        if hasattr(request, "columns"):
+            items = [self._tabular_row(request.columns, rng) for _ in range(request.num_rows)]
+        else:
+            items = [self._qa_pair(request, rng) for _ in range(request.num_pairs)]
+        return json.dumps(items)
+
+    async def stream(self, prompt: str, request=None) -> AsyncIterator[str]:
+        response = await self.generate(prompt, request)
+        for start in range(0, len(response), self.chunk_size):
+            yield response[start:start + self.chunk_size]
+            await asyncio.sleep(0)
+
+    def _tabular_row(self, columns, rng: random.Random) -> Dict[str, Any]:
+        return {col.name: self._value(col, rng) for col in columns}
+
+    def _value(self, col, rng: random.Random) -> Any:
+        if col.options:
+            return rng.choice(col.options)
+
+        candidate = None
+        # Draw a few candidates at increasing scales so simple range rules are usually met
+        for attempt in range(20):
+            candidate = self._random_value(col, rng, scale=10 ** (1 + attempt % 6))
+            if not col.validation or evaluate_rule(candidate, col.validation):
+                break
+        return candidate
+
+    def _random_value(self, col, rng: random.Random, scale: int) -> Any:
+        if col.dtype == 'int':
+            return rng.randint(0, scale)
+        if col.dtype == 'float':
+            return round(rng.uniform(0, scale), 2)
+        if col.dtype == 'bool':
+            return rng.random() < 0.5
+        if col.dtype == 'datetime':
+            moment = datetime(2020, 1, 1) + timedelta(seconds=rng.randint(0, 5 * 365 * 86400))
+            return moment.isoformat()
+        return f"{col.name.replace('_', ' ').title()} {rng.randint(1, scale * 100)}"
+
+    def _qa_pair(self, request, rng: random.Random) -> Dict[str, str]:
+        topic = rng.randint(1, 1_000_000)
+        return {
+            "question": f"What is the {request.complexity} {request.domain} concept #{topic}?",
+            "answer": f"Concept #{topic} is a synthetic {request.domain} answer used for offline testing."
+        }
+
+_backends: Dict[str, ModelBackend] = {}
+
+def create_backend(name: str) -> ModelBackend:
+    if name == GeminiBackend.name:
+        return GeminiBackend()
+    if name == SyntheticBackend.name:
+        return SyntheticBackend(**config.SYNTHETIC_BACKEND)
+    raise ValueError(f"Unknown model backend: {name}")
+
+def get_backend(name: str = None) -> ModelBackend:
+    """Return the shared backend instance selected by name or Config.MODEL_BACKEND"""
+    name = name or config.MODEL_BACKEND
+    if name not in _backends:
+        logger.info(f"Using model backend: {name}")
+        _backends[name] = create_backend(name)
+    return _backends[name]
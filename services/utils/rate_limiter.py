@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, Any, TypeVar
+
+from config import config
+
+try:
+    from google.api_core import exceptions as google_exceptions
+except ImportError:  # pragma: no cover - only without the Gemini SDK installed
+    google_exceptions = None
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class RetryableModelError(Exception):
+    """Transient model failure that is worth retrying"""
+
+class ModelThrottledError(RetryableModelError):
+    """The provider rejected the call for quota or rate reasons"""
+
+class ModelUnavailableError(Exception):
+    """A model call still failed after all retries or ran past its deadline"""
+
+    def __init__(self, message: str, throttled: bool = False):
+        super().__init__(message)
+        self.throttled = throttled
+
+def is_throttling_error(error: BaseException) -> bool:
+    if isinstance(error, ModelThrottledError):
+        return True
+    if google_exceptions is not None:
+        return isinstance(error, (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests))
+    return False
+
+def is_retryable_error(error: BaseException) -> bool:
+    if isinstance(error, (RetryableModelError, asyncio.TimeoutError)) or is_throttling_error(error):
+        return True
+    if google_exceptions is not None:
+        return isinstance(error, (
+            google_exceptions.ServiceUnavailable,
+            google_exceptions.DeadlineExceeded,
+            google_exceptions.InternalServerError
+        ))
+    return False
+
+class TokenBucket:
+    """Limits call starts to `rate` per second with bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class AdaptiveConcurrencyLimiter:
+    """Concurrency limit that halves on throttling and grows by about one per window of successes"""
+
+    def __init__(self, initial: int, minimum: int, maximum: int):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    async def on_success(self):
+        async with self._condition:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+    async def on_throttled(self):
+        async with self._condition:
+            self.limit = max(self.minimum, self.limit / 2)
+            logger.warning(f"Model throttled, concurrency limit reduced to {int(self.limit)}")
+
+class ModelCallScheduler:
+    """Shared gate for all model calls: rate limit, adaptive concurrency and retries.
+
+    Retryable failures are retried with exponential backoff and full jitter;
+    throttling additionally halves the concurrency limit and pauses every
+    caller until the backoff elapses, so bursts don't turn into error storms.
+    """
+
+    def __init__(self, requests_per_minute: float, burst: int, initial_concurrency: int,
+                 min_concurrency: int, max_concurrency: int, max_retries: int,
+                 base_delay: float, max_delay: float, call_timeout: float):
+        self.bucket = TokenBucket(requests_per_minute / 60, burst)
+        self.limiter = AdaptiveConcurrencyLimiter(initial_concurrency, min_concurrency, max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.call_timeout = call_timeout
+        self._paused_until = 0.0
+        self.stats = {"calls": 0, "retries": 0, "throttled": 0, "failures": 0}
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def run(self, call: Callable[[], Awaitable[T]], deadline: float = None) -> T:
+        """Run `call` under the scheduler; `deadline` is an absolute time.monotonic() cutoff"""
+        attempt = 0
+        while True:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+
+            await self.bucket.acquire()
+            await self.limiter.acquire()
+            self.stats["calls"] += 1
+            try:
+                timeout = self.call_timeout
+                if deadline is not None:
+                    timeout = min(timeout, deadline - time.monotonic())
+                    if timeout <= 0:
+                        raise ModelUnavailableError("Model call deadline exceeded")
+                result = await asyncio.wait_for(call(), timeout)
+            except Exception as e:
+                error = e
+            else:
+                await self.limiter.on_success()
+                return result
+            finally:
+                await self.limiter.release()
+
+            if isinstance(error, ModelUnavailableError) or not is_retryable_error(error):
+                self.stats["failures"] += 1
+                raise error
+
+            throttled = is_throttling_error(error)
+            delay = self._backoff(attempt)
+            if throttled:
+                self.stats["throttled"] += 1
+                await self.limiter.on_throttled()
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+            attempt += 1
+            out_of_time = deadline is not None and time.monotonic() + delay >= deadline
+            if attempt > self.max_retries or out_of_time:
+                self.stats["failures"] += 1
+                raise ModelUnavailableError(
+                    f"Model call failed after {attempt} attempts: {error or type(error).__name__}",
+                    throttled=throttled
+                ) from error
+
+            self.stats["retries"] += 1
+            logger.warning(f"Retryable model error ({type(error).__name__}: {error}), "
+                           f"retrying in {delay:.2f}s (attempt {attempt}/{self.max_retries})")
+            await asyncio.sleep(delay)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "concurrency_limit": int(self.limiter.limit),
+            "in_flight": self.limiter.in_flight
+        }
+
+model_scheduler = ModelCallScheduler(**config.MODEL_SCHEDULER)
@@ -1,22 +1,229 @@
+import ast
+import logging
+import operator
+import re
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Functions a rule may call, e.g. "len(value) >= 3" or "abs(value) < 100"
+RULE_FUNCTIONS = {
+    'min': min,
+    'max': max,
+    'len': len,
+    'abs': abs,
+    'round': round,
+    'pow': pow,
+    'sum': sum
+}
+
+# String methods a rule may call on the value, e.g. "value.startswith('ID')"
+RULE_METHODS = {'startswith', 'endswith', 'lower', 'upper', 'strip', 'isdigit', 'isalpha', 'isalnum'}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.Call, ast.Attribute, ast.Name, ast.Load, ast.Constant, ast.List, ast.Tuple, ast.Set
+)
+
+# ">=18 and <=35" shorthand: a comparison operator with no left operand compares `value`
+_SHORTHAND = re.compile(r'(^|\band\b|\bor\b|\bnot\b|\()(\s*)(?=(?:>=|<=|==|!=|>|<))')
+
+_COMPARE_OPS = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt,
+    ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge
+}
+_BIN_OPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod, ast.Pow: operator.pow
+}
+
+class RuleError(ValueError):
+    """A validation rule that cannot be compiled safely"""
+
+class _Unvectorizable(Exception):
+    """The rule uses a construct without a column-wise equivalent"""
+
+def _expand_shorthand(rule: str) -> str:
+    return _SHORTHAND.sub(lambda m: f"{m.group(1)}{m.group(2)}value ", rule.strip())
+
+def _check_node(node: ast.AST):
+    if not isinstance(node, _ALLOWED_NODES):
+        raise RuleError(f"Unsupported syntax in rule: {type(node).__name__}")
+    if isinstance(node, ast.Name) and node.id != 'value' and node.id not in RULE_FUNCTIONS:
+        raise RuleError(f"Unknown name in rule: {node.id}")
+    if isinstance(node, ast.Attribute) and node.attr not in RULE_METHODS:
+        raise RuleError(f"Unsupported method in rule: {node.attr}")
+    if isinstance(node, ast.Call):
+        if node.keywords:
+            raise RuleError("Keyword arguments are not allowed in rules")
+        if not isinstance(node.func, (ast.Name, ast.Attribute)):
+            raise RuleError("Only named functions and string methods may be called in rules")
+
+class CompiledRule:
+    """A validation rule parsed, whitelisted and compiled once.
+
+    Calling it checks a single value; `mask()` checks a whole column and
+    returns a boolean array. Values that make the rule raise are invalid.
+    """
+
+    def __init__(self, rule: str):
+        self.rule = rule
+        self.error = None
+        self._tree = None
+        self._code = None
+
+        source = _expand_shorthand(rule)
+        try:
+            tree = ast.parse(source, mode='eval')
+            for node in ast.walk(tree):
+                _check_node(node)
+        except (SyntaxError, RuleError) as e:
+            self.error = str(e)
+            logger.warning(f"Invalid validation rule {rule!r}: {self.error}")
+            return
+
+        self._tree = tree
+        self._code = compile(tree, f"<rule {rule!r}>", 'eval')
+        self._globals = {"__builtins__": {}, **RULE_FUNCTIONS}
+
+    def __call__(self, value: Any) -> bool:
+        if self._code is None:
+            return False
+        try:
+            return bool(eval(self._code, self._globals, {'value': value}))
+        except Exception:
+            return False
+
+    def mask(self, values) -> np.ndarray:
+        """Evaluate the rule over a whole column (Series, array or list)"""
+        series = values if isinstance(values, pd.Series) else pd.Series(values)
+        if self._code is None:
+            return np.zeros(len(series), dtype=bool)
+
+        notnull = series.notna().to_numpy()
+        try:
+            result = _VectorEvaluator(series).visit(self._tree.body)
+            if np.ndim(result) == 0:
+                result = np.full(len(series), bool(result))
+            result = np.asarray(pd.Series(result).fillna(False), dtype=bool)
+            return result & notnull
+        except Exception:
+            # Fall back to the scalar predicate for rules or dtypes without a vectorized form
+            return np.fromiter((self(v) for v in series.tolist()), dtype=bool, count=len(series)) & notnull
+
+class _VectorEvaluator(ast.NodeVisitor):
+    """Evaluates a whitelisted rule AST with pandas/NumPy column operations"""
+
+    def __init__(self, series: pd.Series):
+        self.series = series
+
+    def generic_visit(self, node):
+        raise _Unvectorizable(type(node).__name__)
+
+    def visit_Name(self, node):
+        if node.id == 'value':
+            return self.series
+        raise _Unvectorizable(node.id)
+
+    def visit_Constant(self, node):
+        return node.value
+
+    def visit_List(self, node):
+        return [self.visit(elt) for elt in node.elts]
+
+    visit_Tuple = visit_List
+    visit_Set = visit_List
+
+    def visit_BoolOp(self, node):
+        parts = [self._as_bool(self.visit(v)) for v in node.values]
+        combine = operator.and_ if isinstance(node.op, ast.And) else operator.or_
+        result = parts[0]
+        for part in parts[1:]:
+            result = combine(result, part)
+        return result
+
+    def visit_UnaryOp(self, node):
+        operand = self.visit(node.operand)
+        if isinstance(node.op, ast.Not):
+            return ~self._as_bool(operand) if isinstance(operand, pd.Series) else not operand
+        if isinstance(node.op, ast.USub):
+            return -operand
+        return operand
+
+    def visit_BinOp(self, node):
+        left, right = self.visit(node.left), self.visit(node.right)
+        # NumPy turns these into inf/nan where Python raises, which the scalar path treats as invalid;
+        # rather than guess how the error propagates through and/or, let the scalar path decide
+        if isinstance(node.op, (ast.Div, ast.FloorDiv, ast.Mod)) and self._any_equal(right, 0):
+            raise _Unvectorizable("division by zero")
+        if isinstance(node.op, ast.Pow) and self._any_equal(left, 0):
+            raise _Unvectorizable("zero to a power")
+        return _BIN_OPS[type(node.op)](left, right)
+
+    def visit_Compare(self, node):
+        result = None
+        left = self.visit(node.left)
+        for op, comparator in zip(node.ops, node.comparators):
+            right = self.visit(comparator)
+            if isinstance(op, (ast.In, ast.NotIn)):
+                if not isinstance(left, pd.Series) or not isinstance(right, list):
+                    raise _Unvectorizable("in")
+                part = left.isin(right)
+                if isinstance(op, ast.NotIn):
+                    part = ~part
+            else:
+                part = _COMPARE_OPS[type(op)](left, right)
+            part = self._as_bool(part)
+            result = part if result is None else result & part
+            left = right
+        return result
+
+    def visit_Call(self, node):
+        args = [self.visit(arg) for arg in node.args]
+        if isinstance(node.func, ast.Attribute):
+            target = self.visit(node.func.value)
+            if not isinstance(target, pd.Series):
+                raise _Unvectorizable(node.func.attr)
+            return getattr(target.str, node.func.attr)(*args)
+
+        name = node.func.id
+        if name == 'len' and len(args) == 1 and isinstance(args[0], pd.Series):
+            return args[0].str.len()
+        if name == 'abs' and len(args) == 1:
+            return np.abs(args[0])
+        if name == 'round' and len(args) in (1, 2):
+            return np.round(*args)
+        if name == 'pow' and len(args) == 2:
+            return args[0] ** args[1]
+        if name in ('min', 'max') and len(args) == 2:
+            return (np.minimum if name == 'min' else np.maximum)(args[0], args[1])
+        raise _Unvectorizable(name)
+
+    @staticmethod
+    def _any_equal(value, target) -> bool:
+        if isinstance(value, pd.Series):
+            return bool((value == target).fillna(False).any())
+        return isinstance(value, (int, float)) and value == target
+
+    @staticmethod
+    def _as_bool(value):
+        if isinstance(value, pd.Series):
+            return value.fillna(False).astype(bool)
+        return value
+
+@lru_cache(maxsize=1024)
+def compile_rule(rule: str) -> CompiledRule:
+    """Return the compiled form of a rule, cached by rule text"""
+    return CompiledRule(rule)
+
 def evaluate_rule(value, rule: str) -> bool:
     """Evaluate validation rules using safe evaluation"""
     if not rule:
         return True
-        
-    try:
-        # Create safe evaluation context
-        context = {
-            'value': value,
-            'min': min,
-            'max': max,
-            'len': len
-        }
-        
-        # Add common math functions
-        for name in ['abs', 'round', 'pow', 'sum']:
-            context[name] = getattr(__builtins__, name, None)
-        
-        # Evaluate the rule
-        return eval(rule, {"__builtins__": None}, context)
-    except:
-        return False
\ No newline at end of file
+    return compile_rule(rule)(value)